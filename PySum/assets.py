@@ -0,0 +1,60 @@
+# assets.py
+import os
+import pygame
+
+ASSET_DIR = "sources"
+
+
+class AssetCache:
+    """
+    Imágenes compartidas: cada archivo se carga, convierte y escala una sola vez
+    por tamaño, y las variantes teñidas se crean la primera vez que se piden.
+    Todos los robots del mismo color usan la misma superficie.
+    Necesita un display abierto (convert/convert_alpha), por eso carga perezoso.
+    """
+
+    def __init__(self, root=ASSET_DIR):
+        self.root = root
+        self.raw = {}       # (archivo, alfa) -> superficie convertida sin escalar
+        self.scaled = {}    # (archivo, (w, h), alfa) -> superficie
+        self.tints = {}     # (archivo, (w, h), color) -> superficie teñida
+
+    def _load(self, name, alpha):
+        key = (name, alpha)
+        img = self.raw.get(key)
+        if img is None:
+            img = pygame.image.load(os.path.join(self.root, name))
+            img = img.convert_alpha() if alpha else img.convert()
+            self.raw[key] = img
+        return img
+
+    def image(self, name, size, alpha=True):
+        key = (name, tuple(size), bool(alpha))
+        img = self.scaled.get(key)
+        if img is None:
+            img = pygame.transform.scale(self._load(name, key[2]), key[1])
+            self.scaled[key] = img
+        return img
+
+    def tinted(self, name, size, color):
+        """
+        Variante multiplicada por color (mezclado a medias con blanco para
+        conservar el detalle del sprite). El alfa no cambia.
+        """
+        key = (name, tuple(size), tuple(color))
+        img = self.tints.get(key)
+        if img is None:
+            tint = tuple((255 + ch) // 2 for ch in color)
+            img = self.image(name, size).copy()
+            img.fill(tint, special_flags=pygame.BLEND_RGB_MULT)
+            self.tints[key] = img
+        return img
+
+    def clear(self):
+        self.raw.clear()
+        self.scaled.clear()
+        self.tints.clear()
+
+
+# cache global compartida por todos los renderers
+assets = AssetCache()
@@ -0,0 +1,157 @@
+# benchmark.py
+import argparse
+import itertools
+import json
+import time
+from bfs import search_stats
+from profiling import profiler
+from simulation import Simulation, TIME_LIMIT_TICKS
+
+# matriz por defecto: (ancho, alto), cajas iniciales, robots, capacidad de pila
+SIZES = [(27, 15), (41, 21)]
+BOXES = [30, 60]
+ROBOTS = [5, 10]
+CAPACITIES = [5]
+SEEDS = 3
+
+
+def scenario_matrix(sizes=SIZES, boxes=BOXES, robots=ROBOTS, capacities=CAPACITIES,
+                    seeds=SEEDS, **sim_kwargs):
+    """Lista de configs (kwargs de Simulation) para todas las combinaciones y seeds."""
+    configs = []
+    for (w, h), nb, nr, cap in itertools.product(sizes, boxes, robots, capacities):
+        for seed in range(seeds):
+            configs.append(dict(
+                width=w, height=h, initial_boxes=nb, num_robots=nr,
+                pile_capacity=cap, seed=seed, **sim_kwargs
+            ))
+    return configs
+
+
+def layout_matrix(layout, robots=ROBOTS, seeds=SEEDS, **sim_kwargs):
+    """Configs sobre un mismo layout (.npz): solo cambian robots y seed."""
+    return [dict(layout=layout, num_robots=nr, seed=seed, **sim_kwargs)
+            for nr in robots for seed in range(seeds)]
+
+
+def run_episode(config):
+    """
+    Corre un episodio headless y devuelve sus métricas en un dict serializable.
+    Con config["profile"], agrega el reporte del perfilador en "profile".
+    """
+    config = dict(config)
+    profile = config.pop("profile", False)
+    search_stats.reset()
+    profiler.reset()
+    if profile:
+        profiler.enable()
+    else:
+        profiler.disable()
+    sim = Simulation(**config)
+    # con layout, el tamaño, las cajas y la capacidad salen del archivo
+    H, W = sim.warehouse.shape
+    layout_keys = dict(width=W, height=H, initial_boxes=int(sim.warehouse.sum()),
+                       pile_capacity=int(sim.occupancy.capacity.max(initial=0)))
+
+    t0 = time.perf_counter()
+    sim.run()
+    wall_s = time.perf_counter() - t0
+
+    result = dict(layout_keys, **config)
+    result.update(sim.summary())
+    result.update(
+        ticks_to_completion=sim.tick if sim.success else None,
+        delivered_per_tick=sim.occupancy.delivered / sim.tick if sim.tick else 0.0,
+        search_calls=search_stats.calls,
+        search_expanded=search_stats.expanded,
+        field_builds=sim.fields.computed if sim.fields else 0,
+        wall_s=wall_s,
+        wall_ms_per_tick=1000.0 * wall_s / sim.tick if sim.tick else 0.0,
+    )
+    if profile:
+        result["profile"] = profiler.report()
+    return result
+
+
+def format_row(res):
+    return (
+        f"{res['width']}x{res['height']:<4} boxes={res['initial_boxes']:<4} "
+        f"robots={res['num_robots']:<4} cap={res['pile_capacity']:<2} seed={res['seed']:<3} "
+        f"ok={int(res['success'])} ticks={res['ticks']:<5} moves={res['total_moves']:<6} "
+        f"deliv/tick={res['delivered_per_tick']:.4f} search={res['search_calls']}/{res['search_expanded']} "
+        f"ms/tick={res['wall_ms_per_tick']:.3f}"
+    )
+
+
+def _pairs(text):
+    return [tuple(int(v) for v in item.split("x")) for item in text.split(",")]
+
+
+def _ints(text):
+    return [int(v) for v in text.split(",")]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark headless del almacén")
+    parser.add_argument("--sizes", type=_pairs, default=SIZES, help="ej. 27x15,41x21")
+    parser.add_argument("--boxes", type=_ints, default=BOXES)
+    parser.add_argument("--robots", type=_ints, default=ROBOTS)
+    parser.add_argument("--capacity", type=_ints, default=CAPACITIES)
+    parser.add_argument("--seeds", type=int, default=SEEDS)
+    parser.add_argument("--time-limit", type=int, default=TIME_LIMIT_TICKS, help="ticks por episodio")
+    parser.add_argument("--pathfinder", default="bfs", choices=["bfs", "astar", "jps", "hpa"])
+    parser.add_argument("--allocation", default="hungarian", choices=["none", "greedy", "auction", "hungarian"],
+                        help="none = búsqueda greedy por robot")
+    parser.add_argument("--no-fields", action="store_true",
+                        help="sin campos de distancia compartidos (O(área) por pick/drop); útil con hpa")
+    parser.add_argument("--path-cache", type=int, default=0,
+                        help="rutas en la caché LRU del pathfinder (0 = sin caché)")
+    parser.add_argument("--cooperative", action="store_true",
+                        help="reservas espacio-tiempo compartidas (WHCA*)")
+    parser.add_argument("--no-deadlock", action="store_true",
+                        help="sin detector de bloqueos (solo el anti-stuck por tiempo)")
+    parser.add_argument("--layout", default=None,
+                        help=".npz de layout.py; reemplaza --sizes/--boxes/--capacity")
+    parser.add_argument("--profile", action="store_true",
+                        help="contadores y tiempos por estado en cada episodio (más lento)")
+    parser.add_argument("--out", default="benchmark_results.json")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="procesos para runner.py (default: todos los núcleos)")
+    args = parser.parse_args(argv)
+    if args.allocation == "none":
+        args.allocation = None
+    return args
+
+
+def build_configs(args):
+    """Configs de episodio a partir de los argumentos de la línea de comandos."""
+    sim_kwargs = dict(
+        time_limit_ticks=args.time_limit, pathfinder=args.pathfinder,
+        allocation=args.allocation, cooperative=args.cooperative, profile=args.profile,
+        shared_fields=not args.no_fields, path_cache=args.path_cache,
+        deadlock=not args.no_deadlock,
+    )
+    if args.layout:
+        return layout_matrix(args.layout, args.robots, args.seeds, **sim_kwargs)
+    return scenario_matrix(
+        args.sizes, args.boxes, args.robots, args.capacity, args.seeds, **sim_kwargs
+    )
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configs = build_configs(args)
+
+    results = []
+    for config in configs:
+        res = run_episode(config)
+        results.append(res)
+        print(format_row(res))
+
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"{len(results)} episodios -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
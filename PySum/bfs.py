@@ -1,6 +1,22 @@
 # bfs.py 
 from collections import deque 
 
+class SearchStats: 
+    """Contadores globales de búsquedas (llamadas y nodos expandidos) para benchmarks.""" 
+
+    def __init__(self): 
+        self.reset() 
+
+    def reset(self): 
+        self.calls = 0 
+        self.expanded = 0 
+
+    def as_dict(self): 
+        return {"calls": self.calls, "expanded": self.expanded} 
+
+
+search_stats = SearchStats() 
+
 def neighbors4(r, c, H, W): 
     for dr, dc in ((1,0),(-1,0),(0,1),(0,-1)): 
         nr, nc = r + dr, c + dc 
@@ -11,23 +27,22 @@ def bfs(start, goals, blocked, warehouse):
     """ 
     start: (r,c) 
     goals: set/list of (r,c) 
-    blocked: set of (r,c) to avoid (robots positions + boxes) 
-    warehouse: matrix (only used for dimensions) 
+    blocked: anything supporting `cell in blocked` (set or Occupancy view); not copied 
+    warehouse: np array of box counts (only used for dimensions) 
     Returns list of cells from next step..goal included, or None 
     """ 
-    H = len(warehouse) 
-    W = len(warehouse[0]) 
+    H, W = warehouse.shape 
     if not goals: 
         return None 
-    goals_set = set(goals) 
+    search_stats.calls += 1 
+    goals_set = goals if isinstance(goals, (set, frozenset)) else set(goals) 
     queue = deque([start]) 
     prev = {start: None} 
-    # allow starting cell even if blocked (so robot can leave) 
-    blocked_local = set(blocked) 
-    if start in blocked_local: 
-        blocked_local.remove(start) 
+    # the starting cell is never tested against blocked (it is already in prev), 
+    # so the robot can always leave it without copying blocked 
     while queue: 
         cur = queue.popleft() 
+        search_stats.expanded += 1 
         if cur in goals_set: 
             # reconstruct path from start to cur (exclusive start) 
             path = [] 
@@ -40,7 +55,7 @@ def bfs(start, goals, blocked, warehouse):
         for nr, nc in neighbors4(cur[0], cur[1], H, W): 
             if (nr, nc) in prev: 
                 continue 
-            if (nr, nc) in blocked_local: 
+            if (nr, nc) in blocked: 
                 continue 
             prev[(nr, nc)] = cur 
             queue.append((nr, nc)) 
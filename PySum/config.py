@@ -0,0 +1,10 @@
+# config.py
+# Constantes compartidas de la simulación (antes repetidas en warehouse.py y robot.py)
+
+GRID_W = 27           # celdas del almacén por defecto
+GRID_H = 15
+CELL = 32             # pixeles por celda
+FPS = 30              # ticks por segundo simulado (= frames de game.py)
+MOVE_SPEED = 3        # pixeles por tick
+STEP_TICKS = -(-CELL // MOVE_SPEED)   # ticks que dura un paso de celda (11)
+PILE_CAPACITY = 5     # cajas máximas por pila destino
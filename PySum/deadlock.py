@@ -0,0 +1,183 @@
+# deadlock.py
+from bfs import neighbors4
+from config import STEP_TICKS
+
+# ticks que tarda un robot en dejar su celda (un paso completo y uno más)
+CLEAR_TICKS = STEP_TICKS + 1
+LOOKAHEAD = 3       # celdas de la ruta del que pasa que el que cede no puede usar
+
+
+class DeadlockDetector:
+    """
+    Grafo de espera por tick: A -> B si la siguiente celda de la ruta de A es la
+    celda actual de B. Como cada robot espera a lo más a otro, el grafo es una
+    función y los ciclos (incluido el choque de frente A <-> B) y las cadenas
+    salen en O(robots).
+
+    - Ciclo: cede el de menor prioridad que tenga una celda libre al lado fuera
+      de la ruta del que viene detrás; el resto del ciclo espera a que se despeje
+      en vez de replanear (replanear todos a la vez es lo que oscila).
+    - Cadena que termina en un robot quieto (sin ruta): si el quieto tiene menor
+      prioridad que el que lo espera, se hace a un lado.
+
+    Prioridad: con caja > sin caja > formando; a igual, menor id (como allowed_map).
+    El anti-stuck de 3 s sigue como último recurso cuando nadie puede moverse.
+
+    Con planner (WHCA*) el paso a un lado se reserva en la tabla espacio-tiempo,
+    así las rutas reservadas de los demás no lo cruzan.
+    """
+
+    def __init__(self, robots, occupancy, scheduler, planner=None):
+        self.robots = robots
+        self.occupancy = occupancy
+        self.scheduler = scheduler
+        self.planner = planner
+        self.open = {}          # incidente -> (tick de detección, robot que espera, su celda)
+        # latencia de los incidentes cerrados: agregados en vez de la lista completa
+        self.latency_count = 0
+        self.latency_sum = 0
+        self.latency_max = 0
+        self.stats = {"deadlock_cycles": 0, "deadlock_chains": 0, "deadlock_yields": 0,
+                      "deadlock_unresolved": 0}
+
+    @staticmethod
+    def priority(rb):
+        """Menor = más prioridad."""
+        return (0 if rb.carrying else (2 if rb.state == "form" else 1), rb.id)
+
+    # ---------------- GRAPH ----------------
+    def wait_for(self):
+        """{robot que espera: robot que le estorba} de los robots que intentan moverse."""
+        sleeping = self.scheduler.sleeping
+        at = {}
+        for rb in self.robots:
+            at[(rb.r, rb.c)] = rb
+        edges = {}
+        f = self.robots[0].fleet if self.robots else None
+        for rb in self.robots:
+            i = rb.i
+            path = f.path[i]
+            if not path or i in sleeping or f.wait_frames[i] > 0:
+                continue
+            other = at.get(tuple(path[0]))
+            if other is not None and other is not rb:
+                edges[rb] = other
+        return edges
+
+    def find(self, edges):
+        """Ciclos (listas en orden de espera) y cadenas (quien espera, robot quieto)."""
+        cycles, chains = [], []
+        state = {}              # robot -> 1 en la pila actual, 2 ya visto
+        for start in edges:
+            if start in state:
+                continue
+            stack = []
+            rb = start
+            while rb in edges and rb not in state:
+                state[rb] = 1
+                stack.append(rb)
+                rb = edges[rb]
+            if rb in state and state[rb] == 1:
+                cycles.append(stack[stack.index(rb):])
+            elif rb not in edges and not rb.path:
+                chains.append((stack[-1], rb))
+            for member in stack:
+                state[member] = 2
+        return cycles, chains
+
+    # ---------------- RESOLUTION ----------------
+    def resolve(self, tick):
+        """Detecta y resuelve en este tick; devuelve cuántos robots cambió."""
+        self._close_resolved(tick)
+        edges = self.wait_for()
+        if not edges:
+            return 0
+        cycles, chains = self.find(edges)
+        changed = 0
+
+        for cycle in cycles:
+            # quien espera a cada miembro: el anterior en el ciclo
+            behind = {cycle[k]: cycle[k - 1] for k in range(len(cycle))}
+            key = frozenset(rb.id for rb in cycle)
+            for rb in sorted(cycle, key=self.priority, reverse=True):
+                if self._step_aside(rb, behind[rb], tick):
+                    self._opened(key, "deadlock_cycles", behind[rb], tick)
+                    # los demás esperan en cadena a que el de adelante avance
+                    waiter, depth = behind[rb], 1
+                    while waiter is not rb:
+                        self._hold(waiter, depth * CLEAR_TICKS, tick)
+                        waiter, depth = behind[waiter], depth + 1
+                    changed += len(cycle)
+                    break
+            else:
+                self._opened(key, "deadlock_cycles", cycle[0], tick)
+                self.stats["deadlock_unresolved"] += 1
+
+        for waiter, blocker in chains:
+            if self.priority(blocker) < self.priority(waiter):
+                continue
+            if self._step_aside(blocker, waiter, tick):
+                self._opened((waiter.id, blocker.id), "deadlock_chains", waiter, tick)
+                self._hold(waiter, CLEAR_TICKS, tick)
+                changed += 2
+        return changed
+
+    def _opened(self, key, counter, rb, tick):
+        """Nuevo incidente: se cierra cuando rb (el que esperaba) cambie de celda."""
+        if key not in self.open:
+            self.open[key] = (tick, rb, (rb.r, rb.c))
+            self.stats[counter] += 1
+
+    def _close_resolved(self, tick):
+        for key, (since, rb, cell) in list(self.open.items()):
+            if (rb.r, rb.c) != cell:
+                del self.open[key]
+                latency = tick - since
+                self.latency_count += 1
+                self.latency_sum += latency
+                self.latency_max = max(self.latency_max, latency)
+
+    def _side_cell(self, rb, waiter):
+        """Celda libre junto a rb que no está en las próximas celdas del que espera."""
+        occ = self.occupancy
+        avoid = set(list(waiter.path)[:LOOKAHEAD]) | {(waiter.r, waiter.c)}
+        if self.planner is not None:
+            return self.planner.step_aside(rb, avoid)
+        H, W = occ.H, occ.W
+        for cell in neighbors4(rb.r, rb.c, H, W):
+            if cell not in avoid and not occ.is_blocked(cell):
+                return cell
+        return None
+
+    def _step_aside(self, rb, waiter, tick):
+        f, i = rb.fleet, rb.i
+        # solo quien está parado en su celda (no a medio paso)
+        if f.moving[i]:
+            return False
+        cell = self._side_cell(rb, waiter)
+        if cell is None:
+            return False
+        self.scheduler.wake(i, tick)
+        rb.path = [cell]
+        rb.wait_frames = 0
+        rb.stuck_frames = 0
+        self.stats["deadlock_yields"] += 1
+        return True
+
+    def _hold(self, rb, ticks, tick):
+        """
+        Espera ticks sin replanear (la ruta sigue igual). Con planner las
+        reservas de la ruta quedarían atrasadas: se sueltan y replanea al final.
+        """
+        if self.planner is not None:
+            self.planner.hold(rb)
+        self.scheduler.wake(rb.i, tick)
+        rb.wait_frames = ticks
+        rb.stuck_frames = 0
+
+    def report(self):
+        stats = dict(self.stats)
+        n = self.latency_count
+        stats["deadlock_latency_mean"] = self.latency_sum / n if n else 0.0
+        stats["deadlock_latency_max"] = self.latency_max
+        return stats
@@ -0,0 +1,211 @@
+# dispatcher.py
+from bfs import neighbors4
+
+
+# ---------------- ASSIGNMENT STRATEGIES ----------------
+# Todas reciben cost[i][j] (robot i, caja j; BIG = inalcanzable)
+# y devuelven una lista de pares (i, j) sin repetir robots ni cajas.
+
+def greedy_assignment(cost, BIG):
+    pairs = sorted(
+        (c, i, j) for i, row in enumerate(cost) for j, c in enumerate(row) if c < BIG
+    )
+    used_i, used_j, result = set(), set(), []
+    for c, i, j in pairs:
+        if i in used_i or j in used_j:
+            continue
+        used_i.add(i)
+        used_j.add(j)
+        result.append((i, j))
+    return result
+
+
+def _transpose(cost):
+    return [list(col) for col in zip(*cost)]
+
+
+def hungarian_assignment(cost, BIG):
+    """Húngaro rectangular O(n^2 m) con potenciales (mínimo costo total)."""
+    n, m = len(cost), len(cost[0])
+    if n > m:
+        return [(i, j) for j, i in hungarian_assignment(_transpose(cost), BIG)]
+
+    INF = float("inf")
+    u = [0] * (n + 1)
+    v = [0] * (m + 1)
+    p = [0] * (m + 1)      # p[j] = fila asignada a la columna j (1-based)
+    way = [0] * (m + 1)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [INF] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            delta = INF
+            j1 = 0
+            row = cost[i0 - 1]
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = row[j - 1] - u[i0] - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while True:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+            if j0 == 0:
+                break
+
+    return [(p[j] - 1, j - 1) for j in range(1, m + 1) if p[j] and cost[p[j] - 1][j - 1] < BIG]
+
+
+def auction_assignment(cost, BIG):
+    """Subasta de Bertsekas (beneficio = BIG - costo, eps = 1/(n+1) => óptima en enteros)."""
+    n, m = len(cost), len(cost[0])
+    if n > m:
+        return [(i, j) for j, i in auction_assignment(_transpose(cost), BIG)]
+
+    eps = 1.0 / (n + 1)
+    price = [0.0] * m
+    owner = [None] * m      # owner[j] = fila que tiene la columna j
+    assigned = [None] * n
+    unassigned = list(range(n))
+    while unassigned:
+        i = unassigned.pop()
+        row = cost[i]
+        best_j, best, second = None, float("-inf"), float("-inf")
+        for j in range(m):
+            value = (BIG - row[j]) - price[j]
+            if value > best:
+                best_j, second, best = j, best, value
+            elif value > second:
+                second = value
+        if second == float("-inf"):
+            second = best
+        price[best_j] += best - second + eps
+        if owner[best_j] is not None:
+            assigned[owner[best_j]] = None
+            unassigned.append(owner[best_j])
+        owner[best_j] = i
+        assigned[i] = best_j
+
+    return [(i, j) for i, j in enumerate(assigned) if j is not None and cost[i][j] < BIG]
+
+
+STRATEGIES = {
+    "greedy": greedy_assignment,
+    "hungarian": hungarian_assignment,
+    "auction": auction_assignment,
+}
+
+
+class Dispatcher:
+    """
+    Asignador central de tareas: cada ronda reparte las cajas sueltas libres
+    entre los robots en "search" (sin repetir caja). Las pilas destino las
+    reparte PileManager (piles.py).
+    El costo robot->caja sale de un BFS desde cada robot que se detiene al
+    encontrar tantas cajas como robots libres hay: en una asignación óptima
+    (o greedy) ningún robot recibe una caja fuera de sus n más cercanas, así
+    que las demás quedan en BIG sin cambiar el resultado. En almacenes grandes
+    el BFS ya no recorre todo el mapa por robot.
+    """
+
+    def __init__(self, occupancy, destination_cells, strategy="hungarian"):
+        self.occupancy = occupancy
+        self.destinations = destination_cells
+        self.strategy = STRATEGIES[strategy]
+        self.BIG = occupancy.H * occupancy.W + 1
+
+        self.box_owner = {}     # caja -> rid
+
+    # ---------------- BOXES ----------------
+    def box_goals(self, box):
+        """Celdas libres (sin pared ni caja) junto a la caja."""
+        occ = self.occupancy
+        return {n for n in neighbors4(box[0], box[1], occ.H, occ.W) if not occ.is_static_blocked(n)}
+
+    def release_box(self, robot):
+        if robot.target_box is not None:
+            if self.box_owner.get(robot.target_box) == robot.id:
+                del self.box_owner[robot.target_box]
+            robot.target_box = None
+
+    def _nearest_boxes(self, start, goal_boxes, k):
+        """
+        BFS por capas desde start sobre paredes + cajas; termina la capa en la que
+        ya van k cajas (los empates a esa distancia también entran).
+        Devuelve {índice de caja: distancia a su celda libre más cercana}.
+        """
+        occ = self.occupancy
+        H, W = occ.H, occ.W
+        found = {}
+        seen = {start}
+        layer = [start]
+        d = 0
+        while layer:
+            for cell in layer:
+                for j in goal_boxes.get(cell, ()):
+                    if j not in found:
+                        found[j] = d
+            if len(found) >= k:
+                break
+            nxt = []
+            for r, c in layer:
+                for n in neighbors4(r, c, H, W):
+                    if n not in seen and not occ.is_static_blocked(n):
+                        seen.add(n)
+                        nxt.append(n)
+            layer = nxt
+            d += 1
+        return found
+
+    def assign(self, robots):
+        occ = self.occupancy
+
+        # soltar reservas de cajas que ya no están sueltas
+        for rb in robots:
+            if rb.target_box is not None and not occ.is_loose_box(rb.target_box):
+                self.release_box(rb)
+
+        idle = [
+            rb for rb in robots
+            if rb.state == "search" and not rb.carrying
+            and rb.target_box is None and rb.wait_frames == 0
+        ]
+        if not idle:
+            return
+        # en orden de celda: el reparto no depende del orden interno del set
+        boxes = sorted(b for b in occ.loose_boxes if b not in self.box_owner)
+        if not boxes:
+            return
+
+        # celda libre junto a cajas -> índices de esas cajas
+        goal_boxes = {}
+        for j, box in enumerate(boxes):
+            for n in self.box_goals(box):
+                goal_boxes.setdefault(n, []).append(j)
+        cost = []
+        for rb in idle:
+            found = self._nearest_boxes((rb.r, rb.c), goal_boxes, len(idle))
+            cost.append([found.get(j, self.BIG) for j in range(len(boxes))])
+
+        for i, j in self.strategy(cost, self.BIG):
+            rb, box = idle[i], boxes[j]
+            rb.target_box = box
+            self.box_owner[box] = rb.id
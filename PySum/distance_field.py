@@ -0,0 +1,103 @@
+# distance_field.py
+from collections import deque
+from bfs import neighbors4
+from profiling import profiler, perf_counter
+
+UNREACHABLE = -1
+
+
+class DistanceField:
+    """
+    Distancias (en pasos) de cada celda al conjunto de metas más cercano,
+    calculadas con un solo BFS multi-fuente desde las metas sobre los
+    obstáculos estáticos (paredes + cajas). Los robots no bloquean el campo.
+    obstacles: máscara booleana H x W (Occupancy.static_mask()).
+    """
+
+    def __init__(self, goals, obstacles):
+        t0 = perf_counter() if profiler.enabled else None
+        H, W = obstacles.shape
+        self.H = H
+        self.W = W
+        self.goals = set(goals)
+        self.dist = [UNREACHABLE] * (H * W)
+        # lista plana: indexar una lista es más rápido que un arreglo numpy celda por celda
+        solid = obstacles.ravel().tolist()
+
+        queue = deque()
+        for r, c in self.goals:
+            self.dist[r * W + c] = 0
+            queue.append((r, c))
+
+        dist = self.dist
+        while queue:
+            r, c = queue.popleft()
+            d = dist[r * W + c] + 1
+            # vecinos 4 en línea (más rápido que neighbors4 en el ciclo caliente)
+            for nr, nc in ((r + 1, c), (r - 1, c), (r, c + 1), (r, c - 1)):
+                if not (0 <= nr < H and 0 <= nc < W):
+                    continue
+                i = nr * W + nc
+                if dist[i] != UNREACHABLE or solid[i]:
+                    continue
+                dist[i] = d
+                queue.append((nr, nc))
+
+        if t0 is not None:
+            profiler.count("field_build")
+            profiler.add_time("field_build", perf_counter() - t0)
+
+    def distance(self, cell):
+        return self.dist[cell[0] * self.W + cell[1]]
+
+    def path_from(self, start):
+        """
+        Baja por el gradiente desde start hasta una meta.
+        Mismo formato que bfs(): celdas desde el siguiente paso hasta la meta, o None.
+        """
+        d = self.distance(start)
+        if d == UNREACHABLE:
+            return None
+
+        path = []
+        r, c = start
+        while d > 0:
+            for nr, nc in neighbors4(r, c, self.H, self.W):
+                if self.dist[nr * self.W + nc] == d - 1:
+                    r, c = nr, nc
+                    break
+            path.append((r, c))
+            d -= 1
+        return path
+
+
+class DistanceFieldCache:
+    """
+    Campos de distancia compartidos por todos los robots.
+    Cada campo se guarda por clave ("boxes", ("drop", pile), ...) junto con
+    occupancy.version; se recalcula solo cuando una caja se recoge o se deja.
+    """
+
+    def __init__(self, occupancy):
+        self.occupancy = occupancy
+        self.version = occupancy.version
+        self.fields = {}      # key -> DistanceField
+        self.computed = 0     # cuántos BFS multi-fuente se han hecho
+
+    def get(self, key, goals):
+        # cualquier cambio de cajas/pilas invalida todos los campos
+        if self.occupancy.version != self.version:
+            self.version = self.occupancy.version
+            self.fields.clear()
+
+        field = self.fields.get(key)
+        if field is None:
+            field = DistanceField(goals, self.occupancy.static_mask())
+            self.fields[key] = field
+            self.computed += 1
+        return field
+
+    def path(self, key, goals, start):
+        if not goals:
+            return None
+        return self.get(key, goals).path_from(start)
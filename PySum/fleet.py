@@ -0,0 +1,145 @@
+# fleet.py
+import random
+from array import array
+from collections import deque
+from bfs import bfs
+from config import CELL, STEP_TICKS
+from piles import PileManager
+
+
+class Fleet:
+    """
+    Estado de todos los robots en columnas compactas (struct-of-arrays).
+    Robot es solo una vista (fleet, índice); posiciones, contadores y banderas
+    viven en array.array, las rutas en deques y la configuración compartida
+    (ocupación, campos, pathfinder, dispatcher...) se guarda una sola vez aquí.
+
+    Movimiento por eventos: un paso de celda guarda destino y ticks de salida y
+    llegada (move_t0, move_t1); la celda lógica cambia en move_t1 y los pixeles
+    solo se calculan al pedirlos (pixel(), Robot.x / Robot.y) para dibujar.
+    """
+
+    def __init__(self, occupancy, destination_cells, fields=None, pathfinder=bfs,
+                 rng=random, dispatcher=None, planner=None, piles=None):
+        # configuración compartida por todos los robots
+        self.occupancy = occupancy
+        self.warehouse = occupancy.warehouse
+        self.walls = occupancy.walls
+        self.destinations = destination_cells
+        self.fields = fields
+        self.pathfinder = pathfinder
+        self.rng = rng
+        self.dispatcher = dispatcher
+        self.planner = planner
+        self.now = 0            # tick en curso (lo pone Simulation.step)
+        # sin PileManager de la simulación (robot suelto), uno propio
+        self.piles = piles if piles is not None else PileManager(occupancy, destination_cells)
+
+        # columnas por robot
+        self.ids = array("i")
+        self.r = array("i")
+        self.c = array("i")
+        self.moving = bytearray()      # 1 = en un paso de celda
+        self.to_r = array("i")          # celda destino del paso
+        self.to_c = array("i")
+        self.move_t0 = array("q")       # tick en que empezó el paso
+        self.move_t1 = array("q")       # tick en que llega (cambia la celda lógica)
+        self.last_r = array("i")
+        self.last_c = array("i")
+        self.wait_frames = array("i")
+        self.stuck_frames = array("i")
+        self.moves = array("q")
+        self.carrying = bytearray()
+        self.state = []
+        self.path = []          # deque de celdas por robot
+        self.target_box = []
+        self.target_pile = []
+        self.color = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append(self, rid, r, c, color):
+        """Agrega las columnas de un robot nuevo y devuelve su índice."""
+        i = len(self.ids)
+        self.ids.append(rid)
+        self.r.append(r)
+        self.c.append(c)
+        self.moving.append(0)
+        self.to_r.append(r)
+        self.to_c.append(c)
+        self.move_t0.append(0)
+        self.move_t1.append(0)
+        self.last_r.append(r)
+        self.last_c.append(c)
+        self.wait_frames.append(0)
+        self.stuck_frames.append(0)
+        self.moves.append(0)
+        self.carrying.append(0)
+        self.state.append("search")
+        self.path.append(deque())
+        self.target_box.append(None)
+        self.target_pile.append(None)
+        self.color.append(color)
+        return i
+
+    # ---------------- MOVEMENT ----------------
+    def start_move(self, i, nr, nc, tick):
+        """Empieza un paso hacia (nr, nc); devuelve el tick de llegada."""
+        self.moving[i] = 1
+        self.to_r[i], self.to_c[i] = nr, nc
+        self.move_t0[i] = tick
+        self.move_t1[i] = tick + STEP_TICKS - 1
+        return self.move_t1[i]
+
+    def move_of(self, i):
+        """(destino_r, destino_c, t0, t1) del paso en curso, o None."""
+        if not self.moving[i]:
+            return None
+        return (self.to_r[i], self.to_c[i], self.move_t0[i], self.move_t1[i])
+
+    def entering(self, cell):
+        """Índice del robot que va a medio paso hacia cell, o None."""
+        r, c = cell
+        moving, to_r, to_c = self.moving, self.to_r, self.to_c
+        for i in range(len(moving)):
+            if moving[i] and to_r[i] == r and to_c[i] == c:
+                return i
+        return None
+
+    def cancel_move(self, i):
+        """Deja el paso en curso: el robot se queda en su celda (y ahí se dibuja)."""
+        self.moving[i] = 0
+
+    def pixel(self, i, t=None):
+        """(x, y) en pixeles en el tick t (acepta fracciones; default: tick en curso)."""
+        return interpolate(self.r[i], self.c[i], self.move_of(i), self.now if t is None else t)
+
+
+def interpolate(r, c, move, t):
+    """
+    Pixeles de un robot en la celda (r, c) con el paso move = (destino_r,
+    destino_c, t0, t1) o None. Avanza parejo y llega justo en t1, como cuando
+    safe_move sumaba MOVE_SPEED pixeles por tick.
+    """
+    if move is None:
+        return (c * CELL, r * CELL)
+    tr, tc, t0, t1 = move
+    frac = (t - t0 + 1) / (t1 - t0 + 1)
+    frac = 0.0 if frac < 0 else (1.0 if frac > 1 else frac)
+    return ((c + (tc - c) * frac) * CELL, (r + (tr - r) * frac) * CELL)
+
+
+def _column(name, doc=None):
+    def fget(self):
+        return getattr(self.fleet, name)[self.i]
+
+    def fset(self, value):
+        getattr(self.fleet, name)[self.i] = value
+    return property(fget, fset, doc=doc)
+
+
+def _shared(name):
+    def fget(self):
+        return getattr(self.fleet, name)
+    return property(fget)
@@ -0,0 +1,372 @@
+# hierarchical.py
+import heapq
+from collections import deque
+from bfs import search_stats
+from pathfinding import astar, default_heuristic
+
+CLUSTER_SIZE = 16       # lado de cada cluster en celdas
+ENTRANCE_SPACING = 4    # en tramos libres largos, una entrada cada tantas celdas
+LOCAL_RADIUS = 1        # clusters alrededor del inicio en la búsqueda local que ve robots
+UNREACHABLE = -1
+
+START = "start"         # nodos virtuales de la búsqueda abstracta
+GOAL = "goal"
+
+
+class Cluster:
+    """Bloque rectangular de la rejilla con sus entradas y campos internos."""
+
+    __slots__ = ("key", "r0", "r1", "c0", "c1", "w", "entrances", "fields", "edges")
+
+    def __init__(self, key, r0, r1, c0, c1):
+        self.key = key
+        self.r0, self.r1, self.c0, self.c1 = r0, r1, c0, c1
+        self.w = c1 - c0
+        self.entrances = set()
+        self.fields = {}    # entrada -> distancias dentro del cluster (lista plana)
+        self.edges = {}     # entrada -> [(otra entrada, costo)]
+
+    def index(self, cell):
+        return (cell[0] - self.r0) * self.w + (cell[1] - self.c0)
+
+    def contains(self, cell):
+        return self.r0 <= cell[0] < self.r1 and self.c0 <= cell[1] < self.c1
+
+    def reset(self):
+        self.fields.clear()
+        self.edges.clear()
+
+
+class HierarchicalPathfinder:
+    """
+    HPA*: la rejilla se parte en clusters de cluster_size x cluster_size. Entre
+    clusters vecinos, cada tramo libre del borde da entradas (una al centro o varias
+    repartidas si es largo); dentro de
+    cada cluster las distancias entre entradas salen de un BFS acotado al cluster
+    (paredes + cajas) que se guarda por entrada y se calcula la primera vez que se usa.
+
+    Una consulta busca con A* sobre ese grafo abstracto: el inicio se conecta con
+    un BFS local (su cluster y los vecinos) que sí respeta `blocked`, y cada cluster
+    con metas se conecta al nodo meta con un BFS multi-fuente desde sus metas.
+    Luego la ruta abstracta se refina bajando por los campos de cada cluster, así
+    el costo crece con los clusters recorridos y no con el área del almacén.
+    Los robots que la ruta refinada pisa más adelante se rodean con A* local; si
+    alguno no tiene rodeo, la consulta termina con A* hacia las metas.
+
+    Se llama igual que bfs() y devuelve el mismo formato. Cuando una caja aparece o
+    desaparece de una celda (occupancy.static_since()), solo se rehacen los bordes
+    de ese cluster y los campos de él y de sus vecinos.
+    """
+
+    def __init__(self, occupancy, cluster_size=CLUSTER_SIZE):
+        self.occupancy = occupancy
+        self.H, self.W = occupancy.H, occupancy.W
+        self.size = cluster_size
+        self.rows = (self.H + cluster_size - 1) // cluster_size
+        self.cols = (self.W + cluster_size - 1) // cluster_size
+
+        self.clusters = {}
+        for ci in range(self.rows):
+            for cj in range(self.cols):
+                r0, c0 = ci * cluster_size, cj * cluster_size
+                self.clusters[(ci, cj)] = Cluster(
+                    (ci, cj), r0, min(r0 + cluster_size, self.H), c0, min(c0 + cluster_size, self.W)
+                )
+
+        self.borders = {}       # ("h"|"v", ci, cj) -> [(celda de este lado, celda del otro)]
+        self.cross = {}         # entrada -> set de entradas vecinas en otro cluster
+        for ci, cj in self.clusters:
+            if cj + 1 < self.cols:
+                self._rebuild_border(("h", ci, cj))
+            if ci + 1 < self.rows:
+                self._rebuild_border(("v", ci, cj))
+        for cluster in self.clusters.values():
+            self._collect_entrances(cluster)
+
+        occupancy.watch_static(self)
+        self.stats = {"hpa_queries": 0, "hpa_abstract_expanded": 0, "hpa_refreshed_clusters": 0,
+                      "hpa_detours": 0, "hpa_fallbacks": 0}
+
+    # ---------------- ABSTRACT GRAPH ----------------
+    def cluster_of(self, cell):
+        return self.clusters[(cell[0] // self.size, cell[1] // self.size)]
+
+    def _solid(self, cell):
+        return self.occupancy.is_static_blocked(cell)
+
+    def _border_cells(self, border):
+        """Pares (a, b) frente a frente a lo largo de un borde."""
+        kind, ci, cj = border
+        a = self.clusters[(ci, cj)]
+        if kind == "h":
+            ca = a.c1 - 1
+            return [((r, ca), (r, ca + 1)) for r in range(a.r0, a.r1)]
+        ra = a.r1 - 1
+        return [((ra, c), (ra + 1, c)) for c in range(a.c0, a.c1)]
+
+    def _rebuild_border(self, border):
+        for a, b in self.borders.get(border, ()):
+            self.cross[a].discard(b)
+            self.cross[b].discard(a)
+
+        pairs = []
+        run = []
+        for a, b in self._border_cells(border) + [(None, None)]:
+            if a is not None and not self._solid(a) and not self._solid(b):
+                run.append((a, b))
+                continue
+            if run:
+                # tramo corto: una entrada al centro; largo: repartidas de punta a punta
+                # (solo en las puntas, todas las rutas se amontonan en las mismas celdas)
+                if len(run) <= ENTRANCE_SPACING:
+                    pairs.append(run[len(run) // 2])
+                else:
+                    pairs.extend(run[::ENTRANCE_SPACING])
+                    if (len(run) - 1) % ENTRANCE_SPACING:
+                        pairs.append(run[-1])
+                run = []
+        self.borders[border] = pairs
+        for a, b in pairs:
+            self.cross.setdefault(a, set()).add(b)
+            self.cross.setdefault(b, set()).add(a)
+
+    def _cluster_borders(self, cluster):
+        ci, cj = cluster.key
+        return [("h", ci, cj), ("h", ci, cj - 1), ("v", ci, cj), ("v", ci - 1, cj)]
+
+    def _collect_entrances(self, cluster):
+        cluster.entrances = {
+            cell
+            for border in self._cluster_borders(cluster)
+            for pair in self.borders.get(border, ())
+            for cell in pair
+            if cluster.contains(cell)
+        }
+        cluster.reset()
+
+    def refresh(self):
+        """Aplica los cambios de cajas pendientes: solo toca los clusters afectados."""
+        changes = self.occupancy.static_since(self)
+        if not changes:
+            return
+        dirty = {self.cluster_of(cell).key for cell in changes}
+
+        touched = set()
+        for key in dirty:
+            for border in self._cluster_borders(self.clusters[key]):
+                if border in self.borders:
+                    self._rebuild_border(border)
+            ci, cj = key
+            touched.update(((ci, cj), (ci, cj - 1), (ci, cj + 1), (ci - 1, cj), (ci + 1, cj)))
+        for key in touched:
+            if key in self.clusters:
+                self._collect_entrances(self.clusters[key])
+        self.stats["hpa_refreshed_clusters"] += len(dirty)
+
+    # ---------------- CLUSTER SEARCH ----------------
+    def _field(self, cluster, sources, blocked=None):
+        """
+        BFS acotado al cluster desde sources. Sin blocked usa paredes + cajas;
+        con blocked, la celda inicial no se revisa (como bfs()).
+        """
+        dist = [UNREACHABLE] * ((cluster.r1 - cluster.r0) * cluster.w)
+        queue = deque()
+        for cell in sources:
+            dist[cluster.index(cell)] = 0
+            queue.append(cell)
+        solid = self._solid if blocked is None else blocked.__contains__
+        r0, r1, c0, c1, w = cluster.r0, cluster.r1, cluster.c0, cluster.c1, cluster.w
+        while queue:
+            r, c = queue.popleft()
+            search_stats.expanded += 1
+            d = dist[(r - r0) * w + (c - c0)] + 1
+            for nr, nc in ((r + 1, c), (r - 1, c), (r, c + 1), (r, c - 1)):
+                if not (r0 <= nr < r1 and c0 <= nc < c1):
+                    continue
+                i = (nr - r0) * w + (nc - c0)
+                if dist[i] != UNREACHABLE or solid((nr, nc)):
+                    continue
+                dist[i] = d
+                queue.append((nr, nc))
+        return dist
+
+    def _entrance_edges(self, cluster, entrance):
+        edges = cluster.edges.get(entrance)
+        if edges is None:
+            field = cluster.fields[entrance] = self._field(cluster, [entrance])
+            edges = []
+            for other in cluster.entrances:
+                d = field[cluster.index(other)]
+                if other != entrance and d != UNREACHABLE:
+                    edges.append((other, d))
+            cluster.edges[entrance] = edges
+        return edges
+
+    @staticmethod
+    def _descend(cluster, field, cell):
+        """Celdas desde cell bajando por field hasta su fuente (cell excluida)."""
+        path = []
+        r, c = cell
+        d = field[cluster.index(cell)]
+        while d > 0:
+            for nr, nc in ((r + 1, c), (r - 1, c), (r, c + 1), (r, c - 1)):
+                if cluster.contains((nr, nc)) and field[cluster.index((nr, nc))] == d - 1:
+                    r, c = nr, nc
+                    break
+            path.append((r, c))
+            d -= 1
+        return path
+
+    # ---------------- QUERY ----------------
+    def __call__(self, start, goals, blocked, warehouse=None):
+        """Misma firma y formato que bfs(): celdas desde el siguiente paso hasta la meta, o None."""
+        if not goals:
+            return None
+        self.refresh()
+        search_stats.calls += 1
+        self.stats["hpa_queries"] += 1
+        goals_set = goals if isinstance(goals, (set, frozenset)) else set(goals)
+        if start in goals_set:
+            return []
+
+        # metas por cluster; las que están sobre paredes, cajas o en blocked no
+        # cuentan (bfs() tampoco entra en ellas)
+        by_cluster = {}
+        for g in goals_set:
+            if not self._solid(g) and g not in blocked:
+                by_cluster.setdefault(self.cluster_of(g).key, []).append(g)
+        if not by_cluster:
+            return None
+        goal_fields = {}
+
+        # inicio: BFS local en una ventana de clusters que sí respeta blocked
+        # (robots incluidos); tamaño fijo, no depende del almacén
+        home, inside = self._window(start)
+        local = self._field(home, [start], blocked)
+
+        h = default_heuristic(goals_set)
+        g_cost = {START: 0}
+        prev = {START: None}
+        counter = 0
+        heap = []
+
+        def push(node, cost, parent):
+            nonlocal counter
+            if cost < g_cost.get(node, cost + 1):
+                g_cost[node] = cost
+                prev[node] = parent
+                counter += 1
+                # a igual f se prefiere el nodo más profundo (como astar())
+                heapq.heappush(heap, (cost + (0 if node == GOAL else h(node)), -cost, counter, node))
+
+        direct = None
+        for key in inside:
+            for e in self.clusters[key].entrances:
+                d = local[home.index(e)]
+                if d != UNREACHABLE:
+                    push(e, d, START)
+            # metas dentro de la ventana, alcanzables sin salir de ella
+            for g in by_cluster.get(key, ()):
+                d = local[home.index(g)]
+                if d != UNREACHABLE and (direct is None or d < g_cost[GOAL]):
+                    direct = g
+                    push(GOAL, d, START)
+
+        closed = set()
+        while heap:
+            _, neg_cost, _, node = heapq.heappop(heap)
+            cost = -neg_cost
+            if node in closed:
+                continue
+            self.stats["hpa_abstract_expanded"] += 1
+            if node == GOAL:
+                path = self._refine(start, prev, local, home, goal_fields, direct)
+                repaired = self._repair(start, path, blocked)
+                if repaired is None:
+                    # los robots cortan la ruta abstracta: A* exacto con todas las metas
+                    self.stats["hpa_fallbacks"] += 1
+                    goals_left = [g for goals in by_cluster.values() for g in goals]
+                    return astar(start, goals_left, blocked, self.occupancy.warehouse)
+                return repaired
+            closed.add(node)
+
+            cluster = self.cluster_of(node)
+            for other, d in self._entrance_edges(cluster, node):
+                if other not in closed:
+                    push(other, cost + d, node)
+            for other in self.cross.get(node, ()):
+                if other not in closed:
+                    push(other, cost + 1, node)
+
+            if cluster.key in by_cluster:
+                field = goal_fields.get(cluster.key)
+                if field is None:
+                    field = goal_fields[cluster.key] = self._field(cluster, by_cluster[cluster.key])
+                d = field[cluster.index(node)]
+                if d != UNREACHABLE:
+                    push(GOAL, cost + d, node)
+        return None
+
+    def _window(self, start):
+        """Rectángulo (como Cluster) de los clusters a LOCAL_RADIUS del inicio, y sus llaves."""
+        ci, cj = start[0] // self.size, start[1] // self.size
+        i0, i1 = max(ci - LOCAL_RADIUS, 0), min(ci + LOCAL_RADIUS, self.rows - 1)
+        j0, j1 = max(cj - LOCAL_RADIUS, 0), min(cj + LOCAL_RADIUS, self.cols - 1)
+        a, b = self.clusters[(i0, j0)], self.clusters[(i1, j1)]
+        window = Cluster(None, a.r0, b.r1, a.c0, b.c1)
+        return window, [(i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1)]
+
+    def _refine(self, start, prev, local, home, goal_fields, direct):
+        """Convierte la ruta abstracta (START, entradas..., GOAL) en celdas paso a paso."""
+        nodes = []
+        node = GOAL
+        while node is not None:
+            nodes.append(node)
+            node = prev[node]
+        nodes.reverse()
+
+        path = []
+        for a, b in zip(nodes, nodes[1:]):
+            if a == START:
+                # tramo local: de b hacia el inicio por el BFS local, al revés
+                target = direct if b == GOAL else b
+                if target != start:
+                    seg = self._descend(home, local, target)
+                    seg.reverse()
+                    path.extend(seg[1:] + [target])
+            elif b == GOAL:
+                cluster = self.cluster_of(a)
+                path.extend(self._descend(cluster, goal_fields[cluster.key], a))
+            elif not self.cluster_of(a).contains(b):
+                # paso entre clusters vecinos
+                path.append(b)
+            else:
+                cluster = self.cluster_of(a)
+                seg = self._descend(cluster, cluster.fields[a], b)
+                seg.reverse()
+                path.extend(seg[1:] + [b])
+        return path
+
+    def _repair(self, start, path, blocked):
+        """
+        Fuera de la ventana local el refinado solo ve paredes + cajas: cada tramo
+        que pisa algo de blocked (robots) se rodea con un A* corto hasta la siguiente
+        celda libre de la ruta. Si algún tramo no tiene rodeo, devuelve None.
+        """
+        i = 0
+        while i < len(path):
+            if path[i] not in blocked:
+                i += 1
+                continue
+            j = i
+            while j < len(path) and path[j] in blocked:
+                j += 1
+            if j == len(path):
+                return None
+            self.stats["hpa_detours"] += 1
+            detour = astar(path[i - 1] if i else start, {path[j]}, blocked, self.occupancy.warehouse)
+            if detour is None:
+                return None
+            path[i:j + 1] = detour
+            i += len(detour)
+        return path
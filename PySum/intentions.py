@@ -0,0 +1,144 @@
+# intentions.py
+from robot import STUCK_FRAMES, DENIED, HOLD
+
+
+class IntentionResolver:
+    """
+    Fase de movimiento por lotes: junta los movimientos de todos los robots que
+    de verdad se van a mover en el tick y los resuelve juntos con el estado del
+    inicio del tick, así el resultado ya no depende del orden de los update().
+
+    - Un paso ya empezado está comprometido: su destino queda apartado y su
+      celda de origen se vacía al llegar.
+    - Vértice: varios quieren la misma celda libre. Gana el de menor id.
+    - Cadena: se puede entrar a la celda de otro robot si ese robot sale en la
+      misma dirección (ya va a medio paso o su paso quedó concedido); se sigue
+      la cadena hasta una celda libre o un robot que no se mueve. Si el de
+      adelante gira, su cuerpo tapa la esquina hasta llegar, así que se espera.
+    - Intercambio A <-> B: ninguno pasa (se cruzarían). Tampoco hay rotaciones:
+      en una rejilla todo ciclo gira.
+
+    resolve() devuelve allowed_map {celda: id del robot que entra o DENIED};
+    safe_move() confía en la concesión (no vuelve a revisar robots) y el que
+    no la tiene replanea como antes. Con reservas WHCA* la ruta puede cambiar
+    dentro del update(), así que ahí no se siguen cadenas.
+    """
+
+    def __init__(self, robots, occupancy, scheduler, planner=None):
+        self.robots = robots
+        self.occupancy = occupancy
+        self.scheduler = scheduler
+        self.follow = planner is None
+        self.stats = {"steps_granted": 0, "steps_followed": 0, "steps_held": 0,
+                      "vertex_conflicts": 0,
+                      "swap_conflicts": 0, "chain_denied": 0}
+
+    def _moving(self, rb):
+        """¿update() de este tick llegaría a safe_move() con path[0]? (mismos cortes que update)"""
+        f, i = rb.fleet, rb.i
+        if f.wait_frames[i] > 0:
+            return False
+        r, c = f.r[i], f.c[i]
+        if r == f.last_r[i] and c == f.last_c[i] and f.stuck_frames[i] + 1 >= STUCK_FRAMES:
+            return False            # entra el anti-stuck en vez de moverse
+        nr, nc = f.path[i][0]
+        return abs(nr - r) + abs(nc - c) <= 1
+
+    @staticmethod
+    def _same_direction(rb, cell, other, target):
+        """¿El de adelante avanza en la misma dirección? Solo así nunca se enciman."""
+        return (cell[0] - rb.r == target[0] - other.r) and (cell[1] - rb.c == target[1] - other.c)
+
+    def resolve(self):
+        occ = self.occupancy
+        awake = self.scheduler.awake
+        stats = self.stats
+
+        # ---------------- INTENTIONS ----------------
+        movers = {}         # robot -> celda destino (pasos nuevos de este tick)
+        stepping = {}       # robot -> celda destino (pasos ya en curso: comprometidos)
+        for rb in self.robots:
+            f, i = rb.fleet, rb.i
+            if f.moving[i]:
+                stepping[rb] = (f.to_r[i], f.to_c[i])
+            elif f.path[i] and i in awake and self._moving(rb):
+                movers[rb] = tuple(f.path[i][0])
+        taken = set(stepping.values())
+
+        # ---------------- VERTEX ----------------
+        by_cell = {}
+        for rb, target in movers.items():
+            by_cell.setdefault(target, []).append(rb)
+        allowed_map = {cell: DENIED for cell in taken}
+        winners = {}        # celda -> robot que la gana
+        for cell, lst in by_cell.items():
+            if len(lst) > 1:
+                stats["vertex_conflicts"] += 1
+            if cell not in taken:
+                winners[cell] = min(lst, key=lambda rb: rb.id)
+
+        # ---------------- CHAINS ----------------
+        # cada ganador apunta al robot que hoy está en su destino (o a nadie)
+        at = {}
+        for rb in self.robots:
+            cell = (rb.r, rb.c)
+            at[cell] = None if cell in at else rb      # dos en la celda: no se sigue
+        granted = dict.fromkeys(stepping, True)     # robot -> True/False/HOLD
+        leader = {}
+        targets = dict(stepping)
+        targets.update(movers)
+        for cell, rb in winners.items():
+            own = (rb.r, rb.c)
+            if cell == own:
+                granted[rb] = True                  # alinearse en su propia celda
+            elif occ.is_static_blocked(cell):
+                granted[rb] = False
+            elif cell not in at:
+                granted[rb] = True                  # celda libre
+            else:
+                other = at[cell]
+                leaving = other in stepping or (other in movers and winners.get(movers[other]) is other)
+                if not self.follow or other is None or not leaving:
+                    granted[rb] = False             # el de adelante no sale en este tick
+                    stats["chain_denied"] += 1
+                elif targets[other] == own:
+                    granted[rb] = False             # intercambio: se cruzarían
+                    stats["swap_conflicts"] += 1
+                else:
+                    leader[rb] = other
+
+        # cada cadena termina en alguien ya decidido o se cierra en un ciclo (nadie pasa)
+        for start in leader:
+            chain = []
+            seen = set()
+            rb = start
+            while rb not in granted and rb not in seen:
+                chain.append(rb)
+                seen.add(rb)
+                rb = leader[rb]
+            result = granted.get(rb, False)
+            for member in reversed(chain):
+                if result is True and not self._same_direction(member, movers[member], leader[member],
+                                                               targets[leader[member]]):
+                    # el de adelante gira: su cuerpo tapa la esquina hasta que llegue
+                    result = HOLD
+                granted[member] = result
+                if result is False:
+                    stats["chain_denied"] += 1
+
+        for cell, rb in winners.items():
+            result = granted[rb]
+            if result is True:
+                allowed_map[cell] = rb.id
+                stats["steps_granted"] += 1
+                if rb in leader:
+                    stats["steps_followed"] += 1
+            elif result is HOLD:
+                allowed_map[cell] = HOLD
+                stats["steps_held"] += 1
+            else:
+                allowed_map[cell] = DENIED
+        return allowed_map
+
+    def report(self):
+        return dict(self.stats)
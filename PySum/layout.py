@@ -0,0 +1,197 @@
+# layout.py
+import argparse
+import json
+import random
+import numpy as np
+from config import GRID_W, GRID_H, PILE_CAPACITY
+from warehouse import wall_mask, check_capacity
+
+ZONES = ("bottom", "left", "right")
+
+
+class LayoutConfig:
+    """
+    Parámetros del generador de almacenes.
+    - width, height: celdas, bordes incluidos (hasta miles por lado)
+    - initial_boxes: cajas sueltas al inicio (una por celda)
+    - shelf_spacing: cada cuántas columnas hay un estante (0 = sin estantes)
+    - shelf_width: columnas de ancho de cada estante
+    - shelf_length: filas seguidas de estante antes de un pasillo cruzado
+    - margin: pasillo libre entre el borde y los estantes
+    - zones: zonas destino ("bottom" = fila de piso, "left"/"right" = columnas)
+    - pile_capacity: capacidad por defecto; zone_capacity la cambia por zona
+    La fila 1 queda reservada para formar al final (sin pilas).
+    """
+
+    def __init__(self, width=GRID_W, height=GRID_H, initial_boxes=30, shelf_spacing=0,
+                 shelf_width=1, shelf_length=6, margin=2, zones=("bottom",),
+                 pile_capacity=PILE_CAPACITY, zone_capacity=None):
+        self.width = width
+        self.height = height
+        self.initial_boxes = initial_boxes
+        self.shelf_spacing = shelf_spacing
+        self.shelf_width = shelf_width
+        self.shelf_length = shelf_length
+        self.margin = margin
+        self.zones = tuple(zones)
+        self.pile_capacity = check_capacity(pile_capacity)
+        self.zone_capacity = {zone: check_capacity(cap) for zone, cap in (zone_capacity or {}).items()}
+        for zone in self.zones:
+            if zone not in ZONES:
+                raise ValueError(f"zona desconocida: {zone} (usa {', '.join(ZONES)})")
+
+    def as_dict(self):
+        d = dict(vars(self))
+        d["zones"] = list(self.zones)
+        return d
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(**d)
+
+
+class Layout:
+    """
+    Almacén listo para Simulation(layout=...):
+    walls (bool H x W), boxes (uint8 H x W), destinations (lista ordenada de pilas)
+    y capacity (uint8 H x W, 0 fuera de las pilas; a lo más MAX_PILE_CAPACITY).
+    """
+
+    def __init__(self, walls, boxes, destinations, capacity, config=None):
+        self.walls = walls
+        self.boxes = boxes
+        self.destinations = [(int(r), int(c)) for r, c in destinations]
+        self.capacity = capacity
+        self.config = config
+
+    @property
+    def shape(self):
+        return self.boxes.shape
+
+
+# ---------------- GENERATOR ----------------
+def _zone_cells(zone, H, W):
+    if zone == "bottom":
+        return [(H - 2, c) for c in range(1, W - 1)]
+    # columnas laterales: sin tocar la fila de formar ni la esquina de la fila de piso
+    col = 1 if zone == "left" else W - 2
+    return [(r, col) for r in range(3, H - 3)]
+
+
+def _shelves(config, H, W):
+    """Estantes verticales con pasillos cruzados; dejan libre el margen junto al borde."""
+    mask = np.zeros((H, W), dtype=bool)
+    if config.shelf_spacing <= 0:
+        return mask
+    m = config.margin + 1                   # +1 por la pared del borde
+    top, bottom = m, H - m - 2              # abajo: fila de piso y pasillo para dejar cajas
+    left, right = m, W - m
+    if bottom <= top or right <= left:
+        return mask
+
+    period = config.shelf_length + 1        # estante + una fila de pasillo cruzado
+    rows = np.arange(top, bottom)
+    rows = rows[(rows - top) % period < config.shelf_length]
+    for c0 in range(left, right, config.shelf_spacing):
+        cols = np.arange(c0, min(c0 + config.shelf_width, right))
+        mask[np.ix_(rows, cols)] = True
+    return mask
+
+
+def generate_layout(config=None, rng=random):
+    """Genera un Layout a partir de un LayoutConfig; rng = random.Random con seed."""
+    config = config or LayoutConfig()
+    H, W = config.height, config.width
+    walls = wall_mask(H, W) | _shelves(config, H, W)
+
+    destinations = []
+    capacity = np.zeros((H, W), dtype=np.uint8)
+    for zone in config.zones:
+        cap = config.zone_capacity.get(zone, config.pile_capacity)
+        for cell in _zone_cells(zone, H, W):
+            if not walls[cell] and not capacity[cell]:
+                destinations.append(cell)
+                capacity[cell] = cap
+
+    # cajas: celdas libres que no son pila ni tocan una (las pilas quedan alcanzables)
+    dest = capacity > 0
+    near = dest.copy()
+    near[1:, :] |= dest[:-1, :]
+    near[:-1, :] |= dest[1:, :]
+    near[:, 1:] |= dest[:, :-1]
+    near[:, :-1] |= dest[:, 1:]
+    candidates = np.flatnonzero(~walls & ~near)
+
+    boxes = np.zeros((H, W), dtype=np.uint8)
+    n = min(config.initial_boxes, candidates.size)
+    picked = candidates[rng.sample(range(candidates.size), n)] if n else candidates[:0]
+    boxes.flat[picked] = 1
+    return Layout(walls, boxes, destinations, capacity, config)
+
+
+# ---------------- FILES ----------------
+def save_layout(layout, path):
+    """npz comprimido: se carga rápido aun con miles de celdas por lado."""
+    np.savez_compressed(
+        path,
+        walls=layout.walls,
+        boxes=layout.boxes,
+        capacity=layout.capacity,
+        destinations=np.array(layout.destinations, dtype=np.int32).reshape(-1, 2),
+        config=np.array(json.dumps(layout.config.as_dict() if layout.config else None)),
+    )
+
+
+def load_layout(path):
+    with np.load(path) as data:
+        config = json.loads(str(data["config"]))
+        capacity = data["capacity"]
+        destinations = data["destinations"].tolist()
+        for r, c in destinations:
+            check_capacity(capacity[r, c])
+        return Layout(
+            data["walls"].astype(bool),
+            data["boxes"].astype(np.uint8),
+            destinations,
+            capacity.astype(np.uint8),
+            LayoutConfig.from_dict(config) if config else None,
+        )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Genera un almacén y lo guarda en .npz")
+    parser.add_argument("out")
+    parser.add_argument("--width", type=int, default=GRID_W)
+    parser.add_argument("--height", type=int, default=GRID_H)
+    parser.add_argument("--boxes", type=int, default=30)
+    parser.add_argument("--shelf-spacing", type=int, default=0, help="0 = sin estantes")
+    parser.add_argument("--shelf-width", type=int, default=1)
+    parser.add_argument("--shelf-length", type=int, default=6)
+    parser.add_argument("--margin", type=int, default=2)
+    parser.add_argument("--zones", default="bottom", help="ej. bottom,left,right")
+    parser.add_argument("--capacity", type=int, default=PILE_CAPACITY)
+    parser.add_argument("--zone-capacity", default="", help="ej. left=3,right=8")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    zone_capacity = {}
+    for item in filter(None, args.zone_capacity.split(",")):
+        zone, cap = item.split("=")
+        zone_capacity[zone] = int(cap)
+    config = LayoutConfig(
+        args.width, args.height, args.boxes, shelf_spacing=args.shelf_spacing,
+        shelf_width=args.shelf_width, shelf_length=args.shelf_length, margin=args.margin,
+        zones=args.zones.split(","), pile_capacity=args.capacity, zone_capacity=zone_capacity,
+    )
+    layout = generate_layout(config, random.Random(args.seed))
+    save_layout(layout, args.out)
+    H, W = layout.shape
+    print(f"{W}x{H} paredes={int(layout.walls.sum())} cajas={int(layout.boxes.sum())} "
+          f"pilas={len(layout.destinations)} -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
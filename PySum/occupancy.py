@@ -0,0 +1,200 @@
+# occupancy.py
+import numpy as np
+from bfs import neighbors4
+from warehouse import cells_of, destination_mask, capacity_mask, PILE_CAPACITY
+from profiling import profiler
+
+REGION_SIZE = 8     # lado de las regiones con contador de versión propio
+
+
+class Occupancy:
+    """
+    Índice compartido de celdas ocupadas (paredes, cajas y robots).
+    Se actualiza solo cuando se recoge/deja una caja o un robot cambia de celda,
+    así los robots ya no reconstruyen sets de bloqueados recorriendo toda la rejilla.
+    """
+
+    def __init__(self, warehouse, wall_mask, destination_cells=(), pile_capacity=PILE_CAPACITY):
+        self.warehouse = warehouse          # np.uint8 H x W
+        self.H, self.W = warehouse.shape
+        self.wall_mask = wall_mask          # np.bool_ H x W
+        self.dest_mask = destination_mask(destination_cells, warehouse.shape)
+        # capacidad por pila (entero para todas o arreglo H x W); 0 fuera de las pilas
+        self.capacity = capacity_mask(destination_cells, warehouse.shape, pile_capacity)
+
+        # sets para consultas por celda (r, c) en O(1) desde BFS y robots
+        self.walls = cells_of(wall_mask)
+        self.destinations = set(destination_cells)
+        self.boxes = cells_of(warehouse > 0)
+
+        # cajas sueltas (fuera de las pilas destino) y celdas libres junto a ellas
+        self.loose_boxes = cells_of(self.loose_mask())
+        self.box_goals = cells_of(self.box_goal_mask())
+
+        # sube en cada pick/drop; invalida cachés que dependen de las cajas
+        self.version = 0
+        self.delivered = 0      # cajas dejadas en pilas destino
+        # celdas que pasaron de libres a caja o al revés, en orden; cada consumidor
+        # se registra con watch_static() y lee con static_since() (refrescos locales
+        # en vez de invalidar todo). Solo se guarda lo que alguno no ha leído.
+        self.static_version = 0         # cambios totales desde el inicio
+        self.static_changes = []        # los últimos, hasta static_version
+        self.static_readers = {}        # consumidor -> static_version de su última lectura
+        # versión por región de REGION_SIZE x REGION_SIZE: sube cuando una caja
+        # aparece o desaparece dentro; las cachés por ruta solo miran las suyas
+        self.region_cols = (self.W + REGION_SIZE - 1) // REGION_SIZE
+        self.region_version = [0] * (((self.H + REGION_SIZE - 1) // REGION_SIZE) * self.region_cols)
+
+        self.robot_cells = {}   # rid -> (r, c)
+        self.robot_count = {}   # (r, c) -> robots en la celda
+
+        # vistas para BFS (no copian nada)
+        self.static = StaticBlocked(self)   # paredes + cajas
+        self.all = AllBlocked(self)         # paredes + cajas + robots
+
+    # ---------------- BOXES ----------------
+    def pick(self, r, c):
+        self.warehouse[r, c] -= 1
+        self.version += 1
+        if self.warehouse[r, c] == 0:
+            self._static_changed((r, c))
+            self.boxes.discard((r, c))
+            self.loose_boxes.discard((r, c))
+            self._refresh_around((r, c))
+
+    def drop(self, r, c):
+        self.warehouse[r, c] += 1
+        self.version += 1
+        if (r, c) in self.destinations:
+            self.delivered += 1
+        if (r, c) not in self.boxes:
+            self._static_changed((r, c))
+            self.boxes.add((r, c))
+            if (r, c) not in self.destinations:
+                self.loose_boxes.add((r, c))
+            self._refresh_around((r, c))
+
+    def _static_changed(self, cell):
+        self.static_version += 1
+        if self.static_readers:
+            self.static_changes.append(cell)
+        self.region_version[self.region_of(cell)] += 1
+
+    def watch_static(self, reader):
+        """Registra reader: static_since(reader) devuelve los cambios desde ahora."""
+        self.static_readers[reader] = self.static_version
+
+    def static_since(self, reader):
+        """
+        Celdas que cambiaron desde la última lectura de reader. Recorta de
+        static_changes lo que ya leyeron todos los consumidores.
+        """
+        changes = self.static_changes
+        base = self.static_version - len(changes)
+        cells = changes[self.static_readers[reader] - base:]
+        self.static_readers[reader] = self.static_version
+        oldest = min(self.static_readers.values())
+        if oldest > base:
+            del changes[:oldest - base]
+        return cells
+
+    def region_of(self, cell):
+        return (cell[0] // REGION_SIZE) * self.region_cols + cell[1] // REGION_SIZE
+
+    def has_room(self, pile):
+        return self.warehouse[pile] < self.capacity[pile]
+
+    def is_loose_box(self, cell):
+        return cell in self.loose_boxes
+
+    def _refresh_goal(self, cell):
+        """Una celda es meta de búsqueda si está libre y toca alguna caja suelta."""
+        if cell not in self.walls and cell not in self.boxes:
+            for n in neighbors4(cell[0], cell[1], self.H, self.W):
+                if n in self.loose_boxes:
+                    self.box_goals.add(cell)
+                    return
+        self.box_goals.discard(cell)
+
+    def _refresh_around(self, cell):
+        self._refresh_goal(cell)
+        for n in neighbors4(cell[0], cell[1], self.H, self.W):
+            self._refresh_goal(n)
+
+    # ---------------- ROBOTS ----------------
+    def add_robot(self, rid, cell):
+        self.robot_cells[rid] = cell
+        self.robot_count[cell] = self.robot_count.get(cell, 0) + 1
+
+    def move_robot(self, rid, cell):
+        old = self.robot_cells[rid]
+        if old == cell:
+            return
+        n = self.robot_count[old] - 1
+        if n:
+            self.robot_count[old] = n
+        else:
+            del self.robot_count[old]
+        self.add_robot(rid, cell)
+
+    def other_robot_at(self, cell, rid):
+        """¿Hay otro robot (distinto de rid) en la celda?"""
+        n = self.robot_count.get(cell, 0)
+        if self.robot_cells.get(rid) == cell:
+            n -= 1
+        return n > 0
+
+    # ---------------- MASKS ----------------
+    def static_mask(self):
+        """Paredes + cajas, como máscara booleana."""
+        if profiler.enabled:
+            profiler.count("grid_scan")
+        return self.wall_mask | (self.warehouse > 0)
+
+    def loose_mask(self):
+        """Cajas fuera de las pilas destino."""
+        if profiler.enabled:
+            profiler.count("grid_scan")
+        return (self.warehouse > 0) & ~self.dest_mask
+
+    def box_goal_mask(self):
+        """Celdas libres con al menos una caja suelta en sus 4 vecinos."""
+        loose = self.loose_mask()
+        near = np.zeros_like(loose)
+        near[1:, :] |= loose[:-1, :]
+        near[:-1, :] |= loose[1:, :]
+        near[:, 1:] |= loose[:, :-1]
+        near[:, :-1] |= loose[:, 1:]
+        return near & ~self.static_mask()
+
+    # ---------------- QUERIES ----------------
+    def is_static_blocked(self, cell):
+        return cell in self.walls or cell in self.boxes
+
+    def is_blocked(self, cell):
+        return cell in self.walls or cell in self.boxes or cell in self.robot_count
+
+
+class StaticBlocked:
+    """Vista 'cell in blocked' de paredes + cajas."""
+
+    def __init__(self, occupancy):
+        self.occupancy = occupancy
+
+    def __contains__(self, cell):
+        occ = self.occupancy
+        return cell in occ.walls or cell in occ.boxes
+
+
+class AllBlocked:
+    """
+    Vista 'cell in blocked' de paredes + cajas + robots.
+    La celda propia del robot que planea no importa: BFS nunca revisa el inicio.
+    """
+
+    def __init__(self, occupancy):
+        self.occupancy = occupancy
+
+    def __contains__(self, cell):
+        occ = self.occupancy
+        return cell in occ.walls or cell in occ.boxes or cell in occ.robot_count
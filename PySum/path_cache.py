@@ -0,0 +1,135 @@
+# path_cache.py
+from collections import OrderedDict
+
+CACHE_SIZE = 4096          # rutas guardadas antes de desalojar la menos usada
+MAX_CACHED_GOALS = 64      # conjuntos de metas más grandes (búsqueda de cajas) no se guardan
+ROUTES_PER_GOALS = 8       # rutas recientes por conjunto de metas donde buscar un sufijo
+
+
+class PathCache:
+    """
+    Caché LRU delante de un pathfinder (bfs, astar, jps o hpa), con la misma firma.
+    La llave es (inicio, metas); cada ruta guarda la versión de las regiones de
+    Occupancy que cruza, así un pick/drop solo invalida las rutas que pasan por
+    la región donde cambió una caja.
+    Si no hay ruta con ese inicio pero el inicio está sobre una ruta reciente hacia
+    las mismas metas (el robot ya iba por ella), se devuelve el resto de esa ruta.
+    Al reusar una ruta también se revisa contra `blocked` (robots): si algún robot
+    la pisa se recalcula, para que un replan por choque no devuelva la misma ruta.
+    Las metas inalcanzables solo con paredes + cajas también se recuerdan, hasta
+    el siguiente cambio de cajas en cualquier parte.
+    """
+
+    def __init__(self, pathfinder, occupancy, size=CACHE_SIZE):
+        self.pathfinder = pathfinder
+        self.occupancy = occupancy
+        self.size = size
+        # (inicio, metas) -> (ruta, ((región, versión), ...), {celda: posición})
+        self.entries = OrderedDict()
+        self.by_goals = {}             # metas -> llaves de las rutas más recientes
+        self.unreachable = {}          # (inicio, metas) -> static_version al fallar
+        self.stats = {"path_cache_hits": 0, "path_cache_suffix_hits": 0, "path_cache_misses": 0,
+                      "path_cache_stale": 0, "path_cache_evictions": 0}
+
+    def __call__(self, start, goals, blocked, warehouse):
+        if len(goals) > MAX_CACHED_GOALS:
+            return self.pathfinder(start, goals, blocked, warehouse)
+        goals_key = frozenset(goals)
+        if start in goals_key:
+            return []
+
+        stats = self.stats
+        key = (start, goals_key)
+        static = blocked is self.occupancy.static
+        changes = self.occupancy.static_version
+        if static and self.unreachable.get(key) == changes:
+            stats["path_cache_hits"] += 1
+            return None
+
+        entry = self.entries.get(key)
+        if entry is not None:
+            route, regions, _ = entry
+            if self._valid(route, regions, blocked):
+                self.entries.move_to_end(key)
+                stats["path_cache_hits"] += 1
+                return list(route)
+            self._discard(key)
+            stats["path_cache_stale"] += 1
+        else:
+            route = self._suffix(start, goals_key, blocked)
+            if route is not None:
+                stats["path_cache_hits"] += 1
+                stats["path_cache_suffix_hits"] += 1
+                return route
+
+        stats["path_cache_misses"] += 1
+        route = self.pathfinder(start, goals, blocked, warehouse)
+        if route:
+            self._store(key, route)
+        elif route is None and static:
+            if len(self.unreachable) >= self.size:
+                self.unreachable.clear()
+            self.unreachable[key] = changes
+        return route
+
+    def _suffix(self, start, goals_key, blocked):
+        for key in reversed(self.by_goals.get(goals_key, ())):
+            route, regions, index = self.entries[key]
+            pos = index.get(start)
+            if pos is None:
+                continue
+            rest = route[pos + 1:]
+            if rest and self._valid(rest, regions, blocked):
+                self.entries.move_to_end(key)
+                return list(rest)
+        return None
+
+    def _store(self, key, route):
+        route = tuple(route)
+        self.entries[key] = (route, self._regions(route), {cell: i for i, cell in enumerate(route)})
+        recent = self.by_goals.setdefault(key[1], [])
+        recent.append(key)
+        if len(recent) > ROUTES_PER_GOALS:
+            del recent[0]
+        if len(self.entries) > self.size:
+            self._discard(next(iter(self.entries)))
+            self.stats["path_cache_evictions"] += 1
+
+    def _discard(self, key):
+        del self.entries[key]
+        recent = self.by_goals.get(key[1])
+        if recent and key in recent:
+            recent.remove(key)
+            if not recent:
+                del self.by_goals[key[1]]
+
+    def _regions(self, route):
+        occ = self.occupancy
+        region_of, version = occ.region_of, occ.region_version
+        seen = {}
+        for cell in route:
+            region = region_of(cell)
+            if region not in seen:
+                seen[region] = version[region]
+        return tuple(seen.items())
+
+    def _valid(self, route, regions, blocked):
+        version = self.occupancy.region_version
+        for region, v in regions:
+            if version[region] != v:
+                return False
+        # paredes y cajas ya quedaron cubiertas por las versiones
+        if blocked is self.occupancy.static:
+            return True
+        return not any(cell in blocked for cell in route)
+
+    def clear(self):
+        self.entries.clear()
+        self.by_goals.clear()
+        self.unreachable.clear()
+
+    def report(self):
+        stats = dict(self.stats)
+        lookups = stats["path_cache_hits"] + stats["path_cache_misses"]
+        stats["path_cache_hit_rate"] = stats["path_cache_hits"] / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,204 @@
+# pathfinding.py
+import heapq
+from bfs import bfs, neighbors4, search_stats
+
+# metas a partir de las cuales la heurística por defecto usa la caja envolvente
+NEAREST_GOALS_LIMIT = 64
+
+
+# ---------------- HEURISTICS ----------------
+def manhattan_nearest(goals):
+    """h(cell) = Manhattan a la meta más cercana. Exacta pero O(metas) por nodo."""
+    goals = list(goals)
+
+    def h(cell):
+        r, c = cell
+        return min(abs(r - gr) + abs(c - gc) for gr, gc in goals)
+    return h
+
+
+def goal_bbox(goals):
+    """h(cell) = Manhattan a la caja envolvente de las metas. O(1), más débil."""
+    rows = [g[0] for g in goals]
+    cols = [g[1] for g in goals]
+    r0, r1, c0, c1 = min(rows), max(rows), min(cols), max(cols)
+
+    def h(cell):
+        r, c = cell
+        dr = r0 - r if r < r0 else (r - r1 if r > r1 else 0)
+        dc = c0 - c if c < c0 else (c - c1 if c > c1 else 0)
+        return dr + dc
+    return h
+
+
+def default_heuristic(goals):
+    if len(goals) <= NEAREST_GOALS_LIMIT:
+        return manhattan_nearest(goals)
+    return goal_bbox(goals)
+
+
+def _reconstruct(prev, node, start):
+    path = []
+    while node != start:
+        path.append(node)
+        node = prev[node]
+    path.reverse()
+    return path
+
+
+# ---------------- A* ----------------
+def astar(start, goals, blocked, warehouse, heuristic=default_heuristic):
+    """
+    A* sobre la rejilla 4-conectada. Misma firma y formato que bfs():
+    blocked se consulta con `cell in blocked` sin copiarse;
+    heuristic(goals) devuelve h(cell) admisible.
+    Returns list of cells from next step..goal included, or None
+    """
+    H, W = warehouse.shape
+    if not goals:
+        return None
+    search_stats.calls += 1
+    goals_set = goals if isinstance(goals, (set, frozenset)) else set(goals)
+    h = heuristic(goals_set)
+
+    g = {start: 0}
+    prev = {start: None}
+    counter = 0
+    # (f, -g, orden, celda): a igual f se prefiere el nodo más profundo
+    heap = [(h(start), 0, counter, start)]
+    closed = set()
+
+    while heap:
+        _, neg_g, _, cur = heapq.heappop(heap)
+        if cur in closed:
+            continue
+        search_stats.expanded += 1
+        if cur in goals_set:
+            return _reconstruct(prev, cur, start)
+        closed.add(cur)
+
+        ng = -neg_g + 1
+        for nxt in neighbors4(cur[0], cur[1], H, W):
+            if nxt in closed or nxt in blocked:
+                continue
+            if ng < g.get(nxt, ng + 1):
+                g[nxt] = ng
+                prev[nxt] = cur
+                counter += 1
+                heapq.heappush(heap, (ng + h(nxt), -ng, counter, nxt))
+    return None
+
+
+# ---------------- JUMP POINT SEARCH ----------------
+def jps(start, goals, blocked, warehouse, heuristic=default_heuristic):
+    """
+    Jump Point Search para rejillas 4-conectadas y abiertas.
+    Orden canónico: los movimientos verticales revisan a izquierda y derecha en
+    cada celda; los horizontales solo giran en vecinos forzados (celda arriba/abajo
+    libre cuya vecina de atrás está bloqueada). Devuelve el mismo formato que bfs().
+    """
+    H, W = warehouse.shape
+    if not goals:
+        return None
+    search_stats.calls += 1
+    goals_set = goals if isinstance(goals, (set, frozenset)) else set(goals)
+    if start in goals_set:
+        return []
+    h = heuristic(goals_set)
+
+    def free(r, c):
+        return 0 <= r < H and 0 <= c < W and (r, c) not in blocked
+
+    def jump_h(r, c, dc):
+        # avanza en horizontal hasta meta, vecino forzado o pared
+        while True:
+            c += dc
+            if not free(r, c):
+                return None
+            if (r, c) in goals_set:
+                return (r, c)
+            for dr in (-1, 1):
+                if free(r + dr, c) and not free(r + dr, c - dc):
+                    return (r, c)
+
+    def jump_v(r, c, dr):
+        # avanza en vertical; es punto de salto si un barrido horizontal encuentra algo
+        while True:
+            r += dr
+            if not free(r, c):
+                return None
+            if (r, c) in goals_set:
+                return (r, c)
+            if jump_h(r, c, 1) or jump_h(r, c, -1):
+                return (r, c)
+
+    def successors(node, parent):
+        r, c = node
+        if parent is None:
+            dirs = ((0, 1), (0, -1), (1, 0), (-1, 0))
+        else:
+            dr = (r > parent[0]) - (r < parent[0])
+            dc = (c > parent[1]) - (c < parent[1])
+            if dr:
+                # llegó en vertical: sigue, o gira a los lados
+                dirs = ((dr, 0), (0, 1), (0, -1))
+            else:
+                # llegó en horizontal: sigue, más los vecinos forzados
+                dirs = [(0, dc)]
+                for vr in (-1, 1):
+                    if free(r + vr, c) and not free(r + vr, c - dc):
+                        dirs.append((vr, 0))
+        for dr, dc in dirs:
+            if dr:
+                jp = jump_v(r, c, dr)
+            else:
+                jp = jump_h(r, c, dc)
+            if jp is not None:
+                yield jp
+
+    g = {start: 0}
+    prev = {start: None}
+    counter = 0
+    heap = [(h(start), 0, counter, start)]
+    closed = set()
+
+    while heap:
+        _, neg_g, _, cur = heapq.heappop(heap)
+        if cur in closed:
+            continue
+        search_stats.expanded += 1
+        if cur in goals_set:
+            return _expand_jumps(_reconstruct(prev, cur, start), start)
+        closed.add(cur)
+
+        for jp in successors(cur, prev[cur]):
+            if jp in closed:
+                continue
+            ng = -neg_g + abs(jp[0] - cur[0]) + abs(jp[1] - cur[1])
+            if ng < g.get(jp, ng + 1):
+                g[jp] = ng
+                prev[jp] = cur
+                counter += 1
+                heapq.heappush(heap, (ng + h(jp), -ng, counter, jp))
+    return None
+
+
+def _expand_jumps(jump_points, start):
+    """Convierte la lista de puntos de salto en celdas paso a paso."""
+    path = []
+    r, c = start
+    for jr, jc in jump_points:
+        dr = (jr > r) - (jr < r)
+        dc = (jc > c) - (jc < c)
+        while (r, c) != (jr, jc):
+            r += dr
+            c += dc
+            path.append((r, c))
+    return path
+
+
+PATHFINDERS = {
+    "bfs": bfs,
+    "astar": astar,
+    "jps": jps,
+}
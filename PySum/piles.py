@@ -0,0 +1,128 @@
+# piles.py
+from bisect import bisect_left, insort
+from bfs import neighbors4
+from profiling import profiler
+
+SPREAD = 4      # celdas extra que "cuesta" cada robot que ya va hacia una pila
+
+
+class PileManager:
+    """
+    Zona destino: carga y reservas por pila, para dar a cada robot con caja la
+    mejor pila desde su celda sin recorrer todas.
+
+    Las pilas se agrupan en carriles (una fila o una columna de pilas, según
+    cuál tenga más); cada carril guarda ordenadas las coordenadas de sus pilas
+    con lugar libre (capacidad - cajas - reservas > 0). Una consulta hace
+    bisect en cada carril y solo abre hacia los lados mientras la distancia
+    todavía puede ganarle a la mejor: O(carriles * log n) en los almacenes
+    generados (una fila de piso y a lo más dos columnas).
+
+    Costo = Manhattan + SPREAD * robots en camino, así los robots se reparten
+    entre pilas cercanas en vez de hacer fila en la misma.
+    """
+
+    def __init__(self, occupancy, destination_cells):
+        self.occupancy = occupancy
+        self.order = {pile: k for k, pile in enumerate(destination_cells)}
+        self.reserved = dict.fromkeys(self.order, 0)   # pila -> cajas en camino
+        self.owner = {}                                # rid -> pila reservada
+
+        rows, cols = {}, {}
+        for r, c in destination_cells:
+            rows[r] = rows.get(r, 0) + 1
+            cols[c] = cols.get(c, 0) + 1
+        # carril -> coordenadas ordenadas de las pilas abiertas;
+        # (0, r) = fila r (coordenada c), (1, c) = columna c (coordenada r)
+        self.lane_of = {}
+        self.lanes = {}
+        self.open = set()
+        for pile in destination_cells:
+            r, c = pile
+            lane = (0, r) if rows[r] >= cols[c] else (1, c)
+            self.lane_of[pile] = lane
+            self.lanes.setdefault(lane, [])
+            self._update(pile)
+
+    # ---------------- STATE ----------------
+    def free(self, pile):
+        occ = self.occupancy
+        return int(occ.capacity[pile]) - int(occ.warehouse[pile]) - self.reserved[pile]
+
+    def _update(self, pile):
+        """Mete o saca la pila de su carril según le quede lugar."""
+        is_open = pile in self.open
+        if self.free(pile) > 0:
+            if not is_open:
+                self.open.add(pile)
+                insort(self.lanes[self.lane_of[pile]], self._coord(pile))
+        elif is_open:
+            self.open.discard(pile)
+            lane = self.lanes[self.lane_of[pile]]
+            del lane[bisect_left(lane, self._coord(pile))]
+
+    def _coord(self, pile):
+        return pile[1] if self.lane_of[pile][0] == 0 else pile[0]
+
+    def adjacent(self, pile):
+        """Celdas libres (sin pared ni caja) junto a la pila."""
+        occ = self.occupancy
+        return {n for n in neighbors4(pile[0], pile[1], occ.H, occ.W) if not occ.is_static_blocked(n)}
+
+    # ---------------- QUERIES ----------------
+    def best(self, cell):
+        """(celdas junto a la pila, pila) de menor costo desde cell, o (set(), None)."""
+        if profiler.enabled:
+            profiler.count("pile_query")
+        r, c = cell
+        best, best_key, stale = None, None, []
+        for (axis, fixed), coords in self.lanes.items():
+            if not coords:
+                continue
+            if axis == 0:
+                across, along = abs(fixed - r), c
+            else:
+                across, along = abs(fixed - c), r
+            if best_key is not None and across > best_key[0]:
+                continue
+            start = bisect_left(coords, along)
+            # hacia la izquierda/arriba y hacia la derecha/abajo desde la celda
+            for lo, hi, step in ((start - 1, -1, -1), (start, len(coords), 1)):
+                for k in range(lo, hi, step):
+                    x = coords[k]
+                    d = across + abs(x - along)
+                    if best_key is not None and d > best_key[0]:
+                        break
+                    pile = (fixed, x) if axis == 0 else (x, fixed)
+                    if self.free(pile) <= 0:
+                        stale.append(pile)      # se llenó sin reserva (drop directo)
+                        continue
+                    key = (d + SPREAD * self.reserved[pile], self.order[pile])
+                    if best_key is None or key < best_key:
+                        adj = self.adjacent(pile)
+                        if adj:
+                            best, best_key = (adj, pile), key
+        for pile in stale:
+            self._update(pile)
+        return best if best is not None else (set(), None)
+
+    # ---------------- RESERVATIONS ----------------
+    def reserve(self, robot):
+        """
+        Suelta la reserva anterior del robot y reserva la mejor pila desde su celda.
+        Devuelve (celdas_libres_adyacentes, pila) o (set(), None).
+        """
+        self.release(robot)
+        adj, pile = self.best((robot.r, robot.c))
+        if pile is not None:
+            self.owner[robot.id] = pile
+            self.reserved[pile] += 1
+            self._update(pile)
+        return adj, pile
+
+    def release(self, robot):
+        """Al dejar la caja (o cambiar de pila) la reserva vuelve a ser lugar libre."""
+        pile = self.owner.pop(robot.id, None)
+        if pile is not None:
+            self.reserved[pile] -= 1
+            self._update(pile)
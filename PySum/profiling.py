@@ -0,0 +1,130 @@
+# profiling.py
+import time
+from bfs import search_stats
+
+WORST_TICKS = 10        # ticks más lentos en el reporte
+
+perf_counter = time.perf_counter
+
+
+class Profiler:
+    """
+    Contadores y tiempos del ciclo caliente. Apagado por defecto: los puntos de
+    medición solo revisan `profiler.enabled` (una lectura de atributo), así que
+    sin perfilar el costo es prácticamente nulo.
+    Encendido, cada tick produce un snapshot (conteos, tiempos, nodos expandidos)
+    que queda en `last` hasta el siguiente, y report() agrega todo el episodio:
+    totales, tiempo por estado del robot y los ticks más lentos con lo que pasó
+    en ellos.
+
+    Conteos: plan / plan_failed / path_cells (búsquedas de ruta), field_build,
+    grid_scan (máscaras de toda la rejilla en Occupancy), pile_query,
+    replan_blocked (safe_move bloqueado), stuck y update:<estado>.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        self.counts = {}        # nombre -> conteo del episodio
+        self.times = {}         # nombre -> segundos del episodio
+        self.ticks = 0
+        self.worst = []         # (segundos, snapshot) de los ticks más lentos
+        self.last = None        # snapshot del último tick cerrado
+        self._tick = None
+        self._tick_counts = {}
+        self._tick_times = {}
+        self._tick_t0 = 0.0
+        self._tick_expanded = 0
+
+    # ---------------- HOOKS ----------------
+    def count(self, name, n=1):
+        self.counts[name] = self.counts.get(name, 0) + n
+        self._tick_counts[name] = self._tick_counts.get(name, 0) + n
+
+    def add_time(self, name, seconds):
+        self.times[name] = self.times.get(name, 0.0) + seconds
+        self._tick_times[name] = self._tick_times.get(name, 0.0) + seconds
+
+    def state_update(self, state, seconds):
+        """Un Robot.update() que empezó en `state`."""
+        self.count("update:" + state)
+        self.add_time("update:" + state, seconds)
+
+    def plan(self, seconds, route):
+        self.count("plan")
+        self.add_time("plan", seconds)
+        if route is None:
+            self.count("plan_failed")
+        else:
+            self.count("path_cells", len(route))
+
+    # ---------------- TICKS ----------------
+    def begin_tick(self, tick):
+        self._tick = tick
+        self._tick_counts = {}
+        self._tick_times = {}
+        self._tick_expanded = search_stats.expanded
+        self._tick_t0 = perf_counter()
+
+    def end_tick(self):
+        """Cierra el tick y devuelve su snapshot."""
+        elapsed = perf_counter() - self._tick_t0
+        expanded = search_stats.expanded - self._tick_expanded
+        self.ticks += 1
+        self.times["tick"] = self.times.get("tick", 0.0) + elapsed
+        if expanded:
+            self.counts["expanded"] = self.counts.get("expanded", 0) + expanded
+        snapshot = {
+            "tick": self._tick,
+            "ms": 1000.0 * elapsed,
+            "expanded": expanded,
+            "counts": self._tick_counts,
+            "ms_by": {k: 1000.0 * v for k, v in self._tick_times.items()},
+        }
+        self.last = snapshot
+
+        worst = self.worst
+        if len(worst) < WORST_TICKS or elapsed > worst[-1][0]:
+            worst.append((elapsed, snapshot))
+            worst.sort(key=lambda item: -item[0])
+            del worst[WORST_TICKS:]
+        return snapshot
+
+    # ---------------- REPORT ----------------
+    def report(self):
+        total = self.times.get("tick", 0.0)
+        states = {}
+        for name, n in self.counts.items():
+            if name.startswith("update:"):
+                state = name[len("update:"):]
+                secs = self.times.get(name, 0.0)
+                states[state] = {
+                    "updates": n,
+                    "ms": 1000.0 * secs,
+                    "us_per_update": 1e6 * secs / n if n else 0.0,
+                    "share": secs / total if total else 0.0,
+                }
+        plans = self.counts.get("plan", 0)
+        return {
+            "ticks": self.ticks,
+            "ms_total": 1000.0 * total,
+            "ms_per_tick": 1000.0 * total / self.ticks if self.ticks else 0.0,
+            "states": states,
+            "counts": {k: v for k, v in self.counts.items() if not k.startswith("update:")},
+            "ms_by": {k: 1000.0 * v for k, v in self.times.items()
+                      if k != "tick" and not k.startswith("update:")},
+            "mean_path_cells": self.counts.get("path_cells", 0) / plans if plans else 0.0,
+            "worst_ticks": [snap for _, snap in self.worst],
+        }
+
+
+# perfilador global (como search_stats): enable()/reset() desde benchmark o game
+profiler = Profiler()
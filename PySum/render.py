@@ -0,0 +1,226 @@
+# render.py
+import numpy as np
+import pygame
+from config import CELL, FPS
+from assets import assets as shared_assets
+
+GRID_COLOR = (70, 70, 70)
+SHELF_COLOR = (90, 70, 50)
+CARRY_COLOR = (150, 90, 40)
+TIMER_POS = (8, 8)
+
+
+class Renderer:
+    """
+    Observer de pygame para Simulation: dibuja la escena después de cada step().
+    La simulación no sabe nada de pygame; se conecta con sim.add_observer(renderer).
+
+    Render por rectángulos sucios: el fondo con la rejilla se compone una vez
+    (static_layer) y los números de cada pila se renderizan una sola vez por valor.
+    Cada frame solo se repintan las celdas cuyo conteo de cajas cambió o que
+    cubre un robot (antes o ahora), y se manda pygame.display.update(rects).
+    """
+
+    def __init__(self, sim, assets=None):
+        self.sim = sim
+        self.assets = assets or shared_assets
+        H, W = sim.warehouse.shape
+        self.width = W * CELL
+        self.height = H * CELL
+
+        pygame.init()
+        self.screen = pygame.display.set_mode((self.width, self.height))
+
+        # capa estática: fondo + rejilla, compuesta una sola vez
+        # (copia: la imagen escalada del cache se comparte)
+        self.static_layer = self.assets.image("scenario.jpg", (self.width, self.height), alpha=False).copy()
+        for r in range(H):
+            for c in range(W):
+                pygame.draw.rect(self.static_layer, GRID_COLOR, (c * CELL, r * CELL, CELL, CELL), 1)
+        # paredes internas (estantes de layout.py); el borde ya viene en el fondo
+        walls = getattr(sim, "wall_mask", None)
+        if walls is not None:
+            for r, c in np.argwhere(walls[1:-1, 1:-1]) + 1:
+                pygame.draw.rect(self.static_layer, SHELF_COLOR, (c * CELL, r * CELL, CELL, CELL))
+
+        # sprites compartidos (uno por tamaño de celda)
+        self.box_img = self.assets.image("box.png", (CELL, CELL))
+
+        self.font_small = pygame.font.SysFont(None, 20)
+        self.font_big = pygame.font.SysFont(None, 36)
+
+        self.glyphs = {}             # conteo de la pila -> superficie del número
+        self.full_redraw = True
+        self.prev_boxes = sim.warehouse.copy()
+        self.prev_robots = {}        # rid -> (x, y, carrying) del último frame
+        self.timer_text = None
+        self.timer_img = None
+        self.timer_rect = pygame.Rect(TIMER_POS, (0, 0))
+
+    def __call__(self, sim):
+        rects = self.draw_scene()
+        if rects is None:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
+
+    # ---------------- CACHES ----------------
+    def glyph(self, count):
+        img = self.glyphs.get(count)
+        if img is None:
+            img = self.font_small.render(str(count), True, (0, 0, 0))
+            self.glyphs[count] = img
+        return img
+
+    def _update_timer(self):
+        """Rerenderiza el texto del timer solo cuando cambia el segundo."""
+        sim = self.sim
+        elapsed_s = sim.tick // FPS
+        total_s = sim.time_limit_ticks // FPS
+        text = f"Timer: {elapsed_s}s / {total_s}s"
+        if text == self.timer_text:
+            return False
+        self.timer_text = text
+        self.timer_img = self.font_small.render(text, True, (255, 255, 255))
+        return True
+
+    # ---------------- DRAW ----------------
+    def draw_cell(self, r, c):
+        x = c * CELL
+        y = r * CELL
+        self.screen.blit(self.static_layer, (x, y), (x, y, CELL, CELL))
+
+        count = int(self.sim.warehouse[r, c])
+        if count > 0:
+            # dibujar la caja
+            self.screen.blit(self.box_img, (x, y))
+
+            # número de cajas (centrado)
+            txt = self.glyph(count)
+            tx = x + CELL // 2 - txt.get_width() // 2
+            ty = y + CELL // 2 - txt.get_height() // 2
+            self.screen.blit(txt, (tx, ty))
+
+    def draw_robot(self, rb):
+        # variante teñida con el color del robot, compartida por color
+        img = self.assets.tinted("robot.png", (CELL, CELL), rb.color)
+        self.screen.blit(img, (int(rb.x), int(rb.y)))
+
+        if rb.carrying:
+            margin = 3
+            rect = pygame.Rect(int(rb.x), int(rb.y), CELL, CELL)
+            pygame.draw.rect(self.screen, CARRY_COLOR, rect, margin)
+
+    def _cells_under(self, x, y, w, h):
+        """Celdas (r, c) que toca el rectángulo en pixeles."""
+        H, W = self.sim.warehouse.shape
+        r0, r1 = max(0, y // CELL), min(H - 1, (y + h - 1) // CELL)
+        c0, c1 = max(0, x // CELL), min(W - 1, (x + w - 1) // CELL)
+        return {(r, c) for r in range(r0, r1 + 1) for c in range(c0, c1 + 1)}
+
+    def _full_draw(self):
+        sim = self.sim
+        self.screen.blit(self.static_layer, (0, 0))
+        for r, c in zip(*np.nonzero(sim.warehouse)):
+            self.draw_cell(int(r), int(c))
+        for rb in sim.robots:
+            self.draw_robot(rb)
+            self.prev_robots[rb.id] = (int(rb.x), int(rb.y), rb.carrying)
+        self._update_timer()
+        self.timer_rect = self.screen.blit(self.timer_img, TIMER_POS)
+        self.prev_boxes[...] = sim.warehouse
+        self.full_redraw = False
+
+    def draw_scene(self):
+        """
+        Repinta lo que cambió desde el frame anterior.
+        Devuelve la lista de rects a actualizar (None = pantalla completa).
+        """
+        sim = self.sim
+        if self.full_redraw:
+            self._full_draw()
+            return None
+
+        dirty = set()
+
+        # cajas: celdas cuyo conteo cambió
+        changed = np.argwhere(sim.warehouse != self.prev_boxes)
+        if len(changed):
+            dirty.update((int(r), int(c)) for r, c in changed)
+            self.prev_boxes[...] = sim.warehouse
+
+        # robots: celdas bajo la posición anterior y la nueva
+        robot_cells = {}
+        for rb in sim.robots:
+            x, y = int(rb.x), int(rb.y)
+            cells = self._cells_under(x, y, CELL, CELL)
+            robot_cells[rb.id] = cells
+            prev = self.prev_robots.get(rb.id)
+            if prev != (x, y, rb.carrying):
+                dirty |= cells
+                if prev is not None:
+                    dirty |= self._cells_under(prev[0], prev[1], CELL, CELL)
+                self.prev_robots[rb.id] = (x, y, rb.carrying)
+
+        # timer: celdas bajo el texto viejo y el nuevo
+        timer_cells = self._cells_under(*self.timer_rect)
+        if self._update_timer():
+            dirty |= timer_cells
+            w, h = self.timer_img.get_size()
+            timer_cells = timer_cells | self._cells_under(TIMER_POS[0], TIMER_POS[1], w, h)
+            dirty |= timer_cells
+
+        if not dirty:
+            return []
+
+        # lo que se dibuja encima de una celda sucia (robots, timer) se repinta
+        # completo, así que todas sus celdas también se ensucian
+        overlays = list(robot_cells.values()) + [timer_cells]
+        grew = True
+        while grew:
+            grew = False
+            for cells in overlays:
+                if not cells <= dirty and not cells.isdisjoint(dirty):
+                    dirty |= cells
+                    grew = True
+
+        for r, c in dirty:
+            self.draw_cell(r, c)
+        for rb in sim.robots:
+            if not robot_cells[rb.id].isdisjoint(dirty):
+                self.draw_robot(rb)
+        if not timer_cells.isdisjoint(dirty):
+            self.timer_rect = self.screen.blit(self.timer_img, TIMER_POS)
+
+        return self._merge_rows(dirty)
+
+    def _merge_rows(self, cells):
+        """Junta celdas contiguas de una misma fila en un solo rect."""
+        rects = []
+        for r, c in sorted(cells):
+            last = rects[-1] if rects else None
+            if last is not None and last.top == r * CELL and last.right == c * CELL:
+                last.width += CELL
+            else:
+                rects.append(pygame.Rect(c * CELL, r * CELL, CELL, CELL))
+        return rects
+
+    def show_popup(self, success, time_s, moves):
+        overlay = pygame.Surface((self.width, self.height))
+        overlay.set_alpha(220)
+        overlay.fill((10, 10, 10))
+        self.screen.blit(overlay, (0, 0))
+
+        msg = "TAREA COMPLETADA" if success else "TIEMPO AGOTADO"
+
+        t1 = self.font_big.render(msg, True, (255, 255, 255))
+        t2 = self.font_small.render(f"Tiempo (s): {time_s:.2f}", True, (255, 255, 255))
+        t3 = self.font_small.render(f"Movimientos: {moves}", True, (255, 255, 255))
+
+        self.screen.blit(t1, (self.width // 2 - t1.get_width() // 2, self.height // 2 - 40))
+        self.screen.blit(t2, (self.width // 2 - t2.get_width() // 2, self.height // 2 + 10))
+        self.screen.blit(t3, (self.width // 2 - t3.get_width() // 2, self.height // 2 + 40))
+
+        pygame.display.flip()
+        # el popup tapa todo: el siguiente frame se repinta completo
+        self.full_redraw = True
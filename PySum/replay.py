@@ -0,0 +1,424 @@
+# replay.py
+import argparse
+import bisect
+import gzip
+import json
+import numpy as np
+from config import CELL
+from fleet import interpolate
+from warehouse import wall_mask, capacity_mask
+
+FORMAT_VERSION = 2         # 2: pasos (destino, t0, t1) en vez de pixeles por tick
+KEYFRAME_TICKS = 300       # un keyframe cada 10 s simulados
+BUFFER_LINES = 256         # líneas en memoria antes de escribir al archivo
+
+
+def _open(path, mode):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _robot_row(f, i):
+    """(r, c, paso, estado, carga) de la fila i del fleet; paso = [tr, tc, t0, t1] o None."""
+    move = f.move_of(i)
+    return (f.r[i], f.c[i], list(move) if move else None, f.state[i], f.carrying[i])
+
+
+# ---------------- DELTAS ----------------
+def header_record(sim):
+    """Datos que no cambian en el episodio: tamaño, destinos, paredes internas, robots."""
+    H, W = sim.warehouse.shape
+    capacity = sim.occupancy.capacity
+    return {
+        "type": "header",
+        "version": FORMAT_VERSION,
+        "seed": sim.seed,
+        "height": H,
+        "width": W,
+        "time_limit_ticks": sim.time_limit_ticks,
+        "destinations": [list(d) for d in sim.destination_cells],
+        # capacidad de cada pila, en el orden de destinations (con layout varía por zona)
+        "capacities": [int(capacity[d]) for d in sim.destination_cells],
+        # solo paredes internas: el borde siempre es pared
+        "walls": [[int(r) + 1, int(c) + 1] for r, c in np.argwhere(sim.wall_mask[1:-1, 1:-1])],
+        "robots": [[rb.id, list(rb.color)] for rb in sim.robots],
+    }
+
+
+class StateDiff:
+    """
+    Último estado visto de una Simulation (cajas y filas de robots).
+    delta() devuelve solo lo que cambió desde la llamada anterior:
+      "p" posiciones [id, r, c, paso], "s" estados [id, estado],
+      "k" carga [id, 0/1], "b" pilas [r, c, cajas],
+      "r" robots nuevos [id, color, r, c, paso, estado, carga]
+    y keyframe() el estado completo. Lo usan ReplayRecorder y server.py.
+    Los robots que no estaban en el header (Simulation.add_robots) salen en "r"
+    la primera vez y en "new" [id, color] de cada keyframe siguiente.
+    paso = [destino_r, destino_c, t0, t1] o null: un robot cambia de fila solo
+    al salir y al llegar, y quien dibuja interpola los pixeles (fleet.interpolate).
+    """
+
+    def __init__(self, sim):
+        self.sim = sim
+        self.boxes = sim.warehouse.copy()
+        self.box_version = sim.occupancy.version
+        self.rows = [_robot_row(sim.fleet, rb.i) for rb in sim.robots]
+        self.header_robots = len(self.rows)     # los que van en header_record()
+
+    def keyframe(self):
+        sim = self.sim
+        return {
+            "type": "key",
+            "t": sim.tick,
+            "warehouse": sim.warehouse.tolist(),
+            "robots": [list(row) for row in self.rows],
+            "new": [[rb.id, list(rb.color)] for rb in sim.robots[self.header_robots:len(self.rows)]],
+            "delivered": sim.occupancy.delivered,
+            "total_moves": sim.total_moves,
+        }
+
+    def delta(self):
+        sim = self.sim
+        f = sim.fleet
+        delta = {}
+
+        # cajas: solo se comparan cuando hubo pick/drop
+        if sim.occupancy.version != self.box_version:
+            self.box_version = sim.occupancy.version
+            changed = np.argwhere(sim.warehouse != self.boxes)
+            if len(changed):
+                delta["b"] = [[int(r), int(c), int(sim.warehouse[r, c])] for r, c in changed]
+                self.boxes[...] = sim.warehouse
+
+        added = []
+        for rb in sim.robots[len(self.rows):]:
+            row = _robot_row(f, rb.i)
+            added.append([rb.id, list(rb.color)] + list(row))
+            self.rows.append(row)
+        if added:
+            delta["r"] = added
+
+        pos, states, carry = [], [], []
+        for rb in sim.robots:
+            i = rb.i
+            row = _robot_row(f, i)
+            prev = self.rows[i]
+            if row == prev:
+                continue
+            if row[:3] != prev[:3]:
+                pos.append([rb.id, row[0], row[1], row[2]])
+            if row[3] != prev[3]:
+                states.append([rb.id, row[3]])
+            if row[4] != prev[4]:
+                carry.append([rb.id, row[4]])
+            self.rows[i] = row
+        if pos:
+            delta["p"] = pos
+        if states:
+            delta["s"] = states
+        if carry:
+            delta["k"] = carry
+        return delta
+
+
+# ---------------- RECORDING ----------------
+class ReplayRecorder:
+    """
+    Observer que escribe el episodio en JSON lines (gzip si el nombre termina en .gz):
+      header  -> seed, tamaño, destinos, paredes internas, robots (id, color), límites
+      key     -> keyframe completo (almacén + robots) cada keyframe_ticks
+      delta   -> solo lo que cambió en el tick (ver StateDiff)
+      end     -> summary() de la simulación
+    Los ticks sin cambios no se escriben, así que no estorba a los saltos de run().
+    Las líneas se juntan en un buffer acotado (buffer_lines) antes de escribirse.
+    """
+
+    skips_idle_ticks = True
+
+    def __init__(self, sim, path, keyframe_ticks=KEYFRAME_TICKS, buffer_lines=BUFFER_LINES):
+        self.sim = sim
+        self.path = path
+        self.keyframe_ticks = keyframe_ticks
+        self.buffer_lines = buffer_lines
+        self.file = _open(path, "w")
+        self.buffer = []
+        self.closed = False
+
+        self.diff = StateDiff(sim)
+        self.last_key = None
+
+        self._write(header_record(sim))
+        self._keyframe()
+        sim.add_observer(self)
+
+    def _write(self, record):
+        self.buffer.append(json.dumps(record, separators=(",", ":")))
+        if len(self.buffer) >= self.buffer_lines:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.file.write("\n".join(self.buffer) + "\n")
+            self.buffer = []
+        self.file.flush()
+
+    def _keyframe(self):
+        self._write(self.diff.keyframe())
+        self.last_key = self.sim.tick
+
+    def __call__(self, sim):
+        if self.closed:
+            return
+        delta = self.diff.delta()
+
+        if sim.tick - self.last_key >= self.keyframe_ticks:
+            self._keyframe()
+        elif delta:
+            delta["t"] = sim.tick
+            self._write(delta)
+
+        if sim.finished:
+            self.close()
+
+    def close(self):
+        if self.closed:
+            return
+        self._write({"type": "end", "t": self.sim.tick, "summary": self.sim.summary()})
+        self.flush()
+        self.file.close()
+        self.closed = True
+
+
+# ---------------- PLAYBACK ----------------
+class ReplayRobot:
+    """Lo que Renderer lee de un robot."""
+
+    __slots__ = ("id", "color", "r", "c", "move", "x", "y", "state", "carrying")
+
+    def __init__(self, rid, color):
+        self.id = rid
+        self.color = color
+        self.r = self.c = 0
+        self.move = None
+        self.x = self.y = 0.0
+        self.state = "search"
+        self.carrying = False
+
+
+class ReplayPlayer:
+    """
+    Reproduce un log de ReplayRecorder. Expone warehouse, robots, tick y
+    time_limit_ticks como Simulation, así Renderer lo dibuja igual.
+    seek(tick) restaura el keyframe anterior y aplica solo los deltas que faltan.
+    Lee también logs de la versión 1 (pixeles grabados en cada delta).
+    """
+
+    def __init__(self, path):
+        self.header = None
+        self.summary = None
+        self.keys = []      # keyframes en orden de tick
+        self.deltas = []    # deltas en orden de tick
+        with _open(path, "r") as fh:
+            for line in fh:
+                rec = json.loads(line)
+                kind = rec.get("type")
+                if kind == "header":
+                    self.header = rec
+                elif kind == "key":
+                    self.keys.append(rec)
+                elif kind == "end":
+                    self.summary = rec
+                else:
+                    self.deltas.append(rec)
+        self.key_ticks = [k["t"] for k in self.keys]
+        self.delta_ticks = [d["t"] for d in self.deltas]
+
+        h = self.header
+        self.seed = h["seed"]
+        self.time_limit_ticks = h["time_limit_ticks"]
+        self.destination_cells = [tuple(d) for d in h["destinations"]]
+        self.warehouse = np.zeros((h["height"], h["width"]), dtype=np.uint8)
+        self.wall_mask = wall_mask(h["height"], h["width"])
+        for r, c in h.get("walls", ()):
+            self.wall_mask[r, c] = True
+        # capacidad por pila; los logs anteriores solo traen la común a todas
+        if "capacities" in h:
+            self.capacity = np.zeros(self.warehouse.shape, dtype=np.uint8)
+            for cell, cap in zip(self.destination_cells, h["capacities"]):
+                self.capacity[cell] = cap
+        else:
+            self.capacity = capacity_mask(self.destination_cells, self.warehouse.shape,
+                                          h["pile_capacity"])
+        self.robots = [ReplayRobot(rid, tuple(color)) for rid, color in h["robots"]]
+        self.by_id = {rb.id: rb for rb in self.robots}
+        self.header_robots = list(self.robots)
+        self.last_tick = self.summary["t"] if self.summary else max(self.key_ticks + self.delta_ticks)
+
+        self.tick = -1      # fuerza cargar el primer keyframe
+        self.cursor = 0     # siguiente delta por aplicar
+        self.seek(0)
+
+    def _robot(self, rid, color):
+        """El ReplayRobot de rid (se crea la primera vez que aparece)."""
+        rb = self.by_id.get(rid)
+        if rb is None:
+            rb = self.by_id[rid] = ReplayRobot(rid, tuple(color))
+        return rb
+
+    def _apply_key(self, key):
+        self.warehouse[...] = np.array(key["warehouse"], dtype=np.uint8)
+        # robots del header + los agregados hasta este keyframe (al ir hacia atrás se quitan)
+        self.robots = self.header_robots + [self._robot(rid, color) for rid, color in key.get("new", ())]
+        for rb, row in zip(self.robots, key["robots"]):
+            self._place(rb, row[:-2])
+            rb.state, rb.carrying = row[-2], bool(row[-1])
+        self.tick = key["t"]
+
+    def _apply_delta(self, delta):
+        by_id = self.by_id
+        for r, c, count in delta.get("b", ()):
+            self.warehouse[r, c] = count
+        for rid, color, r, c, move, state, carrying in delta.get("r", ()):
+            rb = self._robot(rid, color)
+            self.robots.append(rb)
+            self._place(rb, [r, c, move])
+            rb.state, rb.carrying = state, bool(carrying)
+        for entry in delta.get("p", ()):
+            self._place(by_id[entry[0]], entry[1:])
+        for rid, state in delta.get("s", ()):
+            by_id[rid].state = state
+        for rid, carrying in delta.get("k", ()):
+            by_id[rid].carrying = bool(carrying)
+
+    @staticmethod
+    def _place(rb, pos):
+        """pos = [r, c, paso] (versión 2) o [r, c, x, y] (versión 1)."""
+        if len(pos) == 4:
+            rb.r, rb.c, rb.x, rb.y = pos
+            rb.move = None
+        else:
+            rb.r, rb.c, rb.move = pos
+            if rb.move is None:
+                rb.x, rb.y = rb.c * CELL, rb.r * CELL
+
+    def seek(self, tick):
+        tick = max(0, min(tick, self.last_tick))
+        if tick < self.tick or self._key_before(tick) > self.tick:
+            key = self.keys[bisect.bisect_right(self.key_ticks, tick) - 1]
+            self._apply_key(key)
+            self.cursor = bisect.bisect_right(self.delta_ticks, key["t"])
+        deltas = self.deltas
+        while self.cursor < len(deltas) and deltas[self.cursor]["t"] <= tick:
+            self._apply_delta(deltas[self.cursor])
+            self.cursor += 1
+        self.tick = tick
+        # los pasos en curso se dibujan en el último tick simulado (tick - 1)
+        for rb in self.robots:
+            if rb.move is not None:
+                rb.x, rb.y = interpolate(rb.r, rb.c, rb.move, tick - 1)
+
+    def _key_before(self, tick):
+        return self.key_ticks[bisect.bisect_right(self.key_ticks, tick) - 1]
+
+    def advance(self, ticks=1):
+        self.seek(self.tick + ticks)
+
+    @property
+    def finished(self):
+        return self.tick >= self.last_tick
+
+
+def play(path, speed=1.0, start=0):
+    """
+    Ventana de pygame: speed ticks por frame (acepta fracciones).
+    Espacio pausa, flechas izquierda/derecha saltan 10 s, Home/End al inicio/fin.
+    """
+    import pygame
+    from render import Renderer
+    from config import FPS
+
+    player = ReplayPlayer(path)
+    player.seek(start)
+    renderer = Renderer(player)
+    clock = pygame.time.Clock()
+    paused = False
+    pending = 0.0
+    running = True
+    while running:
+        clock.tick(FPS)
+        for ev in pygame.event.get():
+            if ev.type == pygame.QUIT:
+                running = False
+            elif ev.type == pygame.KEYDOWN:
+                if ev.key == pygame.K_SPACE:
+                    paused = not paused
+                elif ev.key == pygame.K_RIGHT:
+                    player.seek(player.tick + 10 * FPS)
+                elif ev.key == pygame.K_LEFT:
+                    player.seek(player.tick - 10 * FPS)
+                elif ev.key == pygame.K_HOME:
+                    player.seek(0)
+                elif ev.key == pygame.K_END:
+                    player.seek(player.last_tick)
+                elif ev.key == pygame.K_ESCAPE:
+                    running = False
+        if not paused and not player.finished:
+            pending += speed
+            step = int(pending)
+            pending -= step
+            if step:
+                player.advance(step)
+        renderer(player)
+    pygame.quit()
+
+
+def record(path, **sim_kwargs):
+    """Corre un episodio headless grabándolo en path; devuelve summary()."""
+    from simulation import Simulation
+
+    sim = Simulation(**sim_kwargs)
+    recorder = ReplayRecorder(sim, path)
+    summary = sim.run()
+    recorder.close()
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Grabar o reproducir episodios")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="correr headless y grabar")
+    rec.add_argument("out")
+    rec.add_argument("--seed", type=int, default=0)
+    rec.add_argument("--boxes", type=int, default=30)
+    rec.add_argument("--robots", type=int, default=5)
+    rec.add_argument("--pathfinder", default="bfs", choices=["bfs", "astar", "jps", "hpa"])
+    rec.add_argument("--allocation", default="hungarian", choices=["none", "greedy", "auction", "hungarian"])
+    rec.add_argument("--cooperative", action="store_true")
+    rec.add_argument("--layout", default=None, help=".npz de layout.py")
+
+    ply = sub.add_parser("play", help="reproducir un log")
+    ply.add_argument("log")
+    ply.add_argument("--speed", type=float, default=1.0, help="ticks por frame")
+    ply.add_argument("--start", type=int, default=0, help="tick inicial")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "record":
+        summary = record(
+            args.out, seed=args.seed, initial_boxes=args.boxes, num_robots=args.robots,
+            pathfinder=args.pathfinder,
+            allocation=None if args.allocation == "none" else args.allocation,
+            cooperative=args.cooperative, layout=args.layout,
+        )
+        print(summary, "->", args.out)
+    else:
+        play(args.log, speed=args.speed, start=args.start)
+
+
+if __name__ == "__main__":
+    main()
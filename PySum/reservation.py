@@ -0,0 +1,328 @@
+# reservation.py
+import heapq
+from bfs import neighbors4
+from distance_field import DistanceField, UNREACHABLE
+from config import STEP_TICKS
+
+WINDOW_STEPS = 8                       # ventana de reservas (en movimientos)
+WINDOW_TICKS = WINDOW_STEPS * STEP_TICKS
+REPLAN_TICKS = WINDOW_TICKS // 2       # horizonte rodante: replanear a media ventana
+MAX_EXPANSIONS = 5000                  # estados (celda, tick) por búsqueda
+
+
+class CooperativePlanner:
+    """
+    WHCA*: A* espacio-tiempo contra una tabla de reservas compartida.
+    Cada plan reserva las celdas (y ticks) de sus primeros WINDOW_TICKS; el resto
+    de la ruta sigue el campo de distancia sin reservar y se vuelve a planear
+    cada REPLAN_TICKS. Un movimiento A->B que empieza en t reserva A y B durante
+    [t, t + STEP_TICKS), así no hay choques de celda, intercambios ni seguimientos
+    pegados. Al final de su reserva (o sin plan) el robot queda "estacionado":
+    su celda está ocupada desde ese tick en adelante.
+
+    Solo los robots detenidos de verdad (en su meta, sin ruta o sin plan) apartan
+    su celda como meta para siempre; el que estaciona al final de la ventana sigue
+    de largo en su siguiente plan. Un plan que solo puede esperar toda la ventana
+    cuenta como fallido, y si lo que estorba es un robot detenido en la siguiente
+    celda, ese robot se hace a un lado (sidestep), p. ej. dos robots que tienen
+    que intercambiar metas de frente.
+
+    Un robot que se queda quieto fuera de plan (sin ruta, plan fallido o en
+    espera del DeadlockDetector) anula las reservas de otros en su celda; esos
+    robots quedan en stale y la simulación los despierta para replanear.
+    """
+
+    def __init__(self, occupancy, fields=None):
+        self.occupancy = occupancy
+        self.fields = fields
+        self.tick = 0
+
+        self.table = {}        # celda -> {tick: rid}
+        self.reserved = {}     # rid -> [(celda, tick), ...]
+        self.parked = {}       # celda -> (rid, desde_tick, detenido)
+        self.park_of = {}      # rid -> celda
+        self.plan_tick = {}    # rid -> tick del último plan
+        self.yields = {}       # rid detenido que debe hacerse a un lado -> rid que espera
+        self.stale = set()     # rids cuya ruta reservada cruza a un robot que se quedó quieto
+
+        self.stats = {
+            "plans": 0,
+            "replans": 0,
+            "failed_plans": 0,
+            "window_waits": 0,
+            "sidesteps": 0,
+            "wait_ticks": 0,
+            "expansions": 0,
+        }
+
+    # ---------------- TABLE ----------------
+    def _clear(self, rid):
+        for cell, tick in self.reserved.pop(rid, ()):
+            ticks = self.table.get(cell)
+            if ticks is not None and ticks.get(tick) == rid:
+                del ticks[tick]
+                if not ticks:
+                    del self.table[cell]
+        cell = self.park_of.pop(rid, None)
+        if cell is not None and self.parked.get(cell, (None,))[0] == rid:
+            del self.parked[cell]
+
+    def _reserve(self, rid, cell, tick):
+        self.table.setdefault(cell, {})[tick] = rid
+        self.reserved.setdefault(rid, []).append((cell, tick))
+
+    def _park(self, rid, cell, tick, stopped=True):
+        self.parked[cell] = (rid, tick, stopped)
+        self.park_of[rid] = cell
+
+    def _stay(self, rid, cell):
+        """
+        rid se queda en su celda desde ahora: las reservas de otros en ella
+        dejan de valer y sus dueños quedan en stale para replanear.
+        """
+        self._park(rid, cell, self.tick)
+        ticks = self.table.get(cell)
+        if not ticks:
+            return
+        for t, owner in list(ticks.items()):
+            if owner != rid and t >= self.tick:
+                del ticks[t]
+                self.plan_tick[owner] = self.tick - REPLAN_TICKS
+                self.stale.add(owner)
+        if not ticks:
+            del self.table[cell]
+
+    def park(self, robot):
+        """Robot sin ruta: su celda actual queda ocupada desde ahora."""
+        cell = (robot.r, robot.c)
+        if self.park_of.get(robot.id) == cell and not self.reserved.get(robot.id):
+            return
+        self._clear(robot.id)
+        self._stay(robot.id, cell)
+
+    def hold(self, robot):
+        """
+        Robot que espera sin avanzar (DeadlockDetector): suelta su ruta
+        reservada, ocupa su celda y replanea al volver a moverse.
+        """
+        self._clear(robot.id)
+        self._stay(robot.id, (robot.r, robot.c))
+        self.plan_tick[robot.id] = self.tick - REPLAN_TICKS
+
+    def free_at(self, cell, tick, rid):
+        ticks = self.table.get(cell)
+        if ticks is not None:
+            owner = ticks.get(tick)
+            if owner is not None and owner != rid:
+                return False
+        park = self.parked.get(cell)
+        if park is not None and park[0] != rid and tick >= park[1]:
+            return False
+        return True
+
+    def _free_after(self, cell, tick, rid):
+        """Nadie más pasa por la celda desde tick en adelante (para estacionarse ahí)."""
+        park = self.parked.get(cell)
+        if park is not None and park[0] != rid and park[2]:
+            return False
+        for t, owner in self.table.get(cell, {}).items():
+            if owner != rid and t >= tick:
+                return False
+        return True
+
+    # ---------------- PLANNING ----------------
+    def should_replan(self, robot):
+        """Horizonte rodante: replanear cuando se consumió media ventana y el robot está en su celda."""
+        if not robot.path or robot.moving:
+            return False
+        return self.tick - self.plan_tick.get(robot.id, self.tick) >= REPLAN_TICKS
+
+    def plan(self, robot, goals, key=None, now=False):
+        """
+        Devuelve (ruta, esperas_iniciales) o (None, 0).
+        La ruta usa el formato de bfs(); una celda repetida es esperar un tick.
+        Las esperas antes del primer movimiento se devuelven aparte (wait_frames).
+        now: el robot puede moverse en este mismo tick; si no (planea desde la
+        máquina de estados), la ruta empieza en el siguiente y este tick solo se
+        reserva su celda.
+        """
+        occ = self.occupancy
+        rid = robot.id
+        start = (robot.r, robot.c)
+        t0 = self.tick if now else self.tick + 1
+        self.stats["plans"] += 1
+        self._clear(rid)
+        self.plan_tick[rid] = self.tick
+
+        goals = {g for g in goals if not occ.is_static_blocked(g)}
+        if start in goals:
+            self._stay(rid, start)
+            return [], 0
+        if not goals:
+            return self._fail(rid, start)
+
+        if self.fields is not None and key is not None:
+            field = self.fields.get(key, goals)
+        else:
+            field = DistanceField(goals, occ.static_mask())
+        h0 = field.distance(start)
+        if h0 == UNREACHABLE and occ.is_static_blocked(start):
+            # parado en una pila a la que le dejaron caja encima: sale por un vecino, como bfs()
+            near = [field.distance(n) for n in neighbors4(start[0], start[1], occ.H, occ.W)]
+            near = [d for d in near if d != UNREACHABLE]
+            h0 = min(near) + 1 if near else UNREACHABLE
+        if h0 == UNREACHABLE:
+            return self._fail(rid, start)
+
+        horizon = t0 + WINDOW_TICKS
+        counter = 0
+        heap = [(h0 * STEP_TICKS, -t0, counter, start, t0)]
+        prev = {(start, t0): None}
+        end = None
+        expanded = 0
+
+        while heap:
+            _, _, _, cell, t = heapq.heappop(heap)
+            expanded += 1
+            if cell in goals and self._free_after(cell, t, rid):
+                end = (cell, t)
+                break
+            if t >= horizon:
+                end = (cell, t)
+                break
+            if expanded >= MAX_EXPANSIONS:
+                break
+
+            # esperar un tick (la celda de inicio en t0 siempre es nuestra)
+            nxt = (cell, t + 1)
+            if nxt not in prev and (t == t0 and cell == start or self.free_at(cell, t, rid)):
+                prev[nxt] = (cell, t)
+                counter += 1
+                d = h0 if cell == start else field.distance(cell)
+                heapq.heappush(heap, (t + 1 - t0 + d * STEP_TICKS, -(t + 1), counter, cell, t + 1))
+
+            # moverse a un vecino: ocupa ambas celdas STEP_TICKS ticks
+            for n in neighbors4(cell[0], cell[1], occ.H, occ.W):
+                d = field.distance(n)
+                if d == UNREACHABLE or occ.is_static_blocked(n):
+                    continue
+                nxt = (n, t + STEP_TICKS)
+                if nxt in prev:
+                    continue
+                ok = True
+                for tau in range(t, t + STEP_TICKS):
+                    if not self.free_at(n, tau, rid) or not (
+                        (cell == start and tau == t0) or self.free_at(cell, tau, rid)
+                    ):
+                        ok = False
+                        break
+                if not ok:
+                    continue
+                prev[nxt] = (cell, t)
+                counter += 1
+                tn = t + STEP_TICKS
+                heapq.heappush(heap, (tn - t0 + d * STEP_TICKS, -tn, counter, n, tn))
+
+        self.stats["expansions"] += expanded
+        if end is None:
+            return self._fail(rid, start)
+
+        # reconstruir estados (celda, tick) y reservarlos
+        if t0 > self.tick:
+            self._reserve(rid, start, self.tick)
+        states = []
+        node = end
+        while node is not None:
+            states.append(node)
+            node = prev[node]
+        states.reverse()
+
+        route = []
+        for (cell, t), (ncell, nt) in zip(states, states[1:]):
+            for tau in range(t, nt):
+                self._reserve(rid, cell, tau)
+                if ncell != cell:
+                    self._reserve(rid, ncell, tau)
+            if ncell == cell:
+                self.stats["wait_ticks"] += 1
+            route.append(ncell)
+        end_cell, end_t = end
+        if end_cell not in goals and all(cell == start for cell in route):
+            # esperar toda la ventana no es un plan: pedir paso al que estorba
+            self.stats["window_waits"] += 1
+            self._clear(rid)
+            self._request_yield(rid, start, field)
+            return self._fail(rid, start)
+        self._park(rid, end_cell, end_t, stopped=end_cell in goals)
+
+        # más allá de la ventana: seguir el campo sin reservar
+        if end_cell not in goals:
+            route.extend(field.path_from(end_cell) or [])
+
+        waits = 0
+        while waits < len(route) and route[waits] == start:
+            waits += 1
+        return route[waits:], waits
+
+    def _request_yield(self, rid, start, field):
+        """El robot detenido en la celda vecina más cercana a la meta se hará a un lado (ver sidestep)."""
+        occ = self.occupancy
+        best = None
+        for n in neighbors4(start[0], start[1], occ.H, occ.W):
+            park = self.parked.get(n)
+            d = field.distance(n)
+            if park is None or park[0] == rid or not park[2] or d == UNREACHABLE:
+                continue
+            if best is None or (d, n) < best[0]:
+                best = ((d, n), park[0])
+        if best is None:
+            return
+        other = best[1]
+        if self.yields.get(rid) == other:
+            return          # ya le pidieron a este que se quite: no cederse los dos
+        self.yields[other] = rid
+
+    def sidestep(self, robot):
+        """
+        Si a robot le pidieron paso, reserva un movimiento a una celda vecina libre
+        (que no sea la del que espera) y devuelve la ruta de un paso; si no, None.
+        """
+        waiter = self.yields.pop(robot.id, None)
+        if waiter is None:
+            return None
+        avoid = self.park_of.get(waiter)
+        cell = self.step_aside(robot, () if avoid is None else (avoid,))
+        if cell is None:
+            return None
+        self.stats["sidesteps"] += 1
+        return [cell]
+
+    def step_aside(self, robot, avoid):
+        """
+        Reserva un paso de robot a una celda vecina libre fuera de avoid y lo
+        deja detenido ahí; devuelve la celda o None si no hay ninguna.
+        """
+        occ = self.occupancy
+        rid = robot.id
+        start = (robot.r, robot.c)
+        t0 = self.tick
+        for n in neighbors4(start[0], start[1], occ.H, occ.W):
+            if n in avoid or occ.is_static_blocked(n):
+                continue
+            if not all(self.free_at(n, tau, rid) for tau in range(t0, t0 + 2 * STEP_TICKS)):
+                continue
+            if not self._free_after(n, t0 + STEP_TICKS, rid):
+                continue
+            self._clear(rid)
+            for tau in range(t0, t0 + STEP_TICKS):
+                self._reserve(rid, start, tau)
+                self._reserve(rid, n, tau)
+            self._park(rid, n, t0 + STEP_TICKS)
+            self.plan_tick[rid] = t0
+            return n
+        return None
+
+    def _fail(self, rid, start):
+        self.stats["failed_plans"] += 1
+        self._stay(rid, start)
+        return None, 0
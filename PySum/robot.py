@@ -1,100 +1,170 @@
 # robot.py
-import math
 import random
-import pygame
+from collections import deque
 from bfs import bfs, neighbors4
-from warehouse import get_walls
+from config import FPS
+from fleet import Fleet, _column, _shared
+from profiling import profiler, perf_counter
 
-CELL = 32
-MOVE_SPEED = 3
-
-FPS = 30              # igual que en game.py
 STUCK_TIME_S = 3
 STUCK_FRAMES = FPS * STUCK_TIME_S
 
+# valores especiales de allowed_map (además del id del robot que entra)
+DENIED = -1     # nadie entra a la celda en este tick: el que la quería replanea
+HOLD = -2       # la celda se está vaciando: esperar este tick sin replanear
+
 class Robot:
-    def __init__(self, rid, r, c, warehouse, destination_cells, color=(80, 180, 255)):
+    """
+    Vista delgada sobre una fila de Fleet: no guarda estado propio más allá de
+    (fleet, índice, id). Sin fleet, crea uno propio con la configuración dada.
+    """
+
+    __slots__ = ("fleet", "i", "id")
+
+    def __init__(self, rid, r, c, occupancy, destination_cells, color=(80, 180, 255), fields=None,
+                 pathfinder=bfs, rng=random, dispatcher=None,
+                 planner=None, fleet=None):
+        if fleet is None:
+            fleet = Fleet(occupancy, destination_cells, fields=fields, pathfinder=pathfinder,
+                          rng=rng, dispatcher=dispatcher, planner=planner)
+        self.fleet = fleet
         self.id = rid
-        self.r = r
-        self.c = c
-        self.x = c * CELL
-        self.y = r * CELL
-        self.color = color
-
-        # sprite
-        self.sprite = pygame.image.load("sources/robot.png").convert_alpha()
-        self.sprite = pygame.transform.scale(self.sprite, (CELL, CELL))
-
-        self.warehouse = warehouse
-        self.destinations = destination_cells
-
-        self.state = "search"
-        self.carrying = False
-
-        self.path = []
-        self.target_box = None
-        self.target_pile = None
-        self.moves = 0
-        self.wait_frames = 0
-
-        # Paredes (NO pisables)
-        self.walls = get_walls()
-
-        # Anti-stuck
-        self.stuck_frames = 0
-        self.last_pos = (self.r, self.c)
+        self.i = fleet.append(rid, r, c, color)
+
+    # columnas del fleet
+    r = _column("r")
+    c = _column("c")
+    wait_frames = _column("wait_frames")
+    stuck_frames = _column("stuck_frames")
+    moves = _column("moves")
+    state = _column("state")
+    target_box = _column("target_box")
+    target_pile = _column("target_pile")
+    color = _column("color")
+
+    # pixeles: se interpolan del paso en curso solo cuando alguien los pide (render)
+    @property
+    def x(self):
+        return self.fleet.pixel(self.i)[0]
+
+    @property
+    def y(self):
+        return self.fleet.pixel(self.i)[1]
+
+    @property
+    def moving(self):
+        return bool(self.fleet.moving[self.i])
+
+    @property
+    def carrying(self):
+        return bool(self.fleet.carrying[self.i])
+
+    @carrying.setter
+    def carrying(self, value):
+        self.fleet.carrying[self.i] = 1 if value else 0
+
+    @property
+    def path(self):
+        """deque de celdas: consumir con popleft() en O(1)."""
+        return self.fleet.path[self.i]
+
+    @path.setter
+    def path(self, route):
+        self.fleet.path[self.i] = route if isinstance(route, deque) else deque(route)
+
+    @property
+    def last_pos(self):
+        f, i = self.fleet, self.i
+        return (f.last_r[i], f.last_c[i])
+
+    @last_pos.setter
+    def last_pos(self, cell):
+        f, i = self.fleet, self.i
+        f.last_r[i], f.last_c[i] = cell
+
+    # configuración compartida (una sola copia en el fleet)
+    occupancy = _shared("occupancy")
+    # índice vivo de cajas (np.uint8 H x W)
+    warehouse = _shared("warehouse")
+    # paredes (NO pisables), compartidas con el índice de ocupación
+    walls = _shared("walls")
+    destinations = _shared("destinations")
+    # campos de distancia compartidos (DistanceFieldCache); None = BFS propio
+    fields = _shared("fields")
+    # bfs, o astar/jps de pathfinding.py (misma firma y formato de ruta)
+    pathfinder = _shared("pathfinder")
+    # random.Random de la simulación (o el módulo random) para wait_frames
+    rng = _shared("rng")
+    # asignador central de cajas/pilas (Dispatcher); None = búsqueda greedy propia
+    dispatcher = _shared("dispatcher")
+    # planificador cooperativo con reservas espacio-tiempo (CooperativePlanner)
+    planner = _shared("planner")
+    # carga y reservas de las pilas destino (PileManager)
+    piles = _shared("piles")
 
     def dist_manhattan(self, a, b):
         return abs(a[0]-b[0]) + abs(a[1]-b[1])
 
     def cells_adjacent_to_box_goals(self):
-        goals = set()
-        H = len(self.warehouse)
-        W = len(self.warehouse[0])
-        for r in range(H):
-            for c in range(W):
-                if self.warehouse[r][c] > 0 and (r, c) not in self.destinations:
-                    for nr, nc in neighbors4(r, c, H, W):
-                        if self.warehouse[nr][nc] == 0:
-                            goals.add((nr, nc))
-        return goals
+        """Celdas libres junto a cajas sueltas (índice vivo, no copiar ni mutar)."""
+        return self.occupancy.box_goals
+
+    def search_goals(self):
+        """
+        (clave de campo, metas) para ir por una caja: junto a la caja asignada
+        por el dispatcher (sin campo compartido), o junto a cualquier caja suelta.
+        """
+        if self.dispatcher is not None:
+            if self.target_box is None:
+                return None, set()
+            return None, self.dispatcher.box_goals(self.target_box)
+        return "boxes", self.cells_adjacent_to_box_goals()
 
     def find_drop_adjacent_goals(self):
         """
-        Busca celdas libres adyacentes a las pilas de destino
-        en la fila de piso (una arriba de la pared).
+        Reserva la mejor pila con lugar desde la celda del robot (PileManager:
+        distancia + robots que ya van hacia ella) y devuelve sus celdas libres
+        adyacentes: (set, pila) o (set(), None).
         """
-        H = len(self.warehouse)
-        W = len(self.warehouse[0])
+        return self.piles.reserve(self)
 
-        # fila destino tomada de destination_cells
-        if self.destinations:
-            dest_row = self.destinations[0][0]
-        else:
-            dest_row = H - 2  # fallback
-
-        for col in range(1, W - 1):
-            pile = (dest_row, col)
-            if self.warehouse[pile[0]][pile[1]] < 5:
-                adj = []
-                for nr, nc in neighbors4(pile[0], pile[1], H, W):
-                    if self.warehouse[nr][nc] == 0 and (nr, nc) not in self.walls:
-                        adj.append((nr, nc))
-                if adj:
-                    return set(adj), pile
-        return set(), None
-
-    def _path_is_valid_adjacent_steps(self, path):
-        if not path:
-            return True
-        prev = (self.r, self.c)
-        for step in path:
-            if self.dist_manhattan(prev, step) != 1:
-                return False
-            prev = step
-        return True
-
-    def safe_move(self, nr, nc, robots_positions, allowed_map):
+    def form_goal(self):
+        # meta: fila 1, columna según id, sin las columnas de pared de los bordes
+        W = self.warehouse.shape[1]
+        return (1, 1 + self.id % (W - 2))
+
+    def plan(self, key, goals, blocked, now=False):
+        """
+        Ruta hacia goals. Con planner cooperativo, A* espacio-tiempo contra las
+        reservas (las esperas iniciales van a wait_frames); now = el robot sigue
+        moviéndose en este mismo update, si no empieza en el siguiente tick.
+        Con campos compartidos es una bajada por el gradiente (solo paredes +
+        cajas); si esa ruta choca con algún robot que blocked sí considera, se
+        cae al pathfinder propio.
+        """
+        if not profiler.enabled:
+            return self._plan(key, goals, blocked, now)
+        t0 = perf_counter()
+        route = self._plan(key, goals, blocked, now)
+        profiler.plan(perf_counter() - t0, route)
+        return route
+
+    def _plan(self, key, goals, blocked, now=False):
+        if self.planner is not None:
+            route, waits = self.planner.plan(self, goals, key, now)
+            if route is not None:
+                self.wait_frames = waits
+            return route
+
+        if self.fields is not None and key is not None:
+            route = self.fields.path(key, goals, (self.r, self.c))
+            if route is None or blocked is self.occupancy.static:
+                return route
+            if not any(self.occupancy.other_robot_at(cell, self.id) for cell in route):
+                return route
+        return self.pathfinder((self.r, self.c), goals, blocked, self.warehouse)
+
+    def safe_move(self, nr, nc, allowed_map):
         # No entrar a paredes
         if (nr, nc) in self.walls:
             return False
@@ -102,78 +172,107 @@ class Robot:
         if self.dist_manhattan((self.r, self.c), (nr, nc)) != 1 and (nr, nc) != (self.r, self.c):
             return False
 
-        if (nr, nc) in allowed_map and allowed_map[(nr, nc)] != self.id:
+        # allowed_map (IntentionResolver): id del que entra o DENIED; con la celda
+        # concedida no se revisan robots (el que está ahí sale en este mismo tick)
+        owner = allowed_map.get((nr, nc))
+        if owner == HOLD:
+            return None
+        if owner is not None and owner != self.id:
             return False
 
-        if (nr, nc) in robots_positions:
+        if owner is None and self.occupancy.other_robot_at((nr, nc), self.id):
             return False
         
-        if self.warehouse[nr][nc] > 0:
+        if self.warehouse[nr, nc] > 0:
             return False
 
-        # movimiento físico
-        tx = nc * CELL
-        ty = nr * CELL
-        dx = tx - self.x
-        dy = ty - self.y
-        dist = math.hypot(dx, dy)
-
-        if dist == 0:
-            self.r, self.c = nr, nc
+        # movimiento: el paso queda programado y el scheduler lo despierta al llegar
+        f, i = self.fleet, self.i
+        if (nr, nc) == (self.r, self.c):
             return True
-
-        move = min(MOVE_SPEED, dist)
-        self.x += (dx / dist) * move
-        self.y += (dy / dist) * move
-
-        if abs(self.x - tx) < 1 and abs(self.y - ty) < 1:
-            self.x = tx
-            self.y = ty
-            self.r, self.c = nr, nc
+        if f.start_move(i, nr, nc, f.now) <= f.now:
+            self._arrive()
             return True
-
         return None
 
-    def update(self, robots, allowed_map):
-        if self.wait_frames > 0:
-            self.wait_frames -= 1
+    def _cancel_entering(self, cell, allowed_map):
+        """
+        Nadie llega a cell: se cancela el paso de quien va entrando (se queda en
+        su celda) o se niega la concesión de quien aún no sale. Como ese robot
+        ya no deja su celda, se repite con ella para quien lo venía siguiendo.
+        """
+        f = self.fleet
+        seen = set()
+        while cell is not None and cell not in seen:
+            seen.add(cell)
+            nxt = None
+            j = f.entering(cell)
+            if j is not None:
+                f.cancel_move(j)
+                nxt = (f.r[j], f.c[j])
+            owner = allowed_map.get(cell)
+            if owner is not None and owner >= 0:
+                allowed_map[cell] = DENIED
+                if j is None:
+                    nxt = self.occupancy.robot_cells.get(owner)
+            cell = nxt
+
+    def _finish_step(self):
+        """Llegada programada: cambia de celda y consume el paso de la ruta."""
+        f, i = self.fleet, self.i
+        cell = (f.to_r[i], f.to_c[i])
+        self._arrive()
+        path = f.path[i]
+        # la ruta pudo cambiar a medio paso (p. ej. al pasar a form): el paso se termina igual
+        if path and tuple(path[0]) == cell:
+            path.popleft()
+        self.moves += 1
+
+    def _arrive(self):
+        """Fin del paso en curso: la celda lógica pasa a ser la de destino."""
+        f, i = self.fleet, self.i
+        f.moving[i] = 0
+        self._set_cell(f.to_r[i], f.to_c[i])
+
+    def _set_cell(self, nr, nc):
+        self.r, self.c = nr, nc
+        self.occupancy.move_robot(self.id, (nr, nc))
+
+    def update(self, allowed_map):
+        # columnas directas del fleet en el camino caliente
+        f, i = self.fleet, self.i
+        if f.moving[i]:
+            # a medio paso no se decide nada: solo llegar en move_t1
+            if f.now >= f.move_t1[i]:
+                self._finish_step()
+            return
+
+        if f.wait_frames[i] > 0:
+            f.wait_frames[i] -= 1
             return
 
-        H = len(self.warehouse)
-        W = len(self.warehouse[0])
-        robots_positions = {(rb.r, rb.c) for rb in robots if rb is not self}
+        H, W = self.warehouse.shape
 
         # ---------------- DETECT STUCK (3s sin moverse) ----------------
-        if (self.r, self.c) == self.last_pos:
-            self.stuck_frames += 1
+        r, c = f.r[i], f.c[i]
+        if r == f.last_r[i] and c == f.last_c[i]:
+            f.stuck_frames[i] += 1
         else:
-            self.stuck_frames = 0
+            f.stuck_frames[i] = 0
 
-        self.last_pos = (self.r, self.c)
+        f.last_r[i], f.last_c[i] = r, c
 
-        if self.stuck_frames >= STUCK_FRAMES:
+        if f.stuck_frames[i] >= STUCK_FRAMES:
+            if profiler.enabled:
+                profiler.count("stuck")
             # 1) Si está buscando caja, intentar BFS ignorando robots
             if self.state == "search":
-                goals = set()
-                for r in range(H):
-                    for c in range(W):
-                        if self.warehouse[r][c] > 0 and (r, c) not in self.destinations:
-                            for nr, nc in neighbors4(r, c, H, W):
-                                if (
-                                    self.warehouse[nr][nc] == 0
-                                    and (nr, nc) not in self.walls
-                                ):
-                                    goals.add((nr, nc))
+                key, goals = self.search_goals()
 
                 if goals:
-                    blocked = set()
-                    for rr in range(H):
-                        for cc in range(W):
-                            if self.warehouse[rr][cc] > 0:
-                                blocked.add((rr, cc))
-                    blocked |= self.walls
-
-                    route = bfs((self.r, self.c), goals, blocked, self.warehouse)
+                    blocked = self.occupancy.static
+
+                    route = self.plan(key, goals, blocked)
                     if route:
                         if route[0] == (self.r, self.c):
                             route = route[1:]
@@ -186,14 +285,9 @@ class Robot:
             elif self.state in ("plan_drop", "going_drop") and self.carrying:
                 adj_goals, pile = self.find_drop_adjacent_goals()
                 if adj_goals:
-                    blocked = set()
-                    for rr in range(H):
-                        for cc in range(W):
-                            if self.warehouse[rr][cc] > 0:
-                                blocked.add((rr, cc))
-                    blocked |= self.walls
-
-                    route = bfs((self.r, self.c), adj_goals, blocked, self.warehouse)
+                    blocked = self.occupancy.static
+
+                    route = self.plan(("drop", pile), adj_goals, blocked)
                     if route:
                         if route[0] == (self.r, self.c):
                             route = route[1:]
@@ -205,15 +299,10 @@ class Robot:
 
             # 3) Si está formando, intentar form ignorando robots
             elif self.state == "form":
-                goal = (1, min(self.id, W-1))
-                blocked = set()
-                for rr in range(H):
-                    for cc in range(W):
-                        if self.warehouse[rr][cc] > 0:
-                            blocked.add((rr, cc))
-                blocked |= self.walls
-
-                route = bfs((self.r, self.c), [goal], blocked, self.warehouse)
+                goal = self.form_goal()
+                blocked = self.occupancy.static
+
+                route = self.plan(None, [goal], blocked)
                 if route:
                     if route[0] == (self.r, self.c):
                         route = route[1:]
@@ -227,42 +316,52 @@ class Robot:
                 self.state = "plan_drop"
             else:
                 self.state = "search"
-            self.wait_frames = random.randint(1, 3)
+            self.wait_frames = self.rng.randint(1, 3)
             self.stuck_frames = 0
             return
 
         # ---------------- MOVEMENT ----------------
-        if self.path:
-            if not self._path_is_valid_adjacent_steps(self.path):
+        path = f.path[i]
+        if path:
+            # cada paso se valida al volverse el siguiente: O(1) por tick
+            if self.dist_manhattan((r, c), path[0]) > 1:
                 self.path = []
-                self.wait_frames = random.randint(0, 3)
+                self.wait_frames = self.rng.randint(0, 3)
                 return
 
+            # horizonte rodante: renovar las reservas antes de que se acaben
+            if self.planner is not None and self.planner.should_replan(self):
+                self.planner.stats["replans"] += 1
+                route = self.plan(None, [self.path[-1]], self.occupancy.all, now=True)
+                # sin plan la ruta vieja ya no tiene reservas: queda estacionado aquí
+                self.path = route or []
+                if self.wait_frames > 0:
+                    self.wait_frames -= 1       # este tick es la primera espera
+                    return
+                if not self.path:
+                    return
+
             nr, nc = self.path[0]
-            m = self.safe_move(nr, nc, robots_positions, allowed_map)
+            prev_cell = (self.r, self.c)
+            m = self.safe_move(nr, nc, allowed_map)
 
             if m is None:
-                return
+                return      # esperando (HOLD) o ya en camino
 
             if m is False:
-                occupied = set(robots_positions)
-                for r in range(H):
-                    for c in range(W):
-                        if self.warehouse[r][c] > 0:
-                            occupied.add((r, c))
-
-                # paredes bloquean paso real
-                occupied |= self.walls
-
-                if (self.r, self.c) in occupied:
-                    occupied.remove((self.r, self.c))
+                # robots + cajas + paredes bloquean paso real
+                occupied = self.occupancy.all
 
                 goal = self.path[-1] if self.path else None
-                new_route = bfs((self.r, self.c), [goal], occupied, self.warehouse) if goal else None
+                if profiler.enabled:
+                    profiler.count("replan_blocked")
+                if self.planner is not None:
+                    self.planner.stats["replans"] += 1
+                new_route = self.plan(None, [goal], occupied) if goal else None
 
                 if not new_route:
                     self.path = []
-                    self.wait_frames = random.randint(0, 3)
+                    self.wait_frames = self.rng.randint(0, 3)
                     if self.state in ("going_drop", "plan_drop"):
                         self.state = "plan_drop"
                     return
@@ -273,56 +372,44 @@ class Robot:
                 self.path = new_route
                 return
 
-            self.path.pop(0)
-            self.moves += 1
+            self.path.popleft()
+            if (self.r, self.c) != prev_cell:
+                self.moves += 1
             return
 
         # ---------------- STATE MACHINE ----------------
 
         # ---- SEARCH ----
         if self.state == "search":
-            goals = set()
-            for r in range(H):
-                for c in range(W):
-                    if self.warehouse[r][c] > 0 and (r, c) not in self.destinations:
-                        for nr, nc in neighbors4(r, c, H, W):
-                            if (
-                                self.warehouse[nr][nc] == 0
-                                and (nr, nc) not in self.walls
-                            ):
-                                goals.add((nr, nc))
+            key, goals = self.search_goals()
 
             if not goals:
-                self.wait_frames = random.randint(1, 3)
+                self.wait_frames = self.rng.randint(1, 3)
                 return
 
             # robots + cajas + paredes bloquean BFS
-            blocked = set(robots_positions)
-            for rr in range(H):
-                for cc in range(W):
-                    if self.warehouse[rr][cc] > 0:
-                        blocked.add((rr, cc))
-
-            blocked |= self.walls
+            blocked = self.occupancy.all
 
-            if (self.r, self.c) in blocked:
-                blocked.remove((self.r, self.c))
-
-            route = bfs((self.r, self.c), goals, blocked, self.warehouse)
-            if route:
-                if route[0] == (self.r, self.c):
+            route = self.plan(key, goals, blocked)
+            # ruta vacía = ya está junto a la caja; going_box la recoge
+            if route is not None:
+                if route and route[0] == (self.r, self.c):
                     route = route[1:]
                 self.path = route
                 self.state = "going_box"
             else:
-                self.wait_frames = random.randint(1, 3)
+                self.wait_frames = self.rng.randint(1, 3)
             return
 
         # ---- GOING BOX ----
         if self.state == "going_box":
             for nr, nc in neighbors4(self.r, self.c, H, W):
-                if self.warehouse[nr][nc] > 0 and (nr, nc) not in self.destinations:
-                    self.warehouse[nr][nc] -= 1
+                if self.dispatcher is not None and (nr, nc) != self.target_box:
+                    continue
+                if self.occupancy.is_loose_box((nr, nc)):
+                    self.occupancy.pick(nr, nc)
+                    if self.dispatcher is not None:
+                        self.dispatcher.release_box(self)
                     self.carrying = True
                     self.state = "plan_drop"
                     self.path = []
@@ -334,29 +421,21 @@ class Robot:
         if self.state == "plan_drop":
             adj_goals, pile = self.find_drop_adjacent_goals()
             if not adj_goals:
-                self.wait_frames = random.randint(0, 3)
+                self.wait_frames = self.rng.randint(0, 3)
                 return
 
-            blocked = set(robots_positions)
-            for rr in range(H):
-                for cc in range(W):
-                    if self.warehouse[rr][cc] > 0:
-                        blocked.add((rr, cc))
-
-            blocked |= self.walls
+            blocked = self.occupancy.all
 
-            if (self.r, self.c) in blocked:
-                blocked.remove((self.r, self.c))
-
-            route = bfs((self.r, self.c), adj_goals, blocked, self.warehouse)
-            if route:
-                if route[0] == (self.r, self.c):
+            route = self.plan(("drop", pile), adj_goals, blocked)
+            # ruta vacía = ya está junto a la pila; going_drop la deja
+            if route is not None:
+                if route and route[0] == (self.r, self.c):
                     route = route[1:]
                 self.path = route
                 self.target_pile = pile
                 self.state = "going_drop"
             else:
-                self.wait_frames = random.randint(0, 3)
+                self.wait_frames = self.rng.randint(0, 3)
             return
 
         # ---- GOING DROP ----
@@ -368,9 +447,12 @@ class Robot:
                     return
 
                 pr, pc = self.target_pile
-                if self.warehouse[pr][pc] < 5:
+                if self.occupancy.has_room((pr, pc)):
                     if self.dist_manhattan((self.r, self.c), (pr, pc)) == 1:
-                        self.warehouse[pr][pc] += 1
+                        # quien iba entrando a la pila se queda en su celda y replanea al despertar
+                        self._cancel_entering((pr, pc), allowed_map)
+                        self.occupancy.drop(pr, pc)
+                        self.piles.release(self)
                         self.carrying = False
                         self.target_pile = None
                         self.state = "search"
@@ -380,98 +462,22 @@ class Robot:
                         self.target_pile = None
                         return
 
-                # fila destino (piso) para buscar otra columna
-                if self.destinations:
-                    dest_row = self.destinations[0][0]
-                else:
-                    dest_row = H - 2
-
-                found = None
-                for col in range(pc-1, 0, -1):
-                    if self.warehouse[dest_row][col] < 5:
-                        found = (dest_row, col)
-                        break
-                if not found:
-                    for col in range(pc-1, 0, -1):
-                        if self.warehouse[dest_row][col] < 5:
-                            found = (dest_row, col)
-                            break
-
-                if not found:
-                    self.state = "plan_drop"
-                    self.target_pile = None
-                    self.wait_frames = random.randint(0, 3)
-                    return
-
-                adj_free = set()
-                for ar, ac in neighbors4(found[0], found[1], H, W):
-                    if (
-                        self.warehouse[ar][ac] == 0
-                        and (ar, ac) not in robots_positions
-                        and (ar, ac) not in self.walls
-                    ):
-                        adj_free.add((ar, ac))
-
-                if not adj_free:
-                    self.target_pile = None
-                    self.state = "plan_drop"
-                    self.wait_frames = random.randint(0, 3)
-                    return
-
-                blocked = set(robots_positions)
-                for rr in range(H):
-                    for cc in range(W):
-                        if self.warehouse[rr][cc] > 0:
-                            blocked.add((rr, cc))
-
-                blocked |= self.walls
-
-                if (self.r, self.c) in blocked:
-                    blocked.remove((self.r, self.c))
-
-                route = bfs((self.r, self.c), adj_free, blocked, self.warehouse)
-                if route:
-                    if route[0] == (self.r, self.c):
-                        route = route[1:]
-                    self.path = route
-                    self.target_pile = found
-                else:
-                    self.target_pile = None
-                    self.state = "plan_drop"
-                    self.wait_frames = random.randint(0, 3)
+                # la pila se llenó sin pasar por la reserva: pedir otra
+                self.piles.release(self)
+                self.target_pile = None
+                self.state = "plan_drop"
                 return
 
         # ---- FORM ----
         if self.state == "form":
-            # meta: fila 1, columna según id, sin tocar la pared de arriba
-            goal_col = min(self.id, W - 2)   # evitar última columna pegada a pared
-            goal = (1, goal_col)
+            goal = self.form_goal()
 
             # EN FORM: ignoramos robots, solo bloquean cajas + paredes
-            blocked = set()
-            for rr in range(H):
-                for cc in range(W):
-                    if self.warehouse[rr][cc] > 0:
-                        blocked.add((rr, cc))
-
-            blocked |= self.walls
+            blocked = self.occupancy.static
 
-            # nunca nos bloqueamos a nosotros mismos
-            if (self.r, self.c) in blocked:
-                blocked.remove((self.r, self.c))
-
-            route = bfs((self.r, self.c), [goal], blocked, self.warehouse)
+            route = self.plan(None, [goal], blocked)
             if route:
                 if route[0] == (self.r, self.c):
                     route = route[1:]
                 self.path = route
             return
-
-    # ---------------- DRAW ----------------
-    def draw(self, screen):
-        screen.blit(self.sprite, (int(self.x), int(self.y)))
-
-        if self.carrying:
-            margin = 3
-            rect = pygame.Rect(int(self.x), int(self.y), CELL, CELL)
-            pygame.draw.rect(screen, (150, 90, 40), rect, margin)
@@ -0,0 +1,99 @@
+# runner.py
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from benchmark import build_configs, run_episode, format_row, parse_args
+
+# llaves de config que definen un escenario (todo menos la seed)
+SCENARIO_KEYS = ("width", "height", "initial_boxes", "num_robots", "pile_capacity", "pathfinder", "allocation",
+                 "cooperative", "layout", "path_cache", "deadlock")
+
+
+def scenario_sort_key(result):
+    """Orden de escenarios que tolera llaves ausentes o None (p. ej. sin layout)."""
+    values = (result.get(k) for k in SCENARIO_KEYS)
+    return tuple((v is None, v) for v in values), result.get("seed")
+
+
+class RunningStats:
+    """
+    Agrega resultados por escenario conforme van llegando
+    (media y desviación con Welford, sin guardar todos los episodios).
+    """
+
+    FIELDS = ("ticks", "total_moves", "delivered_per_tick", "search_expanded", "wall_ms_per_tick")
+
+    def __init__(self):
+        self.groups = {}
+
+    def add(self, result):
+        key = tuple(result.get(k) for k in SCENARIO_KEYS)
+        g = self.groups.setdefault(key, {
+            "episodes": 0, "successes": 0,
+            "mean": dict.fromkeys(self.FIELDS, 0.0),
+            "m2": dict.fromkeys(self.FIELDS, 0.0),
+        })
+        g["episodes"] += 1
+        g["successes"] += int(result["success"])
+        n = g["episodes"]
+        for f in self.FIELDS:
+            x = result[f]
+            delta = x - g["mean"][f]
+            g["mean"][f] += delta / n
+            g["m2"][f] += delta * (x - g["mean"][f])
+
+    def report(self):
+        rows = []
+        for key, g in sorted(self.groups.items(), key=lambda kv: str(kv[0])):
+            n = g["episodes"]
+            row = dict(zip(SCENARIO_KEYS, key))
+            row["episodes"] = n
+            row["success_rate"] = g["successes"] / n
+            for f in self.FIELDS:
+                row[f + "_mean"] = g["mean"][f]
+                row[f + "_std"] = math.sqrt(g["m2"][f] / (n - 1)) if n > 1 else 0.0
+            rows.append(row)
+        return rows
+
+
+def run_parallel(configs, workers=None):
+    """
+    Reparte episodios independientes (cada uno con su seed) en un pool de procesos.
+    Cada worker crea su propio almacén y robots; los resultados se entregan
+    (yield) en el orden en que terminan.
+    """
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [pool.submit(run_episode, config) for config in configs]
+        for fut in as_completed(futures):
+            yield fut.result()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configs = build_configs(args)
+
+    stats = RunningStats()
+    results = []
+    for res in run_parallel(configs, args.workers):
+        stats.add(res)
+        results.append(res)
+        print(format_row(res), flush=True)
+
+    # orden estable en el archivo, sin importar qué worker terminó primero
+    results.sort(key=scenario_sort_key)
+    with open(args.out, "w") as f:
+        json.dump({"episodes": results, "scenarios": stats.report()}, f, indent=2)
+
+    for row in stats.report():
+        print(
+            f"{row['width']}x{row['height']} boxes={row['initial_boxes']} robots={row['num_robots']} "
+            f"cap={row['pile_capacity']}: ok={row['success_rate']:.0%} "
+            f"ticks={row['ticks_mean']:.0f}±{row['ticks_std']:.0f} "
+            f"moves={row['total_moves_mean']:.0f} ms/tick={row['wall_ms_per_tick_mean']:.3f}"
+        )
+    print(f"{len(results)} episodios -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
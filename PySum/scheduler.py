@@ -0,0 +1,163 @@
+# scheduler.py
+import heapq
+from robot import STUCK_FRAMES
+from profiling import profiler, perf_counter
+
+WAIT = "wait"     # wait_frames > 0: despierta cuando se acaba la espera
+IDLE = "idle"     # form sin ruta: despierta con un pick/drop o cuando vencería el anti-stuck
+MOVE = "move"     # a medio paso de celda: despierta en el tick de llegada
+
+
+class TickScheduler:
+    """
+    Decide qué robots se actualizan en cada tick.
+    Un robot que solo descontaría wait_frames, o que está formado en su meta
+    sin ruta, se duerme en un heap por tick de despertar en vez de llamar
+    update() cada tick; un pick/drop despierta a los formados. Al despertar se ponen al
+    día los contadores que update() habría tocado (wait_frames, stuck_frames),
+    así el episodio es el mismo que actualizando a todos en cada tick.
+    Un robot a medio paso duerme hasta su tick de llegada (los pixeles se
+    interpolan solo al dibujar), así en headless un paso es un evento y no
+    un update por tick.
+    """
+
+    def __init__(self, robots, occupancy):
+        self.robots = robots
+        self.occupancy = occupancy
+        self.version = occupancy.version
+
+        self.awake = set()      # índices a actualizar en el siguiente tick
+        self.sleeping = {}      # índice -> (tipo, tick del último update, tick de despertar, stuck base)
+        self.timers = []        # heap (tick de despertar, índice); entradas viejas se ignoran
+
+        self.stats = {"updates": 0, "skipped_updates": 0, "jumped_ticks": 0}
+
+    def add(self, rb):
+        self.awake.add(rb.i)
+
+    # ---------------- SLEEP / WAKE ----------------
+    def _sleep(self, i, kind, tick, wake, stuck=0):
+        self.sleeping[i] = (kind, tick, wake, stuck)
+        heapq.heappush(self.timers, (wake, i))
+
+    def _wake(self, i, tick):
+        """Despierta al robot i para actualizarse en tick."""
+        kind, since, wake, stuck = self.sleeping.pop(i)
+        f = self.robots[i].fleet
+        skipped = tick - since - 1
+        if kind == WAIT:
+            f.wait_frames[i] = max(0, f.wait_frames[i] - skipped)
+        elif kind == MOVE:
+            pass            # update() a medio paso no toca contadores
+        else:
+            f.stuck_frames[i] = stuck + skipped
+            f.last_r[i], f.last_c[i] = f.r[i], f.c[i]
+        self.stats["skipped_updates"] += skipped
+
+    def wake(self, i, tick):
+        """Despierta al robot i para actualizarse en tick (p. ej. si otro módulo le cambia la ruta)."""
+        if i in self.sleeping:
+            self._wake(i, tick)
+        self.awake.add(i)
+
+    def _classify(self, rb, tick):
+        """Después de update() en tick: ¿sigue activo o se duerme?"""
+        f, i = rb.fleet, rb.i
+        if f.moving[i]:
+            self._sleep(i, MOVE, tick, f.move_t1[i])
+            return
+        wait = f.wait_frames[i]
+        if wait > 0:
+            # los siguientes `wait` updates solo descuentan el contador
+            self._sleep(i, WAIT, tick, tick + wait + 1)
+        elif f.state[i] == "form" and not f.path[i] and self._idle_form(rb):
+            # cada tick solo sumaría stuck_frames; a STUCK_FRAMES entra el anti-stuck.
+            # Si acaba de llegar a la celda, el siguiente update reinicia el contador.
+            stuck = f.stuck_frames[i]
+            if (f.r[i], f.c[i]) != (f.last_r[i], f.last_c[i]):
+                stuck = -1
+            self._sleep(i, IDLE, tick, tick + STUCK_FRAMES - stuck, stuck)
+        else:
+            self.awake.add(i)
+
+    def _idle_form(self, rb):
+        """
+        ¿El plan de form daría lo mismo cada tick? Sí si ya está en su meta, o si
+        la meta es pared/caja (falla hasta el siguiente pick/drop, también con
+        reservas: el planner descarta esa meta antes de buscar).
+        """
+        goal = rb.form_goal()
+        if (rb.r, rb.c) == goal:
+            return True
+        return self.occupancy.is_static_blocked(goal)
+
+    def wake_due(self, tick):
+        """Despierta los timers vencidos; llamar al inicio del tick (antes del dispatcher)."""
+        timers = self.timers
+        while timers and timers[0][0] <= tick:
+            wake, i = heapq.heappop(timers)
+            entry = self.sleeping.get(i)
+            if entry is None or entry[2] != wake:
+                continue
+            self._wake(i, tick)
+            self.awake.add(i)
+
+    def next_wake(self):
+        """Tick del siguiente timer válido, o None si hay robots activos."""
+        if self.awake:
+            return None
+        timers = self.timers
+        while timers:
+            wake, i = timers[0]
+            entry = self.sleeping.get(i)
+            if entry is not None and entry[2] == wake:
+                return wake
+            heapq.heappop(timers)
+        return None
+
+    # ---------------- TICK ----------------
+    def update(self, tick, allowed_map):
+        """
+        update() de los robots activos, en orden de id como antes.
+        Devuelve cuántos robots cambiaron de celda.
+        """
+        moved = 0
+        queue = sorted(self.awake)
+        self.awake = set()
+        occ = self.occupancy
+        profiling = profiler.enabled
+        while queue:
+            i = heapq.heappop(queue)
+            rb = self.robots[i]
+            moves = rb.fleet.moves[i]
+            if profiling:
+                state = rb.state
+                t0 = perf_counter()
+                rb.update(allowed_map)
+                profiler.state_update(state, perf_counter() - t0)
+            else:
+                rb.update(allowed_map)
+            moved += rb.fleet.moves[i] - moves
+            self.stats["updates"] += 1
+
+            if occ.version != self.version:
+                # pick/drop: los formados sin ruta vuelven a planear; los de id mayor
+                # todavía en este tick, los de id menor desde el siguiente
+                self.version = occ.version
+                for j in [j for j, e in self.sleeping.items() if e[0] == IDLE]:
+                    if j > i:
+                        self._wake(j, tick)
+                        heapq.heappush(queue, j)
+                    else:
+                        self._wake(j, tick + 1)
+                        self.awake.add(j)
+
+            self._classify(rb, tick)
+        return moved
+
+    def settle(self, tick):
+        """Clasifica a todos después de un update() hecho fuera del scheduler."""
+        self.version = self.occupancy.version
+        self.awake = set()
+        for rb in self.robots:
+            self._classify(rb, tick)
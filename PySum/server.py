@@ -0,0 +1,309 @@
+# server.py
+import argparse
+import asyncio
+import json
+import random
+import numpy as np
+from simulation import Simulation
+from replay import StateDiff, header_record
+
+HOST = "127.0.0.1"
+PORT = 8765
+TICKS_PER_SECOND = 30      # como game.py; 0 = sin límite
+BATCH_TICKS = 30           # ticks seguidos sin límite antes de atender sockets
+QUEUE_LINES = 512          # líneas pendientes por viewer antes de mandarle un keyframe nuevo
+COMMAND_BYTES = 64 * 1024  # largo máximo de una línea de comando
+
+
+def _line(record):
+    return (json.dumps(record, separators=(",", ":")) + "\n").encode()
+
+
+class Viewer:
+    """Un cliente conectado: cola acotada de líneas ya codificadas."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.queue = asyncio.Queue(QUEUE_LINES)
+        self.resyncs = 0
+
+
+class SimulationServer:
+    """
+    Corre una Simulation en un loop de asyncio y la transmite por TCP en JSON lines,
+    el mismo formato que replay.py: al conectarse cada viewer recibe header y un
+    keyframe, y luego un delta por tick con cambios (ver StateDiff) y "end" al terminar.
+
+    La simulación nunca espera a los viewers: cada uno tiene una cola de
+    QUEUE_LINES líneas; si se llena (viewer lento) se vacía y se le manda un
+    keyframe del tick actual, así vuelve a quedar al día sin frenar a los demás.
+
+    Comandos (una línea JSON por comando; la respuesta llega como "ack" o "error"):
+      {"cmd": "pause"} / {"cmd": "resume"}
+      {"cmd": "speed", "tps": 60}            0 = sin límite
+      {"cmd": "step", "ticks": 1}            avanza estando en pausa
+      {"cmd": "inject", "cells": [[r, c]]}   y/o "count": n en celdas libres al azar
+      {"cmd": "status"}
+      {"cmd": "stop"}                        cierra el servidor
+    """
+
+    skips_idle_ticks = True
+
+    def __init__(self, sim, host=HOST, port=PORT, tps=TICKS_PER_SECOND, paused=False, seed=None):
+        self.sim = sim
+        self.host = host
+        self.port = port
+        self.tps = tps
+        self.paused = paused
+        self.rng = random.Random(seed)      # celdas de "inject" (no toca el rng de la simulación)
+        self.viewers = set()
+        self.diff = StateDiff(sim)
+        self.header = _line(header_record(sim))
+        self.ended = False
+        self.pending_steps = 0
+        self.changed = None             # asyncio.Event: pausa/velocidad/comandos
+        self.stopped = None
+        self.stats = {"ticks_sent": 0, "lines_sent": 0, "resyncs": 0}
+        sim.add_observer(self)
+
+    # ---------------- BROADCAST ----------------
+    def __call__(self, sim):
+        """Observer: un delta por tick con cambios, y "end" al terminar."""
+        self.publish()
+        if sim.finished and not self.ended:
+            self.ended = True
+            self._broadcast(_line({"type": "end", "t": sim.tick, "summary": sim.summary()}))
+
+    def publish(self):
+        delta = self.diff.delta()
+        if delta:
+            delta["t"] = self.sim.tick
+            self._broadcast(_line(delta))
+            self.stats["ticks_sent"] += 1
+
+    def _broadcast(self, line):
+        if not self.viewers:
+            return
+        key = None
+        for viewer in self.viewers:
+            try:
+                viewer.queue.put_nowait(line)
+            except asyncio.QueueFull:
+                # viewer atrasado: sus deltas ya no sirven, un keyframe lo pone al día
+                if key is None:
+                    key = _line(self.diff.keyframe())
+                self._drain(viewer.queue)
+                viewer.queue.put_nowait(key)
+                viewer.resyncs += 1
+                self.stats["resyncs"] += 1
+
+    @staticmethod
+    def _drain(queue):
+        while not queue.empty():
+            queue.get_nowait()
+
+    def _send(self, viewer, record):
+        try:
+            viewer.queue.put_nowait(_line(record))
+        except asyncio.QueueFull:
+            pass
+
+    # ---------------- CONNECTIONS ----------------
+    async def _handle(self, reader, writer):
+        viewer = Viewer(reader, writer)
+        viewer.queue.put_nowait(self.header)
+        viewer.queue.put_nowait(_line(self.diff.keyframe()))
+        self.viewers.add(viewer)
+        sender = asyncio.ensure_future(self._sender(viewer))
+        try:
+            while True:
+                try:
+                    raw = await reader.readline()
+                except ValueError:
+                    # línea más larga que COMMAND_BYTES: el stream ya la descartó
+                    self._send(viewer, {"type": "error", "msg": "comando demasiado largo"})
+                    continue
+                if not raw:
+                    break
+                self._command(viewer, raw)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.viewers.discard(viewer)
+            sender.cancel()
+            writer.close()
+
+    async def _sender(self, viewer):
+        writer = viewer.writer
+        try:
+            while True:
+                line = await viewer.queue.get()
+                writer.write(line)
+                self.stats["lines_sent"] += 1
+                # drain() espera solo a este viewer si su socket está lleno
+                await writer.drain()
+        except ConnectionError:
+            self.viewers.discard(viewer)
+
+    # ---------------- COMMANDS ----------------
+    def _command(self, viewer, raw):
+        try:
+            msg = json.loads(raw)
+            cmd = msg["cmd"]
+            handler = getattr(self, "cmd_" + cmd, None)
+            if handler is None:
+                raise ValueError(f"comando desconocido: {cmd}")
+            reply = handler(msg) or {}
+        except (ValueError, KeyError, TypeError) as e:
+            self._send(viewer, {"type": "error", "msg": str(e)})
+            return
+        reply.update(type="ack", cmd=cmd, t=self.sim.tick)
+        self._send(viewer, reply)
+        self.changed.set()
+
+    def cmd_pause(self, msg):
+        self.paused = True
+
+    def cmd_resume(self, msg):
+        self.paused = False
+
+    def cmd_speed(self, msg):
+        tps = float(msg["tps"])
+        if tps < 0:
+            raise ValueError("tps debe ser >= 0")
+        self.tps = tps
+
+    def cmd_step(self, msg):
+        self.pending_steps += max(1, int(msg.get("ticks", 1)))
+
+    def cmd_inject(self, msg):
+        cells = [self._cell(cell) for cell in msg.get("cells", ())]
+        count = int(msg.get("count", 0))
+        if count:
+            cells += self._random_cells(count)
+        added = self.sim.add_boxes(cells)
+        if added:
+            self.ended = False
+            self.publish()
+        return {"added": [list(cell) for cell in added]}
+
+    def cmd_status(self, msg):
+        sim = self.sim
+        return dict(
+            self.stats, paused=self.paused, tps=self.tps, viewers=len(self.viewers),
+            finished=sim.finished, delivered=sim.occupancy.delivered,
+            loose=len(sim.occupancy.loose_boxes),
+        )
+
+    def cmd_stop(self, msg):
+        self.stopped.set()
+
+    @staticmethod
+    def _cell(value):
+        """[r, c] de un comando como tupla; ValueError si no son dos enteros."""
+        if not isinstance(value, (list, tuple)) or len(value) != 2 or not all(
+                isinstance(v, int) and not isinstance(v, bool) for v in value):
+            raise ValueError(f"celda inválida: {value!r} (se espera [r, c])")
+        return tuple(value)
+
+    def _random_cells(self, count):
+        occ = self.sim.occupancy
+        free = ~occ.static_mask() & ~occ.dest_mask
+        for r, c in occ.robot_count:
+            free[r, c] = False
+        cells = np.argwhere(free)
+        picked = self.rng.sample(range(len(cells)), min(count, len(cells)))
+        return [tuple(cells[k]) for k in picked]
+
+    # ---------------- LOOP ----------------
+    async def _loop(self):
+        loop = asyncio.get_running_loop()
+        sim = self.sim
+        deadline = loop.time()
+        while True:
+            if sim.finished or (self.paused and not self.pending_steps):
+                await self._wait_changed()
+                deadline = loop.time()
+                continue
+            if self.pending_steps:
+                self.pending_steps -= 1
+                sim.step()
+                await asyncio.sleep(0)
+                continue
+            if self.tps <= 0:
+                # sin límite: un lote (con saltos de ticks quietos) y luego a los sockets
+                sim.run(max_ticks=BATCH_TICKS)
+                await asyncio.sleep(0)
+                deadline = loop.time()
+                continue
+
+            now = loop.time()
+            if now < deadline:
+                # un comando despierta antes de tiempo: se vuelve a revisar sin avanzar
+                await self._wait_changed(deadline - now)
+                continue
+            sim.step()
+            # muy atrasado: no intentar recuperar de golpe
+            deadline = max(deadline + 1.0 / self.tps, now - 1.0)
+
+    async def _wait_changed(self, timeout=None):
+        try:
+            await asyncio.wait_for(self.changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return
+        self.changed.clear()
+
+    async def serve(self):
+        self.changed = asyncio.Event()
+        self.stopped = asyncio.Event()
+        server = await asyncio.start_server(self._handle, self.host, self.port, limit=COMMAND_BYTES)
+        self.port = server.sockets[0].getsockname()[1]
+        loop = asyncio.ensure_future(self._loop())
+        try:
+            await self.stopped.wait()
+        finally:
+            loop.cancel()
+            server.close()
+            for viewer in list(self.viewers):
+                viewer.writer.close()
+            await server.wait_closed()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor de la simulación (JSON lines por TCP)")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--tps", type=float, default=TICKS_PER_SECOND, help="ticks por segundo (0 = sin límite)")
+    parser.add_argument("--paused", action="store_true", help="empieza en pausa")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--boxes", type=int, default=30)
+    parser.add_argument("--robots", type=int, default=5)
+    parser.add_argument("--time-limit", type=int, default=None, help="ticks por episodio")
+    parser.add_argument("--pathfinder", default="bfs", choices=["bfs", "astar", "jps", "hpa"])
+    parser.add_argument("--allocation", default="hungarian", choices=["none", "greedy", "auction", "hungarian"])
+    parser.add_argument("--cooperative", action="store_true")
+    parser.add_argument("--layout", default=None, help=".npz de layout.py")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sim_kwargs = dict(
+        seed=args.seed, initial_boxes=args.boxes, num_robots=args.robots,
+        pathfinder=args.pathfinder, allocation=None if args.allocation == "none" else args.allocation,
+        cooperative=args.cooperative, layout=args.layout,
+    )
+    if args.time_limit is not None:
+        sim_kwargs["time_limit_ticks"] = args.time_limit
+    server = SimulationServer(Simulation(**sim_kwargs), args.host, args.port, args.tps,
+                              paused=args.paused, seed=args.seed)
+    print(f"sirviendo en {args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
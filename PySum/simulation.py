@@ -0,0 +1,379 @@
+# simulation.py
+import random
+from warehouse import create_warehouse, wall_mask
+from config import FPS, GRID_W, GRID_H, PILE_CAPACITY
+from robot import Robot
+from fleet import Fleet
+from scheduler import TickScheduler
+from profiling import profiler, perf_counter
+from occupancy import Occupancy
+from layout import load_layout
+from distance_field import DistanceFieldCache
+from pathfinding import PATHFINDERS
+from hierarchical import HierarchicalPathfinder
+from path_cache import PathCache
+from dispatcher import Dispatcher
+from piles import PileManager
+from reservation import CooperativePlanner
+from deadlock import DeadlockDetector
+from intentions import IntentionResolver
+from snapshot import Snapshot
+
+NUM_ROBOTS = 5
+COLORS = [(200,50,50),(50,200,50),(50,50,200),(200,200,50),(200,50,200)]
+
+TIME_LIMIT_S = 100
+TIME_LIMIT_TICKS = TIME_LIMIT_S * FPS   # 100 segundos a 30 ticks por segundo
+
+
+class Simulation:
+    """
+    Motor de la simulación sin pygame.
+    Guarda el almacén, los robots y la resolución de intenciones;
+    cada step() avanza un tick lógico (equivalente a un frame de game.py).
+    El render es opcional: se registra como observer con add_observer().
+    Con seed, el almacén, el spawn y los wait_frames salen de un random.Random
+    propio, así el mismo seed repite el mismo episodio.
+    """
+
+    def __init__(self, initial_boxes=30, num_robots=NUM_ROBOTS, max_stack_initial=1,
+                 time_limit_ticks=TIME_LIMIT_TICKS, shared_fields=True, pathfinder="bfs",
+                 width=GRID_W, height=GRID_H, pile_capacity=PILE_CAPACITY, seed=None,
+                 allocation="hungarian", cooperative=False, layout=None,
+                 path_cache=0, deadlock=True):
+        self.seed = seed
+        self.rng = random.Random(seed) if seed is not None else random
+        self.pile_capacity = pile_capacity
+
+        # layout: Layout de layout.py o ruta a un .npz (paredes internas, varias zonas
+        # y capacidad por pila); sin layout, el almacén clásico de create_warehouse
+        if layout is not None:
+            if isinstance(layout, str):
+                layout = load_layout(layout)
+            self.warehouse = layout.boxes.copy()
+            self.destination_cells = list(layout.destinations)
+            walls, capacity = layout.walls, layout.capacity
+        else:
+            self.warehouse, self.destination_cells = create_warehouse(
+                initial_boxes=initial_boxes, max_stack_initial=max_stack_initial,
+                width=width, height=height, rng=self.rng
+            )
+            walls, capacity = wall_mask(*self.warehouse.shape), pile_capacity
+        self.occupancy = Occupancy(self.warehouse, walls, self.destination_cells, capacity)
+        self.walls = self.occupancy.walls
+        self.wall_mask = self.occupancy.wall_mask
+        # campos de distancia compartidos por todos los robots
+        self.fields = DistanceFieldCache(self.occupancy) if shared_fields else None
+        # "hpa": búsqueda jerárquica por clusters (necesita la ocupación, no es una función)
+        if pathfinder == "hpa":
+            self.pathfinder = HierarchicalPathfinder(self.occupancy)
+        else:
+            self.pathfinder = PATHFINDERS[pathfinder]
+        # path_cache: rutas en la LRU (0 = sin caché)
+        self.path_cache = None
+        if path_cache:
+            self.path_cache = self.pathfinder = PathCache(self.pathfinder, self.occupancy, path_cache)
+        # asignación central de cajas/pilas: None (greedy por robot), "greedy", "auction" o "hungarian"
+        self.dispatcher = None
+        if allocation is not None:
+            self.dispatcher = Dispatcher(self.occupancy, self.destination_cells, allocation)
+        # carga y reservas por pila destino: cada robot con caja recibe la mejor pila
+        self.piles = PileManager(self.occupancy, self.destination_cells)
+        # reservas espacio-tiempo compartidas (WHCA*) en vez de rutas independientes
+        self.planner = CooperativePlanner(self.occupancy, self.fields) if cooperative else None
+        self.time_limit_ticks = time_limit_ticks
+
+        # estado de los robots en columnas compartidas; self.robots son vistas
+        self.fleet = Fleet(self.occupancy, self.destination_cells, fields=self.fields,
+                           pathfinder=self.pathfinder, rng=self.rng,
+                           dispatcher=self.dispatcher, planner=self.planner, piles=self.piles)
+        self.robots = []
+        # solo se actualizan los robots con algo que hacer en el tick
+        self.scheduler = TickScheduler(self.robots, self.occupancy)
+        # ciclos y cadenas de espera entre robots, resueltos en el tick en que aparecen
+        # (con WHCA* quedan los que las reservas no evitan, p. ej. robots detenidos)
+        self.deadlocks = None
+        if deadlock:
+            self.deadlocks = DeadlockDetector(self.robots, self.occupancy, self.scheduler,
+                                              self.planner)
+        # fase de movimiento por lotes: conflictos de celda, intercambios y cadenas
+        self.intentions = IntentionResolver(self.robots, self.occupancy, self.scheduler, self.planner)
+        self.tick = 0
+        self.total_moves = 0
+        self.finished = False
+        self.success = False
+        self.observers = []
+        self.quiet = False
+
+        self.spawn_robots(num_robots)
+
+        # initialize robots
+        self.park_idle()
+        if self.dispatcher is not None:
+            self.dispatcher.assign(self.robots)
+        for rb in self.robots:
+            rb.update({})
+        self.scheduler.settle(self.tick - 1)
+
+    # ---------------- SETUP ----------------
+    def _free_for_robot(self, r, c):
+        return not self.occupancy.is_blocked((r, c))
+
+    def _add_robot(self, rid, r, c, color):
+        self.occupancy.add_robot(rid, (r, c))
+        self.robots.append(Robot(rid, r, c, self.occupancy, self.destination_cells, color,
+                                 fleet=self.fleet))
+        self.scheduler.add(self.robots[-1])
+
+    def spawn_robots(self, num_robots):
+        """
+        Coloca robots en celdas vacías (sin cajas, paredes ni otros robots).
+        Primero intenta al azar y si no, recorre la rejilla.
+        """
+        H, W = self.warehouse.shape
+        first = len(self.robots)
+
+        for i in range(first, first + num_robots):
+            color = COLORS[i % len(COLORS)]
+            placed = False
+            for attempt in range(500):
+                r = self.rng.randint(0, H - 2)  # avoid bottom row spawn
+                c = self.rng.randint(0, W - 1)
+                if self._free_for_robot(r, c):
+                    self._add_robot(i, r, c, color)
+                    placed = True
+                    break
+
+            if not placed:
+                for rr in range(H - 1):
+                    for cc in range(W):
+                        if self._free_for_robot(rr, cc):
+                            self._add_robot(i, rr, cc, color)
+                            placed = True
+                            break
+                    if placed:
+                        break
+
+    def add_robots(self, num_robots):
+        """
+        Agrega robots en medio del episodio (ids siguientes, celdas libres al azar).
+        Los observers con StateDiff (replay, server) los mandan como "r" en el siguiente delta.
+        """
+        first = len(self.robots)
+        self.spawn_robots(num_robots)
+        self.quiet = False
+        return self.robots[first:]
+
+    def add_observer(self, observer):
+        """
+        observer(sim) se llama después de cada step(). Si el observer tiene
+        skips_idle_ticks = True, run() puede saltarse ticks sin cambios.
+        """
+        self.observers.append(observer)
+
+    def add_boxes(self, cells):
+        """
+        Agrega cajas sueltas en medio del episodio (una por celda libre: sin pared,
+        caja, pila ni robot). Los formados vuelven a buscar y, si el episodio ya
+        había terminado con éxito antes del límite, sigue corriendo.
+        Devuelve las celdas donde sí se puso caja.
+        """
+        occ = self.occupancy
+        added = []
+        for r, c in cells:
+            cell = (int(r), int(c))
+            if not (0 <= cell[0] < occ.H and 0 <= cell[1] < occ.W):
+                continue
+            if occ.is_blocked(cell) or cell in occ.destinations or cell in added:
+                continue
+            if self.fleet.entering(cell) is not None:
+                continue
+            occ.drop(*cell)
+            added.append(cell)
+        if not added:
+            return added
+
+        for rb in self.robots:
+            if rb.state == "form" and not rb.carrying:
+                rb.state = "search"
+                rb.path = []
+            self.scheduler.wake(rb.i, self.tick)
+        self.quiet = False
+        if self.finished and self.tick < self.time_limit_ticks:
+            self.finished = False
+            self.success = False
+        return added
+
+    # ---------------- CHECKPOINTS ----------------
+    def snapshot(self):
+        """Snapshot del estado completo (ver snapshot.py); restore() da una copia independiente."""
+        return Snapshot.take(self)
+
+    def fork(self):
+        """Copia independiente en el tick actual, para probar cambios sin tocar esta."""
+        return self.snapshot().restore()
+
+    # ---------------- STEP ----------------
+    def park_idle(self):
+        """
+        Con planner cooperativo, los robots sin ruta ocupan su celda en la tabla,
+        los que esperaban con una ruta que ya no es libre se despiertan a
+        replanear y los detenidos a los que otro pidió paso se hacen a un lado.
+        """
+        planner = self.planner
+        if planner is None:
+            return
+        planner.tick = self.tick
+        for rb in self.robots:
+            if not rb.path:
+                planner.park(rb)
+        for rid in sorted(planner.stale):
+            rb = self.robots[rid]
+            if rb.wait_frames > 0:
+                rb.wait_frames = 0
+                self.scheduler.wake(rb.i, self.tick)
+        planner.stale.clear()
+        for rid in sorted(planner.yields):
+            rb = self.robots[rid]
+            if rb.moving:
+                del planner.yields[rid]     # ya va saliendo de la celda
+                continue
+            route = planner.sidestep(rb)
+            if route:
+                rb.path = route
+                rb.wait_frames = 0
+                self.scheduler.wake(rb.i, self.tick)
+
+    def resolve_intentions(self):
+        """Movimientos del tick resueltos juntos (ver intentions.py)."""
+        return self.intentions.resolve()
+
+    def remaining_outside(self):
+        """¿Quedan cajas fuera de la fila destino?"""
+        return bool(self.occupancy.loose_boxes)
+
+    def step(self):
+        if self.finished:
+            return
+
+        profiling = profiler.enabled
+        if profiling:
+            profiler.begin_tick(self.tick)
+
+        self.fleet.now = self.tick
+        self.scheduler.wake_due(self.tick)
+        if self.dispatcher is not None:
+            if profiling:
+                t0 = perf_counter()
+                self.dispatcher.assign(self.robots)
+                profiler.add_time("dispatch", perf_counter() - t0)
+            else:
+                self.dispatcher.assign(self.robots)
+
+        self.park_idle()
+        if self.deadlocks is not None:
+            self.deadlocks.resolve(self.tick)
+        allowed_map = self.resolve_intentions()
+
+        # update robots (solo los despiertos)
+        updates = self.scheduler.stats["updates"]
+        self.total_moves += self.scheduler.update(self.tick, allowed_map)
+        # tick sin ningún update: los siguientes son iguales hasta el próximo despertar
+        self.quiet = self.scheduler.stats["updates"] == updates
+
+        self.tick += 1
+
+        # ---------------- CHECK COMPLETION ----------------
+        remaining_outside = self.remaining_outside()
+        robots_carrying = any(rb.carrying for rb in self.robots)
+        formed = all(rb.state == "form" and not rb.path for rb in self.robots)
+
+        # Si ya NO hay cajas fuera de la fila destino,
+        # los robots que NO traen caja se pueden ir a formar
+        if not remaining_outside:
+            for rb in self.robots:
+                if not rb.carrying and rb.state != "form":
+                    rb.state = "form"
+                    rb.path = []
+                    self.quiet = False
+
+        # Cuando ya no hay cajas fuera, nadie trae caja y todos se formaron → éxito
+        if not remaining_outside and not robots_carrying and formed:
+            self.finished = True
+            self.success = True
+        elif self.tick >= self.time_limit_ticks:
+            self.finished = True
+
+        if profiling and self.observers:
+            t0 = perf_counter()
+            for observer in self.observers:
+                observer(self)
+            profiler.add_time("observers", perf_counter() - t0)
+        else:
+            for observer in self.observers:
+                observer(self)
+
+        if profiling:
+            profiler.end_tick()
+
+    def run(self, max_ticks=None):
+        """
+        Corre sin límite de FPS hasta terminar (éxito o tiempo agotado)
+        o hasta max_ticks pasos. Devuelve summary().
+        Sin observers (o si todos aceptan saltos), los ticks en que todos los
+        robots duermen se saltan de un brinco hasta el siguiente despertar.
+        """
+        steps = 0
+        while not self.finished and (max_ticks is None or steps < max_ticks):
+            start = self.tick
+            if all(getattr(o, "skips_idle_ticks", False) for o in self.observers):
+                self._skip_idle_ticks(max_ticks, steps)
+            self.step()
+            steps += self.tick - start
+        return self.summary()
+
+    def _skip_idle_ticks(self, max_ticks, steps):
+        if not self.quiet:
+            return
+        wake = self.scheduler.next_wake()
+        if wake is None or wake <= self.tick:
+            return
+        # el último tick no cambió nada y nadie despierta antes de wake:
+        # los ticks intermedios serían idénticos (ni robots, ni cajas, ni éxito)
+        target = min(wake, self.time_limit_ticks - 1)
+        if max_ticks is not None:
+            target = min(target, self.tick + max_ticks - steps - 1)
+        if target > self.tick:
+            self.scheduler.stats["jumped_ticks"] += target - self.tick
+            self.tick = target
+
+    @property
+    def elapsed_s(self):
+        return self.tick / FPS
+
+    def summary(self):
+        summary = {
+            "success": self.success,
+            "finished": self.finished,
+            "ticks": self.tick,
+            "time_s": self.elapsed_s,
+            "total_moves": self.total_moves,
+            "delivered": self.occupancy.delivered,
+            "robot_updates": self.scheduler.stats["updates"],
+        }
+        if self.planner is not None:
+            summary.update(self.planner.stats)
+        if self.deadlocks is not None:
+            summary.update(self.deadlocks.report())
+        summary.update(self.intentions.report())
+        pathfinder = self.pathfinder
+        if self.path_cache is not None:
+            summary.update(self.path_cache.report())
+            pathfinder = self.path_cache.pathfinder
+        if isinstance(pathfinder, HierarchicalPathfinder):
+            summary.update(pathfinder.stats)
+        return summary
+
+
+if __name__ == "__main__":
+    print(Simulation().run())
@@ -0,0 +1,141 @@
+# snapshot.py
+import io
+import pickle
+import random
+import struct
+import zlib
+
+MAGIC = b"PYSUMSNP"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sHHq")     # magic, versión, banderas, tick
+COMPRESSED = 1
+
+# clases y funciones que puede nombrar un snapshot: las de la simulación y unos
+# pocos constructores de la biblioteca estándar y numpy; nada más se importa al cargar
+SIM_MODULES = frozenset((
+    "bfs", "deadlock", "dispatcher", "distance_field", "fleet", "hierarchical", "intentions",
+    "occupancy", "path_cache", "pathfinding", "piles", "profiling", "reservation", "robot",
+    "scheduler", "simulation",
+))
+SAFE_GLOBALS = frozenset((
+    ("array", "array"), ("array", "_array_reconstructor"),
+    ("collections", "deque"), ("collections", "OrderedDict"),
+    ("random", "Random"),
+    ("numpy", "dtype"), ("numpy", "ndarray"),
+    ("numpy.core.multiarray", "_reconstruct"), ("numpy._core.multiarray", "_reconstruct"),
+    ("numpy.core.numeric", "_frombuffer"), ("numpy._core.numeric", "_frombuffer"),
+))
+
+
+class _Pickler(pickle.Pickler):
+    """
+    Pickler de la simulación completa, con dos excepciones:
+    - los observers (archivos de replay, sockets del servidor) no se guardan;
+    - si la simulación usa el módulo random (seed=None), se guarda el estado
+      global del módulo y al restaurar se vuelve un random.Random propio.
+    """
+
+    def __init__(self, file, sim):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.observers = sim.observers
+
+    def persistent_id(self, obj):
+        if obj is random:
+            return ("random", random.getstate())
+        if obj is self.observers:
+            return ("observers",)
+        return None
+
+
+class _Unpickler(pickle.Unpickler):
+    """Solo deja construir objetos de SIM_MODULES / SAFE_GLOBALS (ver Snapshot)."""
+
+    def __init__(self, file):
+        super().__init__(file)
+        self.rng = None     # un solo Random para todas las referencias al módulo
+
+    def persistent_load(self, pid):
+        if pid[0] == "random":
+            if self.rng is None:
+                self.rng = random.Random()
+                self.rng.setstate(pid[1])
+            return self.rng
+        if pid[0] == "observers":
+            return []
+        raise pickle.UnpicklingError(f"referencia desconocida: {pid!r}")
+
+    def find_class(self, module, name):
+        public = module in SIM_MODULES and not name.startswith("_") and "." not in name
+        if public or (module, name) in SAFE_GLOBALS:
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f"global no permitido en un snapshot: {module}.{name}")
+
+
+class Snapshot:
+    """
+    Estado completo de una Simulation en un tick: almacén, índices de ocupación,
+    fleet, scheduler, dispatcher, pilas, cachés de rutas y el estado del RNG.
+    Es un solo bloque de bytes inmutable; restore() arma una Simulation nueva e
+    independiente cada vez, así varias ramas salen del mismo checkpoint sin
+    copiarlo y sin repetir el episodio desde el tick 0:
+
+        snap = sim.snapshot()
+        branch = snap.restore()
+        branch.add_robots(5)
+        print(branch.run(), snap.restore().run())
+
+    Una rama restaurada sin cambios sigue exactamente igual que el original.
+    Los observers no se guardan (hay que volver a conectarlos).
+
+    Los archivos son pickle: from_bytes()/load() rechazan cabeceras de otro
+    formato o versión y solo construyen clases de la simulación, pero cargar
+    sigue ejecutando el código de esas clases. Solo se cargan snapshots
+    propios o de confianza, nunca algo recibido por red (server.py no expone
+    carga de snapshots).
+    """
+
+    def __init__(self, data, tick):
+        self.data = data
+        self.tick = tick
+
+    @classmethod
+    def take(cls, sim):
+        buf = io.BytesIO()
+        _Pickler(buf, sim).dump(sim)
+        return cls(buf.getvalue(), sim.tick)
+
+    def restore(self):
+        return _Unpickler(io.BytesIO(self.data)).load()
+
+    def fork(self, count):
+        """count simulaciones independientes desde este checkpoint."""
+        return [self.restore() for _ in range(count)]
+
+    def __len__(self):
+        return len(self.data)
+
+    # ---------------- FILES ----------------
+    def to_bytes(self, compress=True):
+        """Cabecera fija (magic, versión, banderas, tick) + pickle, opcionalmente zlib."""
+        flags = COMPRESSED if compress else 0
+        body = zlib.compress(self.data, 1) if compress else self.data
+        return _HEADER.pack(MAGIC, FORMAT_VERSION, flags, self.tick) + body
+
+    @classmethod
+    def from_bytes(cls, raw):
+        magic, version, flags, tick = _HEADER.unpack_from(raw)
+        if magic != MAGIC:
+            raise ValueError("no es un snapshot de la simulación")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"versión de snapshot no soportada: {version}")
+        body = raw[_HEADER.size:]
+        return cls(zlib.decompress(body) if flags & COMPRESSED else bytes(body), tick)
+
+    def save(self, path, compress=True):
+        with open(path, "wb") as fh:
+            fh.write(self.to_bytes(compress))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as fh:
+            return cls.from_bytes(fh.read())
@@ -0,0 +1,6 @@
+# conftest.py
+import os
+import sys
+
+# los módulos de PySum se importan planos (from bfs import bfs), como al correr desde PySum/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
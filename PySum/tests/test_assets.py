@@ -0,0 +1,27 @@
+# test_assets.py
+import os
+import pytest
+
+pygame = pytest.importorskip("pygame")
+from assets import AssetCache  # noqa: E402
+
+SOURCES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sources")
+
+
+@pytest.fixture
+def display(monkeypatch):
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    pygame.display.set_mode((8, 8))
+    yield
+    pygame.display.quit()
+
+
+def test_alpha_and_opaque_loads_are_cached_apart(display):
+    cache = AssetCache(SOURCES)
+    opaque = cache.image("box.png", (16, 16), alpha=False)
+    alpha = cache.image("box.png", (16, 16), alpha=True)
+    assert opaque is not alpha
+    assert not opaque.get_flags() & pygame.SRCALPHA
+    assert alpha.get_flags() & pygame.SRCALPHA
+    assert cache.image("box.png", (16, 16), alpha=False) is opaque
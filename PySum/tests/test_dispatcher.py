@@ -0,0 +1,79 @@
+# test_dispatcher.py
+import itertools
+import random
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from occupancy import Occupancy
+from distance_field import DistanceField, UNREACHABLE
+from dispatcher import Dispatcher, hungarian_assignment, auction_assignment, STRATEGIES
+
+
+def brute_force(cost, BIG):
+    """Mínimo costo total probando todas las asignaciones (BIG cuenta como no asignar)."""
+    n, m = len(cost), len(cost[0])
+    if n <= m:
+        return min(sum(cost[i][j] for i, j in enumerate(cols))
+                   for cols in itertools.permutations(range(m), n))
+    return min(sum(cost[i][j] for j, i in enumerate(rows))
+               for rows in itertools.permutations(range(n), m))
+
+
+def total(cost, pairs, BIG):
+    """Costo de pairs contando BIG por cada robot o caja que quedó sin pareja posible."""
+    n, m = len(cost), len(cost[0])
+    assert len({i for i, _ in pairs}) == len(pairs) == len({j for _, j in pairs})
+    return sum(cost[i][j] for i, j in pairs) + BIG * (min(n, m) - len(pairs))
+
+
+@pytest.mark.parametrize("strategy", [hungarian_assignment, auction_assignment])
+def test_assignment_is_optimal_on_small_matrices(strategy):
+    rng = random.Random(7)
+    BIG = 100
+    for _ in range(300):
+        n, m = rng.randint(1, 5), rng.randint(1, 5)
+        cost = [[BIG if rng.random() < 0.15 else rng.randint(0, 20) for _ in range(m)]
+                for _ in range(n)]
+        assert total(cost, strategy(cost, BIG), BIG) == brute_force(cost, BIG)
+
+
+def random_occupancy(rng, H=14, W=18):
+    warehouse = np.zeros((H, W), np.uint8)
+    walls = np.zeros((H, W), bool)
+    walls[0, :] = walls[-1, :] = walls[:, 0] = walls[:, -1] = True
+    for r in range(1, H - 1):
+        for c in range(1, W - 1):
+            x = rng.random()
+            if x < 0.1:
+                walls[r, c] = True
+            elif x < 0.16:
+                warehouse[r, c] = 1
+    return Occupancy(warehouse, walls)
+
+
+@pytest.mark.parametrize("strategy", sorted(STRATEGIES))
+def test_assign_matches_full_distance_costs(strategy):
+    # el BFS por robot se corta en sus n cajas más cercanas: el costo total debe
+    # ser el mismo que con los campos de todo el mapa
+    for seed in range(25):
+        rng = random.Random(seed)
+        occ = random_occupancy(rng)
+        free = sorted((r, c) for r in range(occ.H) for c in range(occ.W)
+                      if not occ.is_static_blocked((r, c)))
+        robots = [SimpleNamespace(id=k, r=r, c=c, state="search", carrying=False,
+                                  target_box=None, wait_frames=0)
+                  for k, (r, c) in enumerate(rng.sample(free, rng.randint(1, 4)))]
+        dispatcher = Dispatcher(occ, [], strategy)
+        boxes = sorted(occ.loose_boxes)
+        BIG = dispatcher.BIG
+        cost = []
+        for rb in robots:
+            field = DistanceField([(rb.r, rb.c)], occ.static_mask())
+            dists = [[field.distance(n) for n in dispatcher.box_goals(b)] for b in boxes]
+            cost.append([min((d for d in ds if d != UNREACHABLE), default=BIG) for ds in dists])
+
+        dispatcher.assign(robots)
+        pairs = [(i, boxes.index(rb.target_box)) for i, rb in enumerate(robots)
+                 if rb.target_box is not None]
+        expected = STRATEGIES[strategy](cost, BIG)
+        assert total(cost, pairs, BIG) == total(cost, expected, BIG)
@@ -0,0 +1,30 @@
+# test_layout.py
+import random
+import numpy as np
+import pytest
+from layout import LayoutConfig, generate_layout, save_layout, load_layout
+from simulation import Simulation
+from warehouse import MAX_PILE_CAPACITY, capacity_mask
+
+
+def test_zone_capacity_round_trip(tmp_path):
+    config = LayoutConfig(31, 17, initial_boxes=20, zones=("bottom", "left"),
+                          pile_capacity=3, zone_capacity={"left": MAX_PILE_CAPACITY})
+    layout = generate_layout(config, random.Random(1))
+    path = str(tmp_path / "l.npz")
+    save_layout(layout, path)
+    loaded = load_layout(path)
+    assert np.array_equal(loaded.capacity, layout.capacity)
+    assert set(np.unique(loaded.capacity[loaded.capacity > 0])) == {3, MAX_PILE_CAPACITY}
+    sim = Simulation(seed=0, layout=path, num_robots=2)
+    assert int(sim.occupancy.capacity.max()) == MAX_PILE_CAPACITY
+
+
+@pytest.mark.parametrize("cap", [0, MAX_PILE_CAPACITY + 1, 300])
+def test_capacity_out_of_range(cap):
+    with pytest.raises(ValueError):
+        LayoutConfig(pile_capacity=cap)
+    with pytest.raises(ValueError):
+        LayoutConfig(zone_capacity={"bottom": cap})
+    with pytest.raises(ValueError):
+        capacity_mask([(1, 1)], (3, 3), cap)
@@ -0,0 +1,29 @@
+# test_occupancy.py
+import numpy as np
+from occupancy import Occupancy
+
+
+def empty(H=6, W=6):
+    return Occupancy(np.zeros((H, W), np.uint8), np.zeros((H, W), bool))
+
+
+def test_static_changes_kept_only_until_every_reader_saw_them():
+    occ = empty()
+    occ.drop(0, 0)
+    assert occ.static_version == 1 and occ.static_changes == []
+
+    a, b = object(), object()
+    occ.watch_static(a)
+    occ.watch_static(b)
+    occ.drop(1, 1)
+    occ.drop(2, 2)
+    occ.drop(2, 2)              # misma celda: no es un cambio de libre a caja
+    assert occ.static_since(a) == [(1, 1), (2, 2)]
+    assert occ.static_changes == [(1, 1), (2, 2)]   # b aún no lee
+    occ.pick(1, 1)
+    assert occ.static_since(b) == [(1, 1), (2, 2), (1, 1)]
+    assert occ.static_changes == [(1, 1)]
+    assert occ.static_since(a) == [(1, 1)]
+    assert occ.static_changes == []
+    assert occ.static_since(a) == []
+    assert occ.static_version == 4
@@ -0,0 +1,82 @@
+# test_pathfinding.py
+import random
+import numpy as np
+import pytest
+from occupancy import Occupancy
+from bfs import bfs, neighbors4
+from hierarchical import HierarchicalPathfinder
+from pathfinding import astar, jps
+
+
+def random_grid(rng):
+    """Almacén al azar con paredes y cajas sueltas; devuelve occupancy y celdas libres."""
+    H, W = rng.randint(8, 40), rng.randint(8, 40)
+    warehouse = np.zeros((H, W), np.uint8)
+    walls = np.zeros((H, W), bool)
+    for r in range(H):
+        for c in range(W):
+            x = rng.random()
+            if x < 0.12:
+                walls[r, c] = True
+            elif x < 0.25:
+                warehouse[r, c] = 1
+    occ = Occupancy(warehouse, walls)
+    free = [(r, c) for r in range(H) for c in range(W) if not walls[r, c] and not warehouse[r, c]]
+    return occ, free
+
+
+def queries(rng, occ, free, n, robots=30):
+    """Consultas (inicio, metas, blocked) con robots al azar en blocked."""
+    for _ in range(n):
+        others = set(rng.sample(free, min(len(free), rng.randint(0, robots))))
+        blocked = set(occ.walls) | set(occ.boxes) | others
+        start = rng.choice(free)
+        goals = set(rng.sample(free, min(len(free), rng.randint(1, 4))))
+        yield start, goals, blocked
+
+
+def assert_valid(path, start, goals, blocked, shape):
+    cur = start
+    for cell in path:
+        assert cell in set(neighbors4(cur[0], cur[1], *shape))
+        assert cell not in blocked
+        cur = cell
+    assert cur in goals or (not path and start in goals)
+
+
+@pytest.mark.parametrize("pathfinder", [astar, jps])
+def test_grid_search_is_as_short_as_bfs(pathfinder):
+    for seed in range(30):
+        rng = random.Random(seed)
+        occ, free = random_grid(rng)
+        for start, goals, blocked in queries(rng, occ, free, 40):
+            ref = bfs(start, goals, blocked, occ.warehouse)
+            path = pathfinder(start, goals, blocked, occ.warehouse)
+            assert (path is None) == (ref is None)
+            if ref is not None:
+                assert len(path) == len(ref)
+                assert_valid(path, start, goals, blocked, occ.warehouse.shape)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_hierarchical_reaches_what_bfs_reaches(seed):
+    rng = random.Random(seed)
+    occ, free = random_grid(rng)
+    hpa = HierarchicalPathfinder(occ, cluster_size=rng.choice([4, 6, 8, 16]))
+    for start, goals, blocked in queries(rng, occ, free, 60):
+        if rng.random() < 0.2:
+            # una caja nueva: el grafo abstracto se refresca en la siguiente consulta
+            cell = rng.choice(free)
+            occ.drop(*cell)
+            free.remove(cell)
+            blocked.add(cell)
+            goals.discard(cell)
+            if start == cell or not goals:
+                continue
+        ref = bfs(start, goals, blocked, occ.warehouse)
+        path = hpa(start, goals, blocked)
+        assert (path is None) == (ref is None)
+        if ref is not None:
+            # HPA* no es óptimo, pero nunca más corto que bfs y siempre válido
+            assert len(path) >= len(ref)
+            assert_valid(path, start, goals, blocked, occ.warehouse.shape)
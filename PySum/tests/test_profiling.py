@@ -0,0 +1,23 @@
+# test_profiling.py
+from profiling import profiler
+from simulation import Simulation
+
+
+def test_each_tick_leaves_its_snapshot():
+    sim = Simulation(seed=0, num_robots=4, initial_boxes=12)
+    profiler.reset()
+    profiler.enable()
+    try:
+        seen = []
+        for _ in range(40):
+            tick = sim.tick
+            sim.step()
+            seen.append(profiler.last)
+            assert profiler.last["tick"] == tick
+        report = profiler.report()
+    finally:
+        profiler.disable()
+        profiler.reset()
+    assert profiler.last is None
+    assert sum(snap["counts"].get("grid_scan", 0) for snap in seen) == report["counts"]["grid_scan"] > 0
+    assert sum(snap["expanded"] for snap in seen) == report["counts"].get("expanded", 0)
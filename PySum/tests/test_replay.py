@@ -0,0 +1,81 @@
+# test_replay.py
+import random
+import numpy as np
+import pytest
+from layout import LayoutConfig, generate_layout
+from replay import ReplayRecorder, ReplayPlayer, StateDiff
+from simulation import Simulation
+
+
+def _robots(sim):
+    return [(rb.id, rb.r, rb.c, round(rb.x, 2), round(rb.y, 2), rb.state, bool(rb.carrying))
+            for rb in sim.robots]
+
+
+def _record(path, add_at=None):
+    """Graba un episodio corto y guarda el estado visible de cada tick."""
+    sim = Simulation(seed=2, num_robots=4, initial_boxes=15, time_limit_ticks=900)
+    recorder = ReplayRecorder(sim, path, keyframe_ticks=120)
+    seen = {sim.tick: (sim.warehouse.copy(), _robots(sim))}
+    while not sim.finished:
+        if sim.tick == add_at:
+            sim.add_robots(2)
+        sim.step()
+        seen[sim.tick] = (sim.warehouse.copy(), _robots(sim))
+    recorder.close()
+    return seen
+
+
+@pytest.mark.parametrize("name", ["ep.jsonl", "ep.jsonl.gz"])
+def test_seek_is_exact(tmp_path, name):
+    seen = _record(str(tmp_path / name))
+    player = ReplayPlayer(str(tmp_path / name))
+    ticks = sorted(seen)
+    order = random.Random(0).sample(ticks, 60) + ticks[:20] + [ticks[-1], 0]
+    for t in order:
+        player.seek(t)
+        boxes, robots = seen[t]
+        assert (player.warehouse == boxes).all()
+        assert _robots(player) == robots
+
+
+def test_robots_added_mid_episode(tmp_path):
+    path = str(tmp_path / "ep.jsonl")
+    seen = _record(path, add_at=200)
+    player = ReplayPlayer(path)
+    assert len(player.header["robots"]) == 4
+    for t in (150, 201, 250, 400, 100, 210, max(seen)):
+        player.seek(t)
+        assert _robots(player) == seen[t][1]
+    player.seek(0)
+    assert len(player.robots) == 4
+
+
+def test_state_diff_reports_new_robots():
+    sim = Simulation(seed=1, num_robots=3, initial_boxes=10)
+    diff = StateDiff(sim)
+    for _ in range(30):
+        sim.step()
+    diff.delta()
+    new = sim.add_robots(2)
+    delta = diff.delta()
+    assert [entry[0] for entry in delta["r"]] == [rb.id for rb in new]
+    assert len(diff.rows) == 5
+    key = diff.keyframe()
+    assert len(key["robots"]) == 5
+    assert [rid for rid, _ in key["new"]] == [rb.id for rb in new]
+    assert "r" not in diff.delta()
+
+
+def test_header_keeps_per_pile_capacity(tmp_path):
+    config = LayoutConfig(31, 17, initial_boxes=10, zones=("bottom", "left"),
+                          pile_capacity=3, zone_capacity={"left": 9})
+    sim = Simulation(seed=0, layout=generate_layout(config, random.Random(1)), num_robots=2,
+                     time_limit_ticks=60)
+    path = str(tmp_path / "ep.jsonl")
+    recorder = ReplayRecorder(sim, path)
+    sim.run()
+    recorder.close()
+    player = ReplayPlayer(path)
+    assert np.array_equal(player.capacity, sim.occupancy.capacity)
+    assert set(player.header["capacities"]) == {3, 9}
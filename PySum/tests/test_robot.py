@@ -0,0 +1,59 @@
+# test_robot.py
+from robot import DENIED
+from simulation import Simulation
+
+PILE = (13, 3)
+
+
+def _place(sim, rb, cell, to=None):
+    rb._set_cell(*cell)
+    rb.path = [to] if to else []
+    if to:
+        rb.fleet.start_move(rb.i, to[0], to[1], sim.tick)
+
+
+def _dropper(sim, rb):
+    """Robot con caja junto a PILE, listo para dejarla en su próximo update()."""
+    _place(sim, rb, (PILE[0], PILE[1] + 1))
+    rb.carrying = True
+    rb.state = "going_drop"
+    rb.target_pile = PILE
+    rb.wait_frames = 0
+
+
+def test_drop_cancels_the_whole_chain_entering_the_pile():
+    sim = Simulation(seed=0, num_robots=4, initial_boxes=0)
+    entering, follower, granted, dropper = sim.robots
+    sim.fleet.now = sim.tick
+    # entering va de A a la pila, follower de B a A y granted tiene B concedida
+    _place(sim, entering, (12, 3), PILE)
+    _place(sim, follower, (11, 3), (12, 3))
+    _place(sim, granted, (10, 3))
+    granted.path = [(11, 3)]
+    _dropper(sim, dropper)
+
+    allowed_map = {(11, 3): granted.id}
+    dropper.update(allowed_map)
+
+    assert sim.warehouse[PILE] == 1
+    f = sim.fleet
+    assert not f.moving[entering.i] and (entering.r, entering.c) == (12, 3)
+    assert not f.moving[follower.i] and (follower.r, follower.c) == (11, 3)
+    assert allowed_map[(11, 3)] == DENIED
+    granted.update(allowed_map)
+    assert not f.moving[granted.i] and (granted.r, granted.c) == (10, 3)
+
+
+def test_drop_denies_a_grant_into_the_pile():
+    sim = Simulation(seed=0, num_robots=3, initial_boxes=0)
+    waiting, follower, dropper = sim.robots
+    sim.fleet.now = sim.tick
+    _place(sim, waiting, (12, 3))
+    waiting.path = [PILE]
+    _place(sim, follower, (11, 3))
+    follower.path = [(12, 3)]
+    _dropper(sim, dropper)
+
+    allowed_map = {PILE: waiting.id, (12, 3): follower.id}
+    dropper.update(allowed_map)
+    assert allowed_map == {PILE: DENIED, (12, 3): DENIED}
@@ -0,0 +1,37 @@
+# test_runner.py
+import json
+import runner
+from benchmark import scenario_matrix
+from runner import RunningStats, scenario_sort_key
+
+
+def test_sort_key_tolerates_missing_keys():
+    # scenario_matrix no pone layout, path_cache ni deadlock
+    configs = scenario_matrix(sizes=[(27, 15)], boxes=[5], robots=[2, 3], seeds=2)
+    results = [dict(c, allocation=None if k % 2 else "greedy") for k, c in enumerate(configs)]
+    ordered = sorted(results, key=scenario_sort_key)
+    assert [r["num_robots"] for r in ordered] == [2, 2, 3, 3]
+
+
+def test_main_default_matrix(tmp_path, monkeypatch):
+    out = tmp_path / "results.json"
+    # la matriz por defecto, solo más chica y en serie
+    monkeypatch.setattr(runner, "run_parallel", lambda configs, workers=None: map(runner.run_episode, configs))
+    runner.main(["--sizes", "27x15", "--boxes", "5", "--robots", "2", "--seeds", "2",
+                 "--time-limit", "600", "--out", str(out)])
+    data = json.loads(out.read_text())
+    assert len(data["episodes"]) == 2
+    assert [e["seed"] for e in data["episodes"]] == [0, 1]
+    assert data["scenarios"][0]["episodes"] == 2
+
+
+def test_running_stats_groups_by_scenario():
+    stats = RunningStats()
+    base = dict(width=27, height=15, success=True, ticks=10, total_moves=5, delivered_per_tick=0.1,
+                search_expanded=3, wall_ms_per_tick=0.5)
+    stats.add(dict(base, seed=0))
+    stats.add(dict(base, seed=1, ticks=20, success=False))
+    (row,) = stats.report()
+    assert row["episodes"] == 2
+    assert row["success_rate"] == 0.5
+    assert row["ticks_mean"] == 15
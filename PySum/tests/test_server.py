@@ -0,0 +1,70 @@
+# test_server.py
+import asyncio
+import json
+from server import SimulationServer, COMMAND_BYTES
+from simulation import Simulation
+
+
+class Client:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    async def send(self, raw):
+        self.writer.write(raw if isinstance(raw, bytes) else (json.dumps(raw) + "\n").encode())
+        await self.writer.drain()
+
+    async def recv(self):
+        return json.loads(await asyncio.wait_for(self.reader.readline(), 5))
+
+    async def until(self, match):
+        """Lee registros hasta el primero que cumple match; devuelve todos los leídos."""
+        seen = []
+        while not seen or not match(seen[-1]):
+            seen.append(await self.recv())
+        return seen
+
+
+async def session():
+    sim = Simulation(seed=1, num_robots=3, initial_boxes=10)
+    server = SimulationServer(sim, port=0, tps=0, paused=True, seed=0)
+    task = asyncio.ensure_future(server.serve())
+    while server.stopped is None or server.port == 0:
+        await asyncio.sleep(0.01)
+    client = Client(*await asyncio.open_connection("127.0.0.1", server.port))
+    log = {}
+
+    log["header"] = await client.recv()
+    log["key"] = await client.recv()
+
+    await client.send({"cmd": "step", "ticks": 1})
+    log["step"] = await client.until(lambda rec: "type" not in rec)
+
+    await client.send({"cmd": "inject", "cells": [[1]]})
+    await client.send({"cmd": "inject", "cells": [[1, 2, 3]]})
+    await client.send(b"x" * (COMMAND_BYTES + 10) + b"\n")
+    await client.send({"cmd": "status"})
+    log["after"] = await client.until(lambda rec: rec.get("cmd") == "status")
+
+    await client.send({"cmd": "stop"})
+    await asyncio.wait_for(task, 5)
+    client.writer.close()
+    return sim, log
+
+
+def test_connect_stream_and_commands():
+    sim, log = asyncio.run(session())
+    assert log["header"]["type"] == "header"
+    assert log["key"]["type"] == "key" and log["key"]["t"] == 0
+
+    step = log["step"]
+    assert {"type": "ack", "cmd": "step"}.items() <= step[0].items()
+    assert step[-1]["t"] == 1 and sim.tick >= 1
+
+    after = log["after"]
+    errors = [rec["msg"] for rec in after if rec.get("type") == "error"]
+    assert len(errors) == 3
+    assert "celda inválida" in errors[0] and "celda inválida" in errors[1]
+    assert "demasiado largo" in errors[2]
+    # la conexión sigue viva después de la línea demasiado larga
+    assert after[-1]["type"] == "ack" and after[-1]["viewers"] == 1
@@ -0,0 +1,67 @@
+# test_snapshot.py
+import os
+import pickle
+import pytest
+from simulation import Simulation
+from snapshot import Snapshot, MAGIC, FORMAT_VERSION, _HEADER
+
+CONFIGS = [
+    dict(num_robots=6, initial_boxes=25),
+    dict(cooperative=True, num_robots=5, initial_boxes=20),
+    dict(pathfinder="hpa", path_cache=64, num_robots=5, initial_boxes=20),
+    dict(pathfinder="jps", allocation="auction", num_robots=5, initial_boxes=20),
+    dict(seed=None, num_robots=4, initial_boxes=15),
+]
+
+
+@pytest.mark.parametrize("kw", CONFIGS)
+def test_restore_and_fork_are_deterministic(kw):
+    kw = dict(dict(seed=4), **kw)
+    sim = Simulation(**kw)
+    for _ in range(240):
+        sim.step()
+    snap = Snapshot.from_bytes(sim.snapshot().to_bytes())
+    assert snap.tick == sim.tick
+    expected = sim.run()
+    assert snap.restore().run() == expected
+    assert [branch.run() for branch in snap.fork(2)] == [expected, expected]
+
+
+def test_branches_are_independent():
+    sim = Simulation(seed=3, num_robots=4, initial_boxes=15)
+    for _ in range(100):
+        sim.step()
+    snap = sim.snapshot()
+    a, b = snap.fork(2)
+    a.add_robots(3)
+    assert len(a.robots) == 7 and len(b.robots) == 4
+    assert b.run() == snap.restore().run()
+
+
+def test_save_load(tmp_path):
+    sim = Simulation(seed=1, num_robots=3, initial_boxes=10)
+    for _ in range(50):
+        sim.step()
+    path = str(tmp_path / "s.snap")
+    sim.snapshot().save(path)
+    restored = Snapshot.load(path).restore()
+    assert restored.tick == sim.tick
+    assert restored.run() == sim.run()
+
+
+def test_rejects_foreign_files():
+    with pytest.raises(ValueError):
+        Snapshot.from_bytes(_HEADER.pack(b"NOTASNAP", FORMAT_VERSION, 0, 0) + b"x")
+    with pytest.raises(ValueError):
+        Snapshot.from_bytes(_HEADER.pack(MAGIC, FORMAT_VERSION + 1, 0, 0) + b"x")
+
+
+class _Evil:
+    def __reduce__(self):
+        return (os.system, ("echo snapshot",))
+
+
+def test_refuses_unknown_globals():
+    raw = _HEADER.pack(MAGIC, FORMAT_VERSION, 0, 0) + pickle.dumps(_Evil())
+    with pytest.raises(pickle.UnpicklingError):
+        Snapshot.from_bytes(raw).restore()
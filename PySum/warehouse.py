@@ -1,64 +1,101 @@
 # warehouse.py
 import random
+import numpy as np
+from config import GRID_W, GRID_H, PILE_CAPACITY
 
-GRID_W = 27
-GRID_H = 15
-CELL = 32
+# las cajas por celda se guardan en uint8: una pila no puede tener más
+MAX_PILE_CAPACITY = np.iinfo(np.uint8).max
 
-def get_walls():
+def wall_mask(H=GRID_H, W=GRID_W):
     """
-    Celdas que corresponden al borde de ladrillos:
+    Máscara booleana H x W del borde de ladrillos:
     - Fila 0 (arriba)
-    - Fila GRID_H - 1 (abajo)
+    - Fila H - 1 (abajo)
     - Columna 0 (izquierda)
-    - Columna GRID_W - 1 (derecha)
+    - Columna W - 1 (derecha)
     """
-    walls = set()
+    mask = np.zeros((H, W), dtype=bool)
+    mask[0, :] = True       # borde superior de ladrillos
+    mask[H - 1, :] = True   # borde inferior de ladrillos
+    mask[:, 0] = True       # borde izquierdo
+    mask[:, W - 1] = True   # borde derecho
+    return mask
 
-    # filas de arriba y abajo
-    for c in range(GRID_W):
-        walls.add((0, c))              # borde superior de ladrillos
-        walls.add((GRID_H - 1, c))     # borde inferior de ladrillos
 
-    # columnas izquierda y derecha
-    for r in range(GRID_H):
-        walls.add((r, 0))              # borde izquierdo
-        walls.add((r, GRID_W - 1))     # borde derecho
+def get_walls(H=GRID_H, W=GRID_W):
+    """Las mismas celdas de wall_mask() como set de (r, c)."""
+    return cells_of(wall_mask(H, W))
 
-    return walls
 
+def cells_of(mask):
+    """Set de (r, c) donde la máscara es True."""
+    return {(int(r), int(c)) for r, c in np.argwhere(mask)}
 
-def create_warehouse(initial_boxes=30, max_stack_initial=1):
+
+def destination_mask(destination_cells, shape):
+    """Máscara booleana de las celdas de pilas destino."""
+    mask = np.zeros(shape, dtype=bool)
+    for r, c in destination_cells:
+        mask[r, c] = True
+    return mask
+
+
+def capacity_mask(destination_cells, shape, pile_capacity=PILE_CAPACITY):
+    """
+    Capacidad de cada celda (0 = no es pila destino).
+    pile_capacity: un entero para todas las pilas o un arreglo H x W.
+    """
+    mask = np.zeros(shape, dtype=np.uint8)
+    if np.ndim(pile_capacity) == 0:
+        check_capacity(pile_capacity)
+        for r, c in destination_cells:
+            mask[r, c] = pile_capacity
+    else:
+        for r, c in destination_cells:
+            mask[r, c] = check_capacity(pile_capacity[r, c])
+    return mask
+
+
+def check_capacity(capacity):
+    """Devuelve la capacidad como int o ValueError si no cabe en 1..MAX_PILE_CAPACITY."""
+    capacity = int(capacity)
+    if not 1 <= capacity <= MAX_PILE_CAPACITY:
+        raise ValueError(f"capacidad de pila fuera de rango: {capacity} (1..{MAX_PILE_CAPACITY})")
+    return capacity
+
+
+def create_warehouse(initial_boxes=30, max_stack_initial=1, width=GRID_W, height=GRID_H, rng=random):
     """
     Crea y devuelve (warehouse, destination_cells)
-    warehouse: matriz GRID_H x GRID_W con counts de cajas por celda
+    warehouse: arreglo uint8 height x width con counts de cajas por celda
     destination_cells: lista de celdas en la fila de piso (una arriba de la pared)
+    rng: random.Random con semilla para escenarios reproducibles (o el módulo random)
     """
-    warehouse = [[0 for _ in range(GRID_W)] for _ in range(GRID_H)]
-    walls = get_walls()  # para no poner cajas en el borde
+    warehouse = np.zeros((height, width), dtype=np.uint8)
+    walls = wall_mask(height, width)  # para no poner cajas en el borde
 
     placed = 0
     attempts = 0
 
     # fila destino = piso (una arriba de la pared inferior)
-    dest_row = GRID_H - 2
+    dest_row = height - 2
 
     # cajas iniciales solo en el área interior (no en fila destino ni en paredes)
     while placed < initial_boxes and attempts < initial_boxes * 50:
-        r = random.randint(0, GRID_H - 5)   # evitar zona de destino (últimas filas)
-        c = random.randint(0, GRID_W - 1)
+        r = rng.randint(0, height - 5)   # evitar zona de destino (últimas filas)
+        c = rng.randint(0, width - 1)
 
         # NO poner cajas en el borde de ladrillos ni en fila destino
-        if (r, c) in walls or r == dest_row:
+        if walls[r, c] or r == dest_row:
             attempts += 1
             continue
 
-        if warehouse[r][c] < max_stack_initial:
-            if warehouse[r][c] == 0:
-                warehouse[r][c] += 1
+        if warehouse[r, c] < max_stack_initial:
+            if warehouse[r, c] == 0:
+                warehouse[r, c] += 1
                 placed += 1
         attempts += 1
 
     # las pilas de destino están en la fila de piso
-    destination_cells = [(dest_row, x) for x in range(1, GRID_W - 1)]
+    destination_cells = [(dest_row, x) for x in range(1, width - 1)]
     return warehouse, destination_cells
\ No newline at end of file